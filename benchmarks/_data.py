@@ -0,0 +1,51 @@
+"""
+基准测试数据 - 从历史样本构造事件、消息和历史文件
+"""
+
+import json
+import os
+from typing import Any, Dict, List
+
+from tools.speak_replay import load_history, split_lines
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "allpre.deepseek.preData")
+
+
+def sample_messages(count: int = 1000) -> List[str]:
+    """样本消息，不足 count 条时循环补齐"""
+    texts: List[str] = []
+    for lines in load_history(SAMPLE_PATH).values():
+        texts.extend(split_lines(lines)[0])
+    return (texts * (count // len(texts) + 1))[:count]
+
+
+def group_message_event(text: str, message_id: int = 1, group_id: int = 100000, user_id: int = 1000000) -> Dict[str, Any]:
+    """构造 OneBot v11 群消息事件"""
+    return {
+        "time": 1700000000,
+        "self_id": 10000,
+        "post_type": "message",
+        "message_type": "group",
+        "sub_type": "normal",
+        "message_id": message_id,
+        "group_id": group_id,
+        "user_id": user_id,
+        "anonymous": None,
+        "message": text,
+        "raw_message": text,
+        "font": 0,
+        "sender": {"user_id": user_id, "nickname": "bench", "card": "", "role": "member"},
+    }
+
+
+def history_lines(count: int = 6000) -> List[str]:
+    """按历史文件格式生成 count 行"""
+    msgs = sample_messages(count)
+    return [f"{1000000 + i % 37}: {m} : (MessageId){100000 + i}" for i, m in enumerate(msgs)]
+
+
+def write_memory_file(path: str, groups: int, lines_per_group: int = 6000):
+    """写出 groups 个群、每群 lines_per_group 行的历史文件"""
+    lines = history_lines(lines_per_group)
+    with open(path, "w", encoding="utf-8") as doc:
+        json.dump({str(100000 + g): lines for g in range(groups)}, doc, ensure_ascii=False, indent=2)
@@ -0,0 +1,96 @@
+"""
+事件分发基准 - EventHandler.should_process（大量处理器）与完整的 Bot._handle_event 路径
+
+_handle_event 使用桩 WebSocket：发送的 API 请求立即得到成功响应。
+
+用法：
+    python -m benchmarks.bench_dispatch -o results/dispatch.json
+"""
+
+import asyncio
+import json
+import time
+
+import pyperf
+
+from benchmarks._data import group_message_event
+from includes.bot import Bot
+from includes.eventers import Condition, Receive, When
+from includes.models import MessageInfo
+
+HANDLER_COUNT = 100
+EVENT = group_message_event("bot 这也太离谱了吧？", 1)
+INFO = MessageInfo.from_event(EVENT, 10000)
+
+
+def make_handlers(count: int):
+    """构造一组常见形态的处理器：命令、关键词、正则、群号"""
+    handlers = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            handler = Receive.Message(When=(When.Received, When.GotCommand(name=f"cmd{i}")), Conditions=(Condition.AllMessage,))
+        elif kind == 1:
+            handler = Receive.Message(When=(When.Received,), Conditions=(Condition.ContainsKeyword([f"kw{i}", "hello"]),))
+        elif kind == 2:
+            handler = Receive.Message(When=(When.Received,), Conditions=(Condition.Regex(rf"^/re{i}\s+(.+)"),))
+        else:
+            handler = Receive.Message(When=(When.Received,), Conditions=(Condition.GroupMessage, Condition.GroupId(i)))
+        handler(lambda bot, info: None)
+        handlers.append(handler)
+    return handlers
+
+
+HANDLERS = make_handlers(HANDLER_COUNT)
+
+
+def should_process():
+    for handler in HANDLERS:
+        handler.should_process(INFO)
+
+
+class StubSocket:
+    """桩 WebSocket：把每个 API 请求立即回以成功响应"""
+
+    def __init__(self, bot: Bot):
+        self.bot = bot
+
+    async def send(self, data: str):
+        request = json.loads(data)
+        await self.bot._handle_event({"status": "ok", "retcode": 0, "data": {"message_id": 1}, "echo": request["echo"]})
+
+
+def make_bot() -> Bot:
+    bot = Bot(ws_url="ws://127.0.0.1:0", self_id=10000)
+    for handler in make_handlers(10):
+        bot.register_message_handler(handler)
+
+    reply = Receive.Message()
+
+    @reply
+    def reply_handler(bot_instance: Bot, info: MessageInfo):
+        bot_instance.send_group_msg(info.group_id, "确实")
+
+    bot.register_message_handler(reply)
+    bot.websocket = StubSocket(bot)
+    bot.connected = True
+    return bot
+
+
+def handle_event(loops: int) -> float:
+    bot = make_bot()
+
+    async def run() -> float:
+        bot._loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        for _ in range(loops):
+            await bot._handle_event(EVENT)
+        return time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    runner = pyperf.Runner(program_args=("-m", "benchmarks.bench_dispatch"))
+    runner.bench_func(f"should_process_x{HANDLER_COUNT}", should_process)
+    runner.bench_time_func("handle_event_message", handle_event)
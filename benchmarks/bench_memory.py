@@ -0,0 +1,71 @@
+"""
+历史记录基准 - 读取与保存每群 6000 行的历史文件，以及历史归档的检索
+
+用法：
+    python -m benchmarks.bench_memory --groups 20 -o results/memory.json
+    python -m benchmarks.bench_memory --archive-lines 1000000
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+import pyperf
+
+from benchmarks._data import history_lines, write_memory_file
+from includes.archive import GroupArchive, HistoryArchive
+from includes.memory import extract_mem_by_group_id, load_memories, pack_memories, set_archive
+from includes.persist import FsyncPolicy, HistoryStore
+
+
+def main():
+    def add_cmdline_args(cmd, args):
+        cmd.extend(("--groups", str(args.groups), "--archive-lines", str(args.archive_lines)))
+
+    runner = pyperf.Runner(program_args=("-m", "benchmarks.bench_memory"), add_cmdline_args=add_cmdline_args)
+    runner.argparser.add_argument("--groups", type=int, default=20, help="历史文件中的群数量")
+    runner.argparser.add_argument("--archive-lines", type=int, default=200000, help="归档中的行数")
+    args = runner.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="tloh-bench-")
+    atexit.register(shutil.rmtree, workdir, True)
+    path = os.path.join(workdir, "botmemories.ign")
+    write_memory_file(path, args.groups)
+    lines = history_lines()
+
+    def load():
+        extract_mem_by_group_id(load_memories(path), "100000")
+
+    def save():
+        pack_memories("100000", lines, path)
+
+    set_archive(HistoryArchive(os.path.join(workdir, "overflow")))
+    store = HistoryStore(path, flush_interval=0.05, fsync=FsyncPolicy.NEVER)
+
+    def store_append():
+        # 100 条追加合并为一次写入（对比 memory_save：每条消息整个文件读写一次）
+        for line in lines[:100]:
+            store.append("100000", line)
+        store.flush()
+
+    archive = GroupArchive(os.path.join(workdir, "archive"))
+    for start in range(0, args.archive_lines, len(lines)):
+        archive.append(lines[:args.archive_lines - start], ts=1700000000 + start)
+    middle = len(archive) // 2
+
+    def archive_slice():
+        archive.text(middle, middle + 200)
+
+    def archive_find():
+        archive.find_message(100000 + 123)
+
+    runner.bench_func(f"memory_load_{args.groups}x6000", load)
+    runner.bench_func(f"memory_save_{args.groups}x6000", save)
+    runner.bench_func(f"memory_store_append_100_{args.groups}x6000", store_append)
+    runner.bench_func(f"archive_slice_200_of_{args.archive_lines}", archive_slice)
+    runner.bench_func(f"archive_find_message_{args.archive_lines}", archive_find)
+
+
+if __name__ == "__main__":
+    main()
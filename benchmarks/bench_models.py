@@ -0,0 +1,61 @@
+"""
+数据模型基准 - MessageInfo.from_event、CQCode.__str__、MessageBuilder / SegmentBuilder
+
+用法：
+    python -m benchmarks.bench_models -o results/models.json
+"""
+
+import pyperf
+
+from benchmarks._data import group_message_event, sample_messages
+from includes.models import CQCode, MessageBuilder, MessageInfo, Seg, SegmentBuilder
+
+EVENTS = [group_message_event(m, i) for i, m in enumerate(sample_messages(200))]
+CODES = [
+    CQCode.at(123456789),
+    CQCode.face(178),
+    CQCode.reply(1564538978),
+    CQCode.image("103DB11C233877384E072261C732516B.jpg", url="https://multimedia.nt.qq.com.cn/download?appid=1407"),
+    CQCode.node_custom(10000, "TLoH Bot", "确实，这波有点离谱了。"),
+]
+
+
+def from_event():
+    for event in EVENTS:
+        MessageInfo.from_event(event, 10000)
+
+
+def cq_str():
+    for code in CODES:
+        str(code)
+
+
+def builder_build():
+    MessageBuilder()\
+        .add(CQCode.reply(1564538978))\
+        .add(CQCode.at(123456789))\
+        .text("确实，这波有点离谱了。")\
+        .add(CQCode.face(178))\
+        .build()
+
+
+def segment_build():
+    SegmentBuilder()\
+        .reply(1564538978)\
+        .at(123456789)\
+        .text("确实，这波有点离谱了。")\
+        .face(178)\
+        .build()
+
+
+def forward_nodes():
+    [Seg.node_custom(10000, "TLoH Bot", "确实，这波有点离谱了。") for _ in range(100)]
+
+
+if __name__ == "__main__":
+    runner = pyperf.Runner(program_args=("-m", "benchmarks.bench_models"))
+    runner.bench_func("message_info_from_event_x200", from_event)
+    runner.bench_func("cq_code_str_x5", cq_str)
+    runner.bench_func("message_builder_build", builder_build)
+    runner.bench_func("segment_builder_build", segment_build)
+    runner.bench_func("forward_node_custom_x100", forward_nodes)
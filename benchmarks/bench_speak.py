@@ -0,0 +1,32 @@
+"""
+发言决策基准 - 逐条评分与 NumPy 批量评分
+
+用法：
+    python -m benchmarks.bench_speak -o results/speak.json
+"""
+
+import time
+
+import pyperf
+
+from benchmarks._data import sample_messages
+from includes.speak import SpeakDecisionEngine
+
+MESSAGES = sample_messages(5000)
+NOW = time.time()
+engine = SpeakDecisionEngine(seed=0)
+
+
+def scalar():
+    for m in MESSAGES:
+        engine.score(m, last_bot_time=NOW - 60, now=NOW, recent_msg_count=3)
+
+
+def batch():
+    engine.score_batch(MESSAGES, last_bot_time=NOW - 60, now=NOW, recent_msg_counts=3)
+
+
+if __name__ == "__main__":
+    runner = pyperf.Runner(program_args=("-m", "benchmarks.bench_speak"))
+    runner.bench_func("should_bot_speak_scalar_x5000", scalar)
+    runner.bench_func("should_bot_speak_batch_x5000", batch)
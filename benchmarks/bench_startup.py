@@ -0,0 +1,73 @@
+"""
+启动基准 - 冷启动导入耗时（基于 python -X importtime）
+
+用法：
+    python -m benchmarks.bench_startup -o results/startup.json
+    python -m benchmarks.bench_startup --importtime                 # 列出最慢的模块
+    python -m benchmarks.bench_startup --importtime --budget-ms 300 # 超出预算时返回 1，可放进 CI
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+TARGETS = {
+    "main": "import main",
+    "includes.bot": "import includes.bot",
+}
+
+LINE_PATTERN = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def importtime(statement: str) -> Dict[str, Tuple[int, int]]:
+    """
+    在新解释器中执行 statement，解析 -X importtime 输出
+
+    Returns:
+        Dict: 模块名 -> (自身耗时, 累计耗时)，单位微秒
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                          capture_output=True, text=True, check=True)
+    result: Dict[str, Tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            result[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return result
+
+
+def report(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="导入耗时明细与预算检查")
+    parser.add_argument("--importtime", action="store_true")
+    parser.add_argument("--target", choices=TARGETS, default="main", help="要检查的入口")
+    parser.add_argument("--runs", type=int, default=5, help="重复次数（取中位数）")
+    parser.add_argument("--top", type=int, default=15, help="列出累计耗时最多的模块数")
+    parser.add_argument("--budget-ms", type=float, default=0.0, help="入口模块累计导入耗时上限（0 为不检查）")
+    args = parser.parse_args(argv)
+
+    runs = [importtime(TARGETS[args.target]) for _ in range(args.runs)]
+    total = statistics.median(r[args.target][1] for r in runs) / 1000
+    last = runs[-1]
+
+    print(f"{args.target}: {total:.1f} ms（{args.runs} 次中位数）")
+    for name, (own, cumulative) in sorted(last.items(), key=lambda i: -i[1][1])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {own / 1000:7.1f} ms  {name}")
+
+    if args.budget_ms and total > args.budget_ms:
+        print(f"超出导入预算: {total:.1f} ms > {args.budget_ms:g} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    if "--importtime" in sys.argv:
+        sys.exit(report(sys.argv[1:]))
+
+    import pyperf
+
+    runner = pyperf.Runner(program_args=("-m", "benchmarks.bench_startup"))
+    for name, statement in TARGETS.items():
+        runner.bench_command(f"startup_import_{name.replace('.', '_')}", [sys.executable, "-c", statement])
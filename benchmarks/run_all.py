@@ -0,0 +1,55 @@
+"""
+运行全部基准并把结果存为 JSON，可与另一次提交的结果对比
+
+用法：
+    python -m benchmarks.run_all --output results/$(git rev-parse --short HEAD)
+    python -m benchmarks.run_all --output results/new --compare results/old
+    python -m benchmarks.run_all --fast   # 快速模式，结果不稳定，只用于检查能否运行
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import List
+
+SUITES = ["models", "dispatch", "speak", "memory", "startup"]
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="运行全部基准")
+    parser.add_argument("--output", default="results/latest", help="结果目录（每个套件一个 JSON）")
+    parser.add_argument("--compare", help="用于对比的旧结果目录")
+    parser.add_argument("--suite", action="append", choices=SUITES, help="只运行指定套件（可多次指定）")
+    parser.add_argument("--fast", action="store_true", help="pyperf 快速模式")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output, exist_ok=True)
+    failed = False
+    for suite in args.suite or SUITES:
+        path = os.path.join(args.output, f"{suite}.json")
+        if os.path.exists(path):
+            os.remove(path)
+        cmd = [sys.executable, "-m", f"benchmarks.bench_{suite}", "-o", path, "--quiet"]
+        if args.fast:
+            cmd.append("--fast")
+        print(f":: {suite}", flush=True)
+        # 子进程自己也会输出结果，这里只在失败时转出，成功时由下面的 show / compare_to 统一输出一次
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, text=True)
+        if proc.returncode != 0:
+            sys.stdout.write(proc.stdout)
+            failed = True
+            continue
+
+        if args.compare:
+            old = os.path.join(args.compare, f"{suite}.json")
+            if os.path.exists(old):
+                subprocess.call([sys.executable, "-m", "pyperf", "compare_to", old, path, "--table"])
+        else:
+            subprocess.call([sys.executable, "-m", "pyperf", "show", "--quiet", path])
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+# 日志：全局级别、各子系统级别（bot / speak / main ...）、是否通过后台线程输出
+LOG_LEVEL = "INFO"
+LOG_LEVELS = {
+    "speak": "INFO",  # 改为 DEBUG 可查看每条消息的发言决策
+}
+LOG_ASYNC = True
+
+# 指标：Prometheus 端点端口（0 为关闭）、JSON 快照文件路径（空为关闭）及写入间隔（秒）
+METRICS_PORT = 0
+METRICS_SNAPSHOT = ""
+METRICS_SNAPSHOT_INTERVAL = 60
+
+# 管理员 QQ 号，可使用 /profile 等管理命令
+ADMINS: list[int] = []
+
+# 合并转发：回复分段数或总字数达到阈值时打包为一条合并转发消息
+FORWARD_MIN_CHUNKS = 4
+FORWARD_MIN_CHARS = 500
+FORWARD_NICKNAME = "TLoH Bot"
+
+# 处理器执行：同时执行的线程处理器数、排队上限（超出后按事件类型丢弃，见 includes/executor.py）
+HANDLER_WORKERS = 16
+HANDLER_QUEUE = 256
+
+# 状态快照：热重启时恢复冷却计数、待回复消息等运行时状态（路径为空则关闭）
+SNAPSHOT_PATH = "./data/state.snap"
+SNAPSHOT_INTERVAL = 60  # 定期写入间隔（秒），退出时也会写入
+SNAPSHOT_REPLAY_AGE = 60  # 重启后只重新回复这么多秒以内的消息
+
+# 消息索引：message_id -> 群号/发送者/历史行号，用于校验 BOTCALL 的目标消息
+MSGINDEX_CAPACITY = 100000
+
+# 回复去重：与最近回复的相似度（字符 3-gram Jaccard）达到阈值时重新生成一次，仍重复则不发送
+DEDUPE_HISTORY = 20  # 每个群比较的最近回复数
+DEDUPE_WINDOW = 600  # 只和这么多秒以内的回复比较
+DEDUPE_THRESHOLD = 0.8
+DEDUPE_REGENERATE = True  # False 为直接丢弃
+TRIGGER_REUSE_WINDOW = 30  # 相同触发消息在这么多秒内复用上次发出的回复（有意不经过去重，0 为关闭）
+
+# LLM 回复缓存：规范化的触发消息 + 最近几条群友发言相同时复用回复（随状态快照保存；容量为 0 则关闭）
+LLM_CACHE_SIZE = 2048
+LLM_CACHE_TTL = 3600  # 秒，应长于 DEDUPE_WINDOW，否则命中的回复多半会被当作重复
+LLM_CACHE_CONTEXT = 3  # 参与指纹的最近群友发言数
+
+# LLM 路由：configuration.toml 中 model 为首选，fallback_models 为备选（见 includes/llmrouter.py）
+LLM_HEDGE_DEFAULT = 8.0  # 样本不足时等待多久再向备选发出备份请求（秒，0 为不对冲）
+LLM_HEDGE_MIN = 1.0  # 对冲延迟取首选路由最近的 p95，限制在 [MIN, MAX] 内
+LLM_HEDGE_MAX = 20.0
+LLM_BREAKER_FAILURES = 3  # 连续失败多少次后熔断
+LLM_BREAKER_COOLDOWN = 30  # 熔断持续时间（秒）
+LLM_REQUEST_TIMEOUT = 60.0  # 单次请求的超时（秒），超时记为该路由失败
+LLM_DEADLINE = 90.0  # 一次回复等待 LLM 的总期限（秒，含对冲和换路由）
+
+# 历史写入：单写线程合并写入历史文件（临时文件 + 替换，见 includes/persist.py）
+MEMORY_FLUSH_INTERVAL = 1.0  # 有修改后最多等待多久写入（秒）
+MEMORY_FSYNC = "interval"  # always / interval / never
+MEMORY_FSYNC_INTERVAL = 10  # interval 策略下两次 fsync 的最小间隔（秒）
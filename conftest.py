@@ -0,0 +1,2 @@
+# OneBot 模拟器与已连接 Bot 的 fixture（onebot_simulator / onebot_bot）
+pytest_plugins = ["tools.pytest_onebot"]
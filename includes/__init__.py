@@ -4,6 +4,13 @@ TLoH Bot
 THE ONEBOT V11 ADAPTER MODULE
 """
 
-from . import bot
-from . import eventers
-from . import models
\ No newline at end of file
+import importlib
+
+__all__ = ["bot", "eventers", "models"]
+
+
+def __getattr__(name: str):
+    """子模块在首次访问 includes.<name> 时才导入，import includes 本身几乎没有开销"""
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,312 @@
+"""
+历史归档 - 超出热数据上限的旧历史按群追加到只读归档
+
+每个群一个目录：
+    seg-000000.log ...  追加写入的分段文件，每行 UTF-8 文本后跟 "\n"
+    index.bin           定长索引项（分段号, 长度, 偏移, 时间, message_id），与行一一对应
+
+读取时分段和索引都用 mmap 映射：按行号、时间或 message_id 定位后直接切片，
+不需要把整段历史读进 Python 列表。归档可以增长到数百万行而不影响热路径内存。
+
+时间戳为消息自身的时间（由调用方给出），保证不减，按时间查找是二分查找；
+按 message_id 查找使用首次查询时建立的有序数组，之后追加的行先放在一个小的未排序尾部，攒够再合并。
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .log import get_logger
+from .metrics import registry
+
+logger = get_logger("archive")
+
+ARCHIVE_PATH = "./data/archive"
+SEGMENT_BYTES = 64 * 1024 * 1024
+
+MESSAGE_ID_PATTERN = re.compile(r"\(MessageId\)(-?\d+)\s*$")
+
+ARCHIVE_LINES = registry.counter("archive_lines_total", "归档的历史行数")
+ARCHIVE_APPEND = registry.histogram("archive_append_seconds", "一次归档写入耗时")
+
+_INDEX_DTYPE = [("segment", "<u4"), ("length", "<u4"), ("offset", "<u8"), ("ts", "<f8"), ("message_id", "<i8")]
+_INDEX_ITEM = 32  # 每个索引项的字节数
+_ID_TAIL = 4096  # message_id 查找表未排序尾部的上限，超出后并入有序数组
+
+TimeStamps = float | Sequence[float | None] | None  # 整批一个时间戳，或逐行给出（None 为未知）
+
+
+def parse_message_id(line: str) -> int:
+    """从历史行末尾的 (MessageId)xxx 取出消息 ID，没有时返回 0"""
+    match = MESSAGE_ID_PATTERN.search(line)
+    return int(match.group(1)) if match else 0
+
+
+class GroupArchive:
+    """单个群的归档（线程安全）"""
+
+    def __init__(self, directory: str, segment_bytes: int = SEGMENT_BYTES):
+        """
+        打开归档目录（不存在时在首次写入时创建）
+
+        Args:
+            directory: 归档目录
+            segment_bytes: 单个分段文件的大小上限，超出后换新分段
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(directory, "index.bin")
+        self._index: Any = None  # numpy.memmap，行数变化后重新映射
+        self._segments: Dict[int, Any] = {}  # 分段号 -> mmap
+        self._ids: Any = None  # 按 message_id 稳定排序的 (message_id, 行号)，首次查找时建立
+        self._id_tail: List[Tuple[int, int]] = []  # 建立之后追加的 (message_id, 行号)
+        self._count = os.path.getsize(self._index_path) // _INDEX_ITEM if os.path.exists(self._index_path) else 0
+        self._segment, self._segment_size = self._last_segment()
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"seg-{segment:06d}.log")
+
+    def _last_segment(self) -> Tuple[int, int]:
+        segment = 0
+        while os.path.exists(self._segment_path(segment + 1)):
+            segment += 1
+        path = self._segment_path(segment)
+        return segment, os.path.getsize(path) if os.path.exists(path) else 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    # ========== 写入 ==========
+
+    def _timestamps(self, count: int, ts: TimeStamps) -> List[float]:
+        """
+        逐行时间戳（调用方持锁）
+
+        时间未知（None）的行沿用前一行的时间，开头的沿用归档最后一行（归档为空时取这批第一个已知时间，
+        都未知时为 0：这些是早于本次运行的旧历史）；结果不小于已归档的最后时间，按时间的二分查找因此始终成立。
+        """
+        if ts is None or isinstance(ts, (int, float)):
+            ts = [time.time() if ts is None else float(ts)] * count
+        last = float(self._index_view()[-1]["ts"]) if self._count else None
+        if last is None:
+            last = next((t for t in ts if t is not None), 0.0)
+        result = []
+        for t in ts:
+            last = last if t is None else max(last, t)
+            result.append(last)
+        return result
+
+    def append(self, lines: Sequence[str], ts: TimeStamps = None) -> int:
+        """
+        追加历史行
+
+        Args:
+            lines: 历史行（按时间顺序）
+            ts: 消息的时间戳：整批一个值，或与 lines 一一对应（None 为未知）；不给时为归档时刻
+
+        Returns:
+            int: 归档后的总行数
+        """
+        import numpy as np
+
+        if not lines:
+            return self._count
+        with self._lock, ARCHIVE_APPEND.time():
+            times = self._timestamps(len(lines), ts)
+            os.makedirs(self.directory, exist_ok=True)
+            entries = np.zeros(len(lines), dtype=_INDEX_DTYPE)
+            chunks: List[bytes] = []
+            for i, line in enumerate(lines):
+                data = line.encode("utf-8")
+                if self._segment_size and self._segment_size + len(data) + 1 > self.segment_bytes:
+                    self._flush_segment(chunks)
+                    self._segment += 1
+                    self._segment_size = 0
+                entries[i] = (self._segment, len(data), self._segment_size, times[i], parse_message_id(line))
+                chunks.append(data + b"\n")
+                self._segment_size += len(data) + 1
+            self._flush_segment(chunks)
+
+            # 先写数据再写索引：中途崩溃最多留下没有索引的尾部数据，不会出现指向空处的索引
+            with open(self._index_path, "ab") as f:
+                f.write(entries.tobytes())
+            if self._ids is not None:
+                self._id_tail.extend(zip(entries["message_id"].tolist(), range(self._count, self._count + len(lines))))
+            self._count += len(lines)
+            self._index = None
+        ARCHIVE_LINES.inc(len(lines))
+        return self._count
+
+    def _flush_segment(self, chunks: List[bytes]):
+        if chunks:
+            with open(self._segment_path(self._segment), "ab") as f:
+                f.write(b"".join(chunks))
+            chunks.clear()
+
+    # ========== 读取 ==========
+
+    def _index_view(self):
+        """当前行数对应的索引映射"""
+        import numpy as np
+
+        if self._index is None or len(self._index) != self._count:
+            self._index = np.memmap(self._index_path, dtype=_INDEX_DTYPE, mode="r", shape=(self._count,)) \
+                if self._count else np.zeros(0, dtype=_INDEX_DTYPE)
+        return self._index
+
+    def _segment_view(self, segment: int, end: int) -> memoryview:
+        """
+        分段文件的映射（文件增长后重新映射）
+
+        raw() 交出的 memoryview 可能还引用着旧映射，旧映射不能 close()（会抛 BufferError），
+        只替换引用，等所有视图释放后由垃圾回收解除映射。
+        """
+        import mmap
+
+        mm = self._segments.get(segment)
+        if mm is None or len(mm) < end:
+            with open(self._segment_path(segment), "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._segments[segment] = mm
+        return memoryview(mm)
+
+    def raw(self, start: int, stop: int) -> List[memoryview]:
+        """
+        零拷贝读取 [start, stop) 行
+
+        Returns:
+            List[memoryview]: 每个分段一块连续内存，行之间以 "\n" 分隔（不含最后一行的换行）
+        """
+        import numpy as np
+
+        with self._lock:
+            start, stop, _ = slice(start, stop).indices(self._count)
+            if start >= stop:
+                return []
+            index = self._index_view()[start:stop]
+            segments = index["segment"]
+            cuts = (np.flatnonzero(segments[1:] != segments[:-1]) + 1).tolist()
+            views = []
+            bounds = [0] + cuts + [len(index)]
+            for a, b in zip(bounds, bounds[1:]):
+                first, last = index[a], index[b - 1]
+                begin = int(first["offset"])
+                end = int(last["offset"]) + int(last["length"])
+                views.append(self._segment_view(int(first["segment"]), end)[begin:end])
+            return views
+
+    def text(self, start: int, stop: int) -> str:
+        """[start, stop) 行拼成的文本（直接从映射解码，适合交给摘要等处理）"""
+        return "\n".join(str(view, "utf-8") for view in self.raw(start, stop))
+
+    def lines(self, start: int, stop: int) -> List[str]:
+        """[start, stop) 行的列表"""
+        with self._lock:
+            start, stop, _ = slice(start, stop).indices(self._count)
+            index = self._index_view()[start:stop]
+            result = []
+            for entry in index:
+                offset = int(entry["offset"])
+                view = self._segment_view(int(entry["segment"]), offset + int(entry["length"]))
+                result.append(str(view[offset:offset + int(entry["length"])], "utf-8"))
+            return result
+
+    def tail(self, count: int) -> List[str]:
+        """最后 count 行"""
+        return self.lines(max(0, self._count - count), self._count)
+
+    def _id_table(self):
+        """按 message_id 的查找表：首次使用时由索引建立，尾部超出上限时并入（调用方持锁）"""
+        import numpy as np
+
+        if self._ids is None:
+            ids = np.asarray(self._index_view()["message_id"])
+            order = np.argsort(ids, kind="stable")  # 相同 message_id 保持行号顺序
+            self._ids = (ids[order], order.astype(np.int64))
+        elif len(self._id_tail) > _ID_TAIL:
+            tail = np.array(sorted(self._id_tail), dtype=np.int64)  # 按 (message_id, 行号) 排序
+            ids, rows = self._ids
+            at = np.searchsorted(ids, tail[:, 0], side="right")  # 新行排在相同 message_id 的旧行之后
+            self._ids = (np.insert(ids, at, tail[:, 0]), np.insert(rows, at, tail[:, 1]))
+            self._id_tail.clear()
+        return self._ids
+
+    def find_message(self, message_id: int) -> int | None:
+        """message_id 所在的行号（多次出现时取最后一次），找不到返回 None"""
+        import numpy as np
+
+        with self._lock:
+            ids, rows = self._id_table()
+            for tail_id, row in reversed(self._id_tail):
+                if tail_id == message_id:
+                    return row
+            i = int(np.searchsorted(ids, message_id, side="right"))
+        return int(rows[i - 1]) if i and ids[i - 1] == message_id else None
+
+    def range_by_time(self, since: float, until: float | None = None) -> Tuple[int, int]:
+        """时间戳在 [since, until) 内的行号范围"""
+        import numpy as np
+
+        with self._lock:
+            ts = self._index_view()["ts"]
+            start = int(np.searchsorted(ts, since, side="left"))
+            stop = int(np.searchsorted(ts, until, side="left")) if until is not None else self._count
+        return start, stop
+
+    def close(self):
+        """释放映射；仍被 raw() 的视图引用的映射在视图释放后才解除"""
+        with self._lock:
+            for mm in self._segments.values():
+                try:
+                    mm.close()
+                except BufferError:
+                    pass
+            self._segments.clear()
+            self._index = None
+            self._ids = None
+            self._id_tail.clear()
+
+
+class HistoryArchive:
+    """所有群的归档"""
+
+    def __init__(self, root: str = ARCHIVE_PATH, segment_bytes: int = SEGMENT_BYTES):
+        """
+        初始化归档
+
+        Args:
+            root: 归档根目录（每个群一个子目录）
+            segment_bytes: 单个分段文件的大小上限
+        """
+        self.root = root
+        self.segment_bytes = segment_bytes
+        self._groups: Dict[str, GroupArchive] = {}
+        self._lock = threading.Lock()
+
+    def group(self, gid: str | int) -> GroupArchive:
+        """取得某个群的归档（首次访问时打开）"""
+        gid = str(gid)
+        with self._lock:
+            archive = self._groups.get(gid)
+            if archive is None:
+                archive = self._groups[gid] = GroupArchive(os.path.join(self.root, gid), self.segment_bytes)
+            return archive
+
+    def append(self, gid: str | int, lines: Sequence[str], ts: TimeStamps = None) -> int:
+        """归档某个群的历史行"""
+        return self.group(gid).append(lines, ts)
+
+    def groups(self) -> List[str]:
+        """已有归档的群号"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def close(self):
+        with self._lock:
+            for archive in self._groups.values():
+                archive.close()
+            self._groups.clear()
@@ -4,39 +4,85 @@ Bot 核心类 - 处理 WebSocket 连接和事件转发
 
 import asyncio
 import json
-import logging
-from typing import Dict, Callable, Any, List, Tuple
-import websockets
+import os
+import re
+import signal
+import threading
+import time
+from typing import Dict, Callable, Any, Iterable, List, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
 from .models import MessageInfo, EventData
-from .eventers import EventHandler, Receive#type:ignore
+from .eventers import EventHandler, Execution, Priority, Receive#type:ignore
+from .executor import HandlerExecutor
+from .log import get_logger
+from .metrics import registry
+from .inflight import InflightTable
+from .offload import ProcessOffload
+from .profiler import SamplingProfiler
 
-logger = logging.getLogger(__name__)
-logging.basicConfig(
-    level=logging.INFO,
-    format="TIME: %(asctime)s | %(levelname)s | %(message)s"
-)
+logger = get_logger("bot")
+
+EVENTS = registry.counter("bot_events_total", "收到的事件数")
+HANDLER_QUEUE_WAIT = registry.histogram("bot_handler_queue_wait_seconds", "处理器从分发到开始执行的等待时间")
+HANDLER_LANE_WAIT = registry.histogram("bot_handler_lane_wait_seconds", "各优先级通道的排队等待时间")
+HANDLER_DURATION = registry.histogram("bot_handler_duration_seconds", "处理器执行耗时")
+HANDLER_ERRORS = registry.counter("bot_handler_errors_total", "处理器异常次数")
+HANDLERS_INFLIGHT = registry.gauge("bot_handlers_inflight", "正在执行的处理器数")
+API_RTT = registry.histogram("bot_api_rtt_seconds", "API 调用往返时间")
+API_CALLS = registry.counter("bot_api_calls_total", "API 调用次数")
+PENDING_ECHO = registry.gauge("bot_pending_echo", "等待响应的 API 调用数")
+
+AT_PATTERN = re.compile(r"\[CQ:at,qq=(\d+)")
+REPLY_PATTERN = re.compile(r"\[CQ:reply,id=(-?\d+)")
+SEND_ACTIONS = {"send_msg", "send_group_msg", "send_private_msg", "send_group_forward_msg", "send_private_forward_msg"}
+SENT_IDS_LIMIT = 4096  # 记住的机器人已发消息数（用于识别回复机器人的消息）
 
 @dataclass
 class ApiCall:
     """API 调用请求"""
     action: str
     params: Dict[str, Any]
-    echo: str | None = None
+    echo: int | None = None
+
+
+@dataclass
+class BatchResult:
+    """批量 API 调用结果"""
+    calls: List[ApiCall]
+    responses: List[Dict[str, Any]]  # 与 calls 一一对应
+    failed: List[int]  # 失败调用的下标
+    elapsed: float = 0.0
+    
+    @property
+    def ok(self) -> bool:
+        """是否全部成功"""
+        return not self.failed
+    
+    def data(self, index: int, default: Any = None) -> Any:
+        """第 index 个调用返回的 data（失败时返回 default）"""
+        if index in self.failed:
+            return default
+        return self.responses[index].get("data", default)
 
 
 class Bot:
     """OneBot 11 WebSocket 客户端 Bot 类"""
     
-    def __init__(self, ws_url: str, self_id: int = 0):
+    def __init__(self, ws_url: str, self_id: int = 0, api_timeout: float = 10.0, max_inflight: int = 4096,
+                 process_workers: int | None = None, handler_workers: int = 16, handler_queue: int = 256):
         """
         初始化 Bot
         
         Args:
             ws_url: OneBot 实现端的 WebSocket 服务地址
             self_id: 机器人 QQ 号（可选）
+            api_timeout: 单个 API 调用的超时（秒）
+            max_inflight: 同时在途的 API 调用上限，超出时新调用排队等待
+            process_workers: PROCESS 处理器使用的子进程数（None 为 CPU 核数减一）
+            handler_workers: 同时执行的线程处理器数
+            handler_queue: 等待线程的处理器任务上限，超出后按事件类型的策略丢弃
         """
         self.ws_url = ws_url
         self.self_id = self_id
@@ -45,37 +91,58 @@ class Bot:
         self.notice_handlers: List[EventHandler] = []
         self.request_handlers: List[EventHandler] = []
         self.meta_event_handlers: List[EventHandler] = []
-        self._echo_responses: Dict[str, asyncio.Future] = {}
-        self._echo_counter = 0
+        self.api_timeout = api_timeout
+        self._inflight = InflightTable(capacity=max_inflight)
+        self._offload = ProcessOffload(process_workers)
+        self._executor = HandlerExecutor(handler_workers, handler_queue)
+        self._sent_ids: Dict[int, None] = {}  # 机器人最近发出的消息 ID（有序，超出上限丢弃最早的）
+        self._sent_ids_lock = threading.Lock()  # 快照线程导出时事件循环仍在写入
+        self._event_tasks: set[asyncio.Task] = set()
         self._loop: asyncio.AbstractEventLoop | None = None
         self.websocket = None  # 保存主 WebSocket 连接
+        self._active_handlers: Dict[int, str] = {}  # 线程 ident -> 正在执行的处理器
+        self._handler_wall: Dict[str, float] = {}  # 各处理器累计墙钟时间
+        self._handler_wall_lock = threading.Lock()
+        self._profiler: SamplingProfiler | None = None
+        self._stopping = False
+        PENDING_ECHO.set_function(lambda: len(self._inflight))
         
-    def register_message_handler(self, handler: EventHandler):
-        """注册消息处理器"""
+    def register_message_handler(self, handler: EventHandler, priority: int | None = None):
+        """注册消息处理器（priority 覆盖处理器自身的优先级）"""
+        if priority is not None:
+            handler.priority = priority
         self.message_handlers.append(handler)
         
-    def register_notice_handler(self, handler: EventHandler):
+    def register_notice_handler(self, handler: EventHandler, priority: int | None = None):
         """注册通知处理器"""
+        if priority is not None:
+            handler.priority = priority
         self.notice_handlers.append(handler)
         
-    def register_request_handler(self, handler: EventHandler):
+    def register_request_handler(self, handler: EventHandler, priority: int | None = None):
         """注册请求处理器"""
+        if priority is not None:
+            handler.priority = priority
         self.request_handlers.append(handler)
         
-    def register_meta_event_handler(self, handler: EventHandler):
+    def register_meta_event_handler(self, handler: EventHandler, priority: int | None = None):
         """注册元事件处理器"""
+        if priority is not None:
+            handler.priority = priority
         self.meta_event_handlers.append(handler)
     
     async def _connect(self):
         """建立 WebSocket 连接"""
         try:
+            import websockets  # 导入较慢（读取包元数据），连接时才导入
+            
             # 保存事件循环引用
             self._loop = asyncio.get_event_loop()
             
             async with websockets.connect(self.ws_url) as websocket:
                 self.websocket = websocket  # 保存 WebSocket 连接
                 self.connected = True
-                logger.info(f"已连接到 {self.ws_url}")
+                logger.info("已连接到 %s", self.ws_url)
                 
                 # 创建接收消息任务
                 receive_task = asyncio.create_task(
@@ -91,11 +158,12 @@ class Bot:
                     logger.info("已断开连接")
                     
         except Exception as e:
-            logger.error(f"连接错误: {e}")
+            logger.error("连接错误: %s", e)
             self.connected = False
             # 重连逻辑
             await asyncio.sleep(5)
-            await self._connect()
+            if not self._stopping:
+                await self._connect()
     
     async def _receive_loop(self, websocket):
         """接收并处理 WebSocket 消息"""
@@ -103,17 +171,35 @@ class Bot:
             async for message in websocket:
                 try:
                     data = json.loads(message)
-                    await self._handle_event(data)
                 except json.JSONDecodeError as e:
-                    logger.error(f"JSON 解析错误: {e}")
-                except Exception as e:
-                    logger.error(f"处理事件出错: {e}")
+                    logger.error("JSON 解析错误: %s", e)
+                    continue
+
+                if "post_type" in data:
+                    # 事件交给独立任务处理，接收循环不被处理器阻塞，
+                    # 否则处理器内发起的 API 调用收不到响应
+                    task = asyncio.create_task(self._dispatch_event(data))
+                    self._event_tasks.add(task)
+                    task.add_done_callback(self._event_tasks.discard)
+                else:
+                    await self._handle_event(data)
         except asyncio.CancelledError:
             pass
     
+    async def _dispatch_event(self, data: Dict[str, Any]):
+        """在独立任务中处理事件"""
+        try:
+            await self._handle_event(data)
+        except Exception as e:
+            logger.error("处理事件出错: %s", e)
+    
     async def _handle_event(self, data: Dict[str, Any]):
         """处理接收到的事件"""
         post_type = data.get("post_type")
+        if post_type:
+            EVENTS.inc(post_type=post_type)
+            if not self.self_id and data.get("self_id"):
+                self.self_id = data["self_id"]  # self_id 为 0 时从事件中获取
         
         if post_type == "message":
             await self._handle_message(data)
@@ -125,55 +211,155 @@ class Bot:
             await self._handle_meta_event(data)
         else:
             # 处理 API 响应
-            echo = data.get("echo")
-            if echo and echo in self._echo_responses:
-                future = self._echo_responses.pop(echo)
-                if not future.done():
-                    future.set_result(data)
+            self._inflight.resolve(data.get("echo"), data)
     
     async def _handle_message(self, data: Dict[str, Any]):
         """处理消息事件"""
         info = MessageInfo.from_event(data, self.self_id)
+        derived = self._message_priority(info)
         
-        for handler in self.message_handlers:
-            if handler.should_process(info):
-                try:
-                    await asyncio.to_thread(handler.execute, self, info)
-                except Exception as e:
-                    logger.error(f"消息处理器执行出错: {e}")
+        # 同一条消息匹配多个处理器时，命令等高优先级处理器先执行
+        matched = [
+            (self._handler_priority(handler, derived), handler)
+            for handler in self.message_handlers if handler.should_process(info)
+        ]
+        matched.sort(key=lambda item: -item[0])
+        for priority, handler in matched:
+            try:
+                await self._run_handler("message", handler, info, priority)
+            except Exception as e:
+                logger.error("消息处理器执行出错: %s", e)
+    
+    def _message_priority(self, info: MessageInfo) -> int:
+        """由消息内容推断优先级：@机器人或回复机器人的消息为 HIGH"""
+        raw = info.raw_message
+        if "[CQ:" not in raw:
+            return Priority.NORMAL
+        if self.self_id and str(self.self_id) in AT_PATTERN.findall(raw):
+            return Priority.HIGH
+        match = REPLY_PATTERN.search(raw)
+        if match and int(match.group(1)) in self._sent_ids:
+            return Priority.HIGH
+        return Priority.NORMAL
+    
+    @staticmethod
+    def _handler_priority(handler: EventHandler, derived: int) -> int:
+        """处理器显式指定的优先级优先，其次命令处理器为 COMMAND，否则使用推断值"""
+        if handler.priority is not None:
+            return handler.priority
+        if handler.is_command:
+            return Priority.COMMAND
+        return derived
+    
+    def dump_state(self) -> Dict[str, Any]:
+        """导出可在重启后恢复的运行时状态（用于状态快照）"""
+        with self._sent_ids_lock:
+            return {"sent_ids": list(self._sent_ids)}
+    
+    def load_state(self, state: Dict[str, Any]):
+        """恢复 dump_state 导出的状态"""
+        for message_id in state.get("sent_ids", []):
+            self._remember_sent(message_id)
+    
+    def _remember_sent(self, message_id: int):
+        """记录机器人发出的消息 ID"""
+        with self._sent_ids_lock:
+            self._sent_ids[message_id] = None
+            if len(self._sent_ids) > SENT_IDS_LIMIT:
+                del self._sent_ids[next(iter(self._sent_ids))]
     
     async def _handle_notice(self, data: Dict[str, Any]):
         """处理通知事件"""
         notice_type = data.get("notice_type")
-        logger.info(f"通知事件: {notice_type}")
+        logger.debug("通知事件: %s", notice_type)
         
         for handler in self.notice_handlers:
             try:
-                await asyncio.to_thread(handler.execute, self, data)
+                await self._run_handler("notice", handler, data, self._handler_priority(handler, Priority.NORMAL))
             except Exception as e:
-                logger.error(f"通知处理器执行出错: {e}")
+                logger.error("通知处理器执行出错: %s", e)
     
     async def _handle_request(self, data: Dict[str, Any]):
         """处理请求事件"""
         request_type = data.get("request_type")
-        logger.info(f"请求事件: {request_type}")
+        logger.info("请求事件: %s", request_type)
         
         for handler in self.request_handlers:
             try:
-                await asyncio.to_thread(handler.execute, self, data)
+                await self._run_handler("request", handler, data, self._handler_priority(handler, Priority.NORMAL))
             except Exception as e:
-                logger.error(f"请求处理器执行出错: {e}")
+                logger.error("请求处理器执行出错: %s", e)
     
     async def _handle_meta_event(self, data: Dict[str, Any]):
         """处理元事件"""
         meta_event_type = data.get("meta_event_type")
-        logger.info(f"元事件: {meta_event_type}")
+        logger.debug("元事件: %s", meta_event_type)
+        derived = Priority.LOW if meta_event_type == "heartbeat" else Priority.NORMAL
         
         for handler in self.meta_event_handlers:
             try:
-                await asyncio.to_thread(handler.execute, self, data)
+                await self._run_handler("meta_event", handler, data, self._handler_priority(handler, derived))
             except Exception as e:
-                logger.error(f"元事件处理器执行出错: {e}")
+                logger.error("元事件处理器执行出错: %s", e)
+    
+    async def _run_handler(self, kind: str, handler: EventHandler, info: Any, priority: int = Priority.NORMAL):
+        """按处理器的执行方式执行，并记录排队等待和执行耗时"""
+        queued = time.perf_counter()
+        
+        if handler.execution == Execution.INLINE:
+            HANDLER_QUEUE_WAIT.observe(0.0, kind=kind)
+            HANDLERS_INFLIGHT.inc()
+            try:
+                await handler.execute_inline(self, info)
+            except Exception:
+                HANDLER_ERRORS.inc(kind=kind, handler=handler.name)
+                raise
+            finally:
+                HANDLERS_INFLIGHT.dec()
+                self._record_handler_time(kind, handler.name, time.perf_counter() - queued)
+            return
+        
+        if handler.execution == Execution.PROCESS:
+            HANDLERS_INFLIGHT.inc()
+            try:
+                result = await self._offload.run(handler.callback, info)  # type: ignore
+            except Exception:
+                HANDLER_ERRORS.inc(kind=kind, handler=handler.name)
+                raise
+            finally:
+                HANDLERS_INFLIGHT.dec()
+                self._record_handler_time(kind, handler.name, time.perf_counter() - queued)
+            if handler.result_callback is None:
+                return
+            callback = handler.result_callback
+            execute = lambda: callback(self, info, result)
+        else:
+            execute = lambda: handler.execute(self, info)
+        
+        def run():
+            start = time.perf_counter()
+            HANDLER_QUEUE_WAIT.observe(start - queued, kind=kind)
+            HANDLER_LANE_WAIT.observe(start - queued, lane=Priority.NAMES.get(priority, str(priority)))
+            HANDLERS_INFLIGHT.inc()
+            ident = threading.get_ident()
+            self._active_handlers[ident] = handler.name
+            try:
+                execute()
+            except Exception:
+                HANDLER_ERRORS.inc(kind=kind, handler=handler.name)
+                raise
+            finally:
+                self._active_handlers.pop(ident, None)
+                HANDLERS_INFLIGHT.dec()
+                self._record_handler_time(kind, handler.name, time.perf_counter() - start)
+        
+        await self._executor.run(kind, run, priority)
+    
+    def _record_handler_time(self, kind: str, name: str, elapsed: float):
+        """记录处理器耗时（指标与剖析用的累计墙钟时间）"""
+        HANDLER_DURATION.observe(elapsed, kind=kind, handler=name)
+        with self._handler_wall_lock:
+            self._handler_wall[name] = self._handler_wall.get(name, 0.0) + elapsed
     
     async def _send_api_call(self, action: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
         """发送 API 调用请求"""
@@ -187,8 +373,14 @@ class Bot:
             return {"status": "failed", "retcode": -1}
         
         params = params or {}
-        self._echo_counter += 1
-        echo = f"echo_{self._echo_counter}"
+        start = time.perf_counter()
+        try:
+            # 在途表已满时排队，最多等一个超时周期
+            echo, future = await self._inflight.acquire(self.api_timeout, wait=self.api_timeout)
+        except asyncio.TimeoutError:
+            logger.error("在途 API 调用过多，放弃: %s", action)
+            API_CALLS.inc(action=action, status="overload")
+            return {"status": "failed", "retcode": -1}
         
         request = {
             "action": action,
@@ -196,47 +388,40 @@ class Bot:
             "echo": echo
         }
         
-        future = asyncio.Future()
-        self._echo_responses[echo] = future
-        
         try:
-            # 通过事件循环发送（在子线程中调用此方法时）
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # 在运行的事件循环中，需要通过线程池发送
-                await self._ws_send_json(request, echo)
-            else:
-                await self._ws_send_json(request, echo)
+            await self._ws_send_json(request, echo)
             
-            # 等待响应（带超时）
-            response = await asyncio.wait_for(future, timeout=10.0)
+            # 等待响应，超时由在途表的时间轮统一触发
+            response = await future
+            API_RTT.observe(time.perf_counter() - start, action=action)
+            API_CALLS.inc(action=action, status=response.get("status", "unknown"))
+            if action in SEND_ACTIONS:
+                message_id = (response.get("data") or {}).get("message_id")
+                if message_id is not None:
+                    self._remember_sent(message_id)
             return response
         except asyncio.TimeoutError:
-            logger.error(f"API 调用超时: {action}")
+            logger.error("API 调用超时: %s", action)
+            API_CALLS.inc(action=action, status="timeout")
             return {"status": "failed", "retcode": -1}
         except Exception as e:
-            logger.error(f"API 调用错误: {e}")
+            logger.error("API 调用错误: %s", e)
+            API_CALLS.inc(action=action, status="error")
             return {"status": "failed", "retcode": -1}
         finally:
-            self._echo_responses.pop(echo, None)
+            self._inflight.release(echo)
     
-    async def _ws_send_json(self, data: Dict[str, Any], echo: str):
+    async def _ws_send_json(self, data: Dict[str, Any], echo: int):
         """通过 WebSocket 发送 JSON 数据"""
         try:
             if self.websocket is not None:
                 await self.websocket.send(json.dumps(data))
             else:
-                logger.error(f"WebSocket 连接未建立或已关闭")
-                if echo in self._echo_responses:
-                    future = self._echo_responses[echo]
-                    if not future.done():
-                        future.set_exception(Exception("WebSocket 未连接"))
+                logger.error("WebSocket 连接未建立或已关闭")
+                self._inflight.fail(echo, Exception("WebSocket 未连接"))
         except Exception as e:
-            logger.error(f"WebSocket 发送失败: {e}")
-            if echo in self._echo_responses:
-                future = self._echo_responses[echo]
-                if not future.done():
-                    future.set_exception(e)
+            logger.error("WebSocket 发送失败: %s", e)
+            self._inflight.fail(echo, e)
     
     def _call_api(self, action: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
         """
@@ -261,9 +446,10 @@ class Bot:
                 loop
             )
             try:
-                response = future.result(timeout=360)
+                # 内层已有超时，这里只兜底排队等待与事件循环卡死
+                response = future.result(timeout=self.api_timeout * 2 + 5)
             except Exception as e:
-                logger.error(f"API 调用失败: {e}")
+                logger.error("API 调用失败: %s", e)
                 response = {"status": "failed", "retcode": -1}
         else:
             # 尝试获取当前事件循环
@@ -274,7 +460,7 @@ class Bot:
                         self._send_api_call(action, params),
                         loop
                     )
-                    response = future.result(timeout=10.0)
+                    response = future.result(timeout=self.api_timeout * 2 + 5)
                 else:
                     response = asyncio.run(self._send_api_call(action, params))
             except RuntimeError:
@@ -282,103 +468,182 @@ class Bot:
         
         return response
     
+    async def abatch(self, calls: Iterable[ApiCall | Tuple[str, Dict[str, Any]]], timeout: float = 30.0) -> BatchResult:
+        """
+        并发发送一批 API 调用（协程版本，在事件循环中使用）
+        
+        所有请求各自带唯一 echo 连续写入同一个 WebSocket，再统一等待响应，
+        整批耗时约为一次往返而不是 N 次。
+        
+        Args:
+            calls: ApiCall 或 (action, params) 元组
+            timeout: 整批超时（秒），超时未返回的调用记为失败
+        
+        Returns:
+            BatchResult: 批量结果
+        """
+        items = [c if isinstance(c, ApiCall) else ApiCall(c[0], c[1] or {}) for c in calls]
+        start = time.perf_counter()
+        tasks = [asyncio.ensure_future(self._send_api_call(c.action, c.params)) for c in items]
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+        
+        responses: List[Dict[str, Any]] = []
+        failed: List[int] = []
+        for i, task in enumerate(tasks):
+            if task.done() and not task.cancelled():
+                response = task.result()
+            else:
+                task.cancel()
+                response = {"status": "failed", "retcode": -1, "wording": "batch timeout"}
+            if response.get("status") not in ("ok", "async"):
+                failed.append(i)
+            responses.append(response)
+        
+        result = BatchResult(items, responses, failed, time.perf_counter() - start)
+        if failed:
+            logger.warning("批量 API 调用部分失败: %s/%s", len(failed), len(items),
+                           extra={"fields": {"actions": ",".join(sorted({items[i].action for i in failed}))}})
+        return result
+    
+    def batch(self, calls: Iterable[ApiCall | Tuple[str, Dict[str, Any]]], timeout: float = 30.0) -> BatchResult:
+        """
+        并发发送一批 API 调用（同步版本，在处理器线程中使用）
+        
+        Args:
+            calls: ApiCall 或 (action, params) 元组
+            timeout: 整批超时（秒）
+        
+        Returns:
+            BatchResult: 批量结果
+        """
+        items = [c if isinstance(c, ApiCall) else ApiCall(c[0], c[1] or {}) for c in calls]
+        loop = self._loop
+        if loop and loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(self.abatch(items, timeout), loop)
+            try:
+                return future.result(timeout=timeout + 5)
+            except Exception as e:
+                logger.error("批量 API 调用失败: %s", e)
+        
+        responses = [{"status": "failed", "retcode": -1} for _ in items]
+        return BatchResult(items, responses, list(range(len(items))))
+    
+    def start_profile(self, duration: float = 30.0, output_dir: str = "./data/profiles",
+                      interval: float = 0.005, on_finish: Callable[[str], None] | None = None) -> bool:
+        """
+        开始一次限时采样剖析（非阻塞）
+        
+        覆盖事件循环线程与所有处理器线程，结束后写出火焰图可用的 .folded 文件
+        和按处理器汇总墙钟时间的 .txt 文件。
+        
+        Args:
+            duration: 采样时长（秒）
+            output_dir: 输出目录
+            interval: 采样间隔（秒）
+            on_finish: 完成后调用，参数为 .folded 文件路径
+        
+        Returns:
+            bool: 已有剖析在进行时返回 False
+        """
+        if self._profiler is not None and self._profiler.running:
+            return False
+        
+        with self._handler_wall_lock:
+            wall_before = dict(self._handler_wall)
+        
+        def finish(profiler: SamplingProfiler):
+            with self._handler_wall_lock:
+                wall = {k: v - wall_before.get(k, 0.0) for k, v in self._handler_wall.items()}
+            wall = {k: v for k, v in wall.items() if v > 0}
+            
+            os.makedirs(output_dir, exist_ok=True)
+            base = os.path.join(output_dir, datetime.now().strftime("profile-%Y%m%d-%H%M%S"))
+            profiler.write_folded(base + ".folded")
+            profiler.write_summary(base + ".txt", wall)
+            logger.info("性能剖析完成: %s", base + ".folded")
+            if on_finish:
+                on_finish(base + ".folded")
+        
+        self._profiler = SamplingProfiler(interval, thread_labels=lambda: dict(self._active_handlers))
+        logger.info("开始性能剖析: %ss", duration)
+        return self._profiler.start(duration, finish)
+    
+    def enable_profile_signal(self, duration: float = 30.0, output_dir: str = "./data/profiles") -> bool:
+        """
+        收到 SIGUSR1 时开始性能剖析（需在主线程调用，Windows 不支持）
+        
+        Returns:
+            bool: 当前平台是否支持
+        """
+        if not hasattr(signal, "SIGUSR1"):
+            return False
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self.start_profile(duration, output_dir))
+        return True
+    
     def run(self):
         """启动 Bot（阻塞式）"""
         try:
             asyncio.run(self._connect())
         except KeyboardInterrupt:
             logger.info("正在关闭...")
+        finally:
+            self._offload.shutdown(wait=False)
+            self._executor.shutdown()
+    
+    def stop(self):
+        """断开连接并停止重连，使 run() 返回（可在其他线程调用）"""
+        self._stopping = True
+        loop, websocket = self._loop, self.websocket
+        if loop and loop.is_running() and websocket is not None:
+            asyncio.run_coroutine_threadsafe(websocket.close(), loop)
     
     # ========== OneBot 11 API 接口 ==========
     
-    def send_private_msg(self, user_id: int | None, message: str, auto_escape: bool = False) -> int:
-        """发送私聊消息"""
+    def send_private_msg(self, user_id: int | None, message: str | List[Dict[str, Any]], auto_escape: bool = False) -> int:
+        """发送私聊消息（message 可为 CQ 码字符串或数组格式消息段列表）"""
         if user_id is None:
             return -1
-
-        # 获取事件循环
-        loop = self._loop
-        if loop and loop.is_running():
-            # 使用保存的事件循环发送
-            future = asyncio.run_coroutine_threadsafe(
-                self._send_api_call("send_private_msg", {
-                    "user_id": user_id,
-                    "message": message,
-                    "auto_escape": auto_escape
-                }),
-                loop
-            )
-            response = future.result(timeout=360)
-        else:
-            # 尝试获取当前事件循环
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    future = asyncio.run_coroutine_threadsafe(
-                        self._send_api_call("send_private_msg", {
-                            "user_id": user_id,
-                            "message": message,
-                            "auto_escape": auto_escape
-                        }),
-                        loop
-                    )
-                    response = future.result(timeout=360)
-                else:
-                    response = asyncio.run(self._send_api_call("send_private_msg", {
-                        "user_id": user_id,
-                        "message": message,
-                        "auto_escape": auto_escape
-                    }))
-            except RuntimeError:
-                response = {"status": "failed", "retcode": -1}
-        
+        response = self._call_api("send_private_msg", {
+            "user_id": user_id,
+            "message": message,
+            "auto_escape": auto_escape
+        })
         return response.get("data", {}).get("message_id", -1)
     
-    def send_group_msg(self, group_id: int | None, message: str, auto_escape: bool = False) -> int:
-        """发送群聊消息"""
+    def send_group_msg(self, group_id: int | None, message: str | List[Dict[str, Any]], auto_escape: bool = False) -> int:
+        """发送群聊消息（message 可为 CQ 码字符串或数组格式消息段列表）"""
         if group_id is None:
             return -1
-
-        # 获取事件循环
-        loop = self._loop
-        if loop and loop.is_running():
-            # 使用保存的事件循环发送
-            future = asyncio.run_coroutine_threadsafe(
-                self._send_api_call("send_group_msg", {
-                    "group_id": group_id,
-                    "message": message,
-                    "auto_escape": auto_escape
-                }),
-                loop
-            )
-            response = future.result(timeout=360)
-        else:
-            # 尝试获取当前事件循环
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    future = asyncio.run_coroutine_threadsafe(
-                        self._send_api_call("send_group_msg", {
-                            "group_id": group_id,
-                            "message": message,
-                            "auto_escape": auto_escape
-                        }),
-                        loop
-                    )
-                    response = future.result(timeout=360)
-                else:
-                    response = asyncio.run(self._send_api_call("send_group_msg", {
-                        "group_id": group_id,
-                        "message": message,
-                        "auto_escape": auto_escape
-                    }))
-            except RuntimeError:
-                response = {"status": "failed", "retcode": -1}
-        
+        response = self._call_api("send_group_msg", {
+            "group_id": group_id,
+            "message": message,
+            "auto_escape": auto_escape
+        })
         return response.get("data", {}).get("message_id", -1)
     
+    def send_group_forward_msg(self, group_id: int | None, messages: List[Dict[str, Any]]) -> int:
+        """发送群合并转发消息（messages 为 node 消息段列表）"""
+        if group_id is None:
+            return -1
+        response = self._call_api("send_group_forward_msg", {
+            "group_id": group_id,
+            "messages": messages
+        })
+        return (response.get("data") or {}).get("message_id", -1)
+    
+    def send_private_forward_msg(self, user_id: int | None, messages: List[Dict[str, Any]]) -> int:
+        """发送私聊合并转发消息（messages 为 node 消息段列表）"""
+        if user_id is None:
+            return -1
+        response = self._call_api("send_private_forward_msg", {
+            "user_id": user_id,
+            "messages": messages
+        })
+        return (response.get("data") or {}).get("message_id", -1)
+    
     def send_msg(self, message_type: str, user_id: int | None, group_id: int | None, 
-                 message: str = "", auto_escape: bool = False) -> int:
+                 message: str | List[Dict[str, Any]] = "", auto_escape: bool = False) -> int:
         """发送消息（通用）"""
         if message_type == "private":
             return self.send_private_msg(user_id, message, auto_escape)
@@ -390,6 +655,10 @@ class Bot:
         """撤回消息"""
         self._call_api("delete_msg", {"message_id": message_id})
     
+    def delete_msg_batch(self, message_ids: Iterable[int]) -> BatchResult:
+        """批量撤回消息"""
+        return self.batch(("delete_msg", {"message_id": m}) for m in message_ids)
+    
     def get_msg(self, message_id: int) -> Dict[str, Any]:
         """获取消息"""
         response = self._call_api("get_msg", {"message_id": message_id})
@@ -471,6 +740,17 @@ class Bot:
         })
         return response.get("data", {})
     
+    def get_group_member_info_batch(self, group_id: int, user_ids: Iterable[int],
+                                    no_cache: bool = False) -> Dict[int, Dict[str, Any]]:
+        """批量获取群成员信息，返回 {user_id: 信息}（失败的成员不在结果中）"""
+        user_ids = list(user_ids)
+        result = self.batch(("get_group_member_info", {
+            "group_id": group_id,
+            "user_id": user_id,
+            "no_cache": no_cache
+        }) for user_id in user_ids)
+        return {user_id: result.data(i) for i, user_id in enumerate(user_ids) if i not in result.failed}
+    
     def get_group_member_list(self, group_id: int) -> List[Dict[str, Any]]:
         """获取群成员列表"""
         response = self._call_api("get_group_member_list", {"group_id": group_id})
@@ -501,6 +781,14 @@ class Bot:
             "duration": duration
         })
     
+    def set_group_ban_batch(self, group_id: int, user_ids: Iterable[int], duration: int = 0) -> BatchResult:
+        """批量群组禁言"""
+        return self.batch(("set_group_ban", {
+            "group_id": group_id,
+            "user_id": user_id,
+            "duration": duration
+        }) for user_id in user_ids)
+    
     def set_group_anonymous_ban(self, group_id: int, anonymous_flag: str, duration: int = 0):
         """群组匿名禁言"""
         self._call_api("set_group_anonymous_ban", {
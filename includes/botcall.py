@@ -0,0 +1,165 @@
+"""
+BOTCALL 解释器 - 解析模型回复中的 BOTCALL[类别,命令,参数] 并执行
+
+整段回复用一个预编译正则扫描一遍，命令按 (类别, 命令) 查表分发，参数在执行前校验；
+各命令产生的 API 调用收集起来用 Bot.batch 一次并发发出。新增命令只是多一个表项，
+不影响每条回复的解析速度。
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
+
+from .bot import ApiCall
+from .log import get_logger
+from .metrics import registry
+
+if TYPE_CHECKING:
+    from .bot import Bot
+    from .msgindex import MessageIndex
+
+logger = get_logger("botcall")
+
+BOTCALL_PATTERN = re.compile(r"BOTCALL\[\s*(\w+)\s*,\s*(\w+)\s*(?:,\s*([^\]\n]*?))?\s*\]")
+
+BOTCALL_COMMANDS = registry.counter("botcall_commands_total", "执行的 BOTCALL 命令数")
+
+EMOJI_IDS = {
+    "xbs": 424,
+    "sugar": 147,
+    "qu": 128027,
+}
+
+
+class BotCallError(ValueError):
+    """BOTCALL 参数无效"""
+
+
+@dataclass
+class BotCallContext:
+    """一条回复中所有 BOTCALL 的执行上下文"""
+    group_id: int
+    user_id: int
+    message_id: int  # 触发回复的消息
+    index: "MessageIndex | None" = None  # 用于校验参数中的 message_id
+    reply_to: int | None = None  # msg,reply 指定的回复对象
+    calls: List[ApiCall] = field(default_factory=list)  # 并发执行的调用
+    then: List[ApiCall] = field(default_factory=list)  # calls 完成后再执行的调用
+    executed: List[str] = field(default_factory=list)  # 已执行的命令名
+
+
+Converter = Callable[[BotCallContext, str], Any]
+Handler = Callable[[BotCallContext, Any], None]
+
+
+class BotCallInterpreter:
+    """BOTCALL 命令表与执行"""
+
+    def __init__(self):
+        self._commands: Dict[Tuple[str, str], Tuple[Handler, Converter | None]] = {}
+
+    def command(self, kind: str, name: str, arg: Converter | None = None):
+        """
+        注册命令的装饰器
+
+        Args:
+            kind: 类别（BOTCALL[类别,命令,参数] 的第一项）
+            name: 命令名
+            arg: 参数转换函数 (ctx, 原始参数) -> 值，参数无效时抛出 BotCallError；None 为忽略参数
+        """
+        def decorator(handler: Handler) -> Handler:
+            self._commands[(kind, name)] = (handler, arg)
+            return handler
+        return decorator
+
+    def parse(self, text: str) -> List[Tuple[str, str, str]]:
+        """提取回复中的所有 (类别, 命令, 参数)"""
+        if "BOTCALL[" not in text:
+            return []
+        return [(m.group(1), m.group(2), m.group(3) or "") for m in BOTCALL_PATTERN.finditer(text)]
+
+    def run(self, bot: "Bot", ctx: BotCallContext, text: str) -> BotCallContext:
+        """
+        执行回复中的所有 BOTCALL
+
+        未知命令和参数无效的命令记录后跳过，不影响其他命令。
+        """
+        for kind, name, raw in self.parse(text):
+            command = f"{kind}.{name}"
+            entry = self._commands.get((kind, name))
+            if entry is None:
+                BOTCALL_COMMANDS.inc(command="unknown", result="unknown")
+                logger.warning("未知的 BOTCALL 命令: %s", command)
+                continue
+            handler, converter = entry
+            try:
+                value = converter(ctx, raw) if converter is not None else None
+            except BotCallError as e:
+                BOTCALL_COMMANDS.inc(command=command, result="invalid")
+                logger.warning("忽略参数无效的 BOTCALL: %s: %s", command, e,
+                               extra={"fields": {"group_id": ctx.group_id}})
+                continue
+            handler(ctx, value)
+            ctx.executed.append(command)
+            BOTCALL_COMMANDS.inc(command=command, result="ok")
+
+        if ctx.calls:
+            bot.batch(ctx.calls)
+        if ctx.then:
+            bot.batch(ctx.then)
+        return ctx
+
+
+# ========== 参数 ==========
+
+def message_id_arg(ctx: BotCallContext, raw: str) -> int:
+    """本群收到过的消息 ID"""
+    try:
+        message_id = int(raw.strip().strip("[]"))
+    except ValueError:
+        raise BotCallError(f"不是消息 ID: {raw!r}")
+    if ctx.index is not None and ctx.index.resolve(message_id, ctx.group_id) is None:
+        raise BotCallError(f"本群没有这条消息: {message_id}")
+    return message_id
+
+
+def emoji_arg(ctx: BotCallContext, raw: str) -> int:
+    """EMOJI_IDS 中的表情名"""
+    emoji_id = EMOJI_IDS.get(raw.strip().strip("[]"))
+    if emoji_id is None:
+        raise BotCallError(f"未知的表情: {raw!r}")
+    return emoji_id
+
+
+# ========== 命令 ==========
+
+interpreter = BotCallInterpreter()
+
+
+@interpreter.command("send", "emoji", arg=emoji_arg)
+def send_emoji(ctx: BotCallContext, emoji_id: int):
+    """给触发回复的消息贴表情"""
+    ctx.calls.append(ApiCall("set_msg_emoji_like", {"message_id": ctx.message_id, "emoji_id": emoji_id, "set": True}))
+
+
+@interpreter.command("send", "mute")
+def send_mute(ctx: BotCallContext, _):
+    """禁言触发回复的用户后立即解除"""
+    ctx.calls.append(ApiCall("set_group_ban", {"group_id": ctx.group_id, "user_id": ctx.user_id, "duration": 600}))
+    ctx.then.append(ApiCall("set_group_ban", {"group_id": ctx.group_id, "user_id": ctx.user_id, "duration": 0}))
+
+
+@interpreter.command("msg", "reply", arg=message_id_arg)
+def msg_reply(ctx: BotCallContext, message_id: int):
+    """回复指定消息（由发送回复时引用，不产生 API 调用）"""
+    ctx.reply_to = message_id
+
+
+@interpreter.command("msg", "recall", arg=message_id_arg)
+def msg_recall(ctx: BotCallContext, message_id: int):
+    ctx.calls.append(ApiCall("delete_msg", {"message_id": message_id}))
+
+
+@interpreter.command("msg", "essence", arg=message_id_arg)
+def msg_essence(ctx: BotCallContext, message_id: int):
+    ctx.calls.append(ApiCall("set_essence_msg", {"message_id": message_id}))
@@ -0,0 +1,70 @@
+"""
+消息合并 - 按群合并突发消息，避免同一个群同时发起多次 LLM 调用
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List
+
+
+class MessageCoalescer:
+    """按 key（通常是群号）合并突发消息"""
+
+    def __init__(self, window: float = 0.4, max_batch: int = 20):
+        """
+        初始化合并器
+
+        Args:
+            window: 合并窗口（秒），窗口内到达的消息并入同一批
+            max_batch: 单批最多保留的消息数（保留最新的）
+        """
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, List[Any]] = {}
+
+    def submit(self, key: Hashable, item: Any, process: Callable[[List[Any]], None]) -> bool:
+        """
+        提交一条消息
+
+        若该 key 已有窗口或生成在进行，消息并入待处理批次后立即返回；
+        否则当前线程负责处理：等待窗口结束后把整批交给 process，
+        生成期间新到达的消息在本轮结束后合并为下一批继续处理。
+
+        Args:
+            key: 合并键（群号）
+            item: 消息
+            process: 批处理函数，参数为按到达顺序排列的消息列表
+
+        Returns:
+            bool: 当前线程是否执行了 process
+        """
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                pending.append(item)
+                return False
+            self._pending[key] = [item]
+
+        try:
+            while True:
+                time.sleep(self.window)
+                with self._lock:
+                    batch = self._pending[key]
+                    self._pending[key] = []
+
+                process(batch[-self.max_batch:])
+
+                with self._lock:
+                    if not self._pending[key]:
+                        del self._pending[key]
+                        return True
+        except BaseException:
+            with self._lock:
+                self._pending.pop(key, None)
+            raise
+
+    def pending(self) -> Dict[Hashable, List[Any]]:
+        """尚未开始处理的消息（按 key 复制；正在生成回复的批次不包含在内）"""
+        with self._lock:
+            return {key: list(items) for key, items in self._pending.items() if items}
@@ -0,0 +1,130 @@
+"""
+回复去重 - 近似重复回复的检测，以及相同触发消息的短时复用
+
+每个群保留最近若干条 bot 回复的字符 shingle 集合，新回复发送前与它们比较 Jaccard 相似度，
+超过阈值视为重复（丢弃或重新生成一次）。短时间内相同的触发消息直接复用上一次的生成结果，
+不再调用 LLM；复用是有意的重复（同样的问题给同样的回答），不经过去重。
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import deque
+from typing import Deque, Dict, FrozenSet, Hashable, Tuple
+
+from .metrics import registry
+
+NORMALIZE_PATTERN = re.compile(r"[\s\W_]+")
+
+REPLY_DUPLICATES = registry.counter("reply_duplicates_total", "检测到的近似重复回复数")
+TRIGGER_REUSE = registry.counter("trigger_reuse_total", "复用生成结果的触发消息数")
+
+
+def normalize(text: str) -> str:
+    """全半角统一、转小写、去掉空白和标点"""
+    return NORMALIZE_PATTERN.sub("", unicodedata.normalize("NFKC", text).lower())
+
+
+def shingles(text: str, size: int = 3) -> FrozenSet[int]:
+    """规范化后文本的字符 n-gram 哈希集合（短于 size 时为整段）"""
+    text = normalize(text)
+    if len(text) <= size:
+        return frozenset((hash(text),)) if text else frozenset()
+    return frozenset(hash(text[i:i + size]) for i in range(len(text) - size + 1))
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ReplyDeduper:
+    """按群记录最近的回复并检测近似重复（线程安全）"""
+
+    def __init__(self, history: int = 20, window: float = 600.0, threshold: float = 0.8, regenerate: bool = True):
+        """
+        初始化去重器
+
+        Args:
+            history: 每个群保留的最近回复数
+            window: 只和这么多秒以内的回复比较
+            threshold: Jaccard 相似度阈值，达到即视为重复
+            regenerate: 重复时重新生成一次（False 为直接丢弃）
+        """
+        self.history = history
+        self.window = window
+        self.threshold = threshold
+        self.regenerate = regenerate
+        self._recent: Dict[Hashable, Deque[Tuple[float, FrozenSet[int], str]]] = {}
+        self._lock = threading.Lock()
+
+    def similar(self, group_id: Hashable, text: str, now: float | None = None) -> str | None:
+        """
+        查找与 text 近似重复的最近回复
+
+        Returns:
+            str | None: 最相似且达到阈值的回复，没有时为 None
+        """
+        now = time.time() if now is None else now
+        target = shingles(text)
+        best, best_score = None, self.threshold
+        with self._lock:
+            for ts, signature, reply in self._recent.get(group_id, ()):
+                if now - ts > self.window:
+                    continue
+                score = jaccard(target, signature)
+                if score >= best_score:
+                    best, best_score = reply, score
+        if best is not None:
+            REPLY_DUPLICATES.inc()
+        return best
+
+    def remember(self, group_id: Hashable, text: str, now: float | None = None):
+        """记录一条已发送的回复"""
+        now = time.time() if now is None else now
+        with self._lock:
+            recent = self._recent.get(group_id)
+            if recent is None:
+                recent = self._recent[group_id] = deque(maxlen=self.history)
+            recent.append((now, shingles(text), text))
+
+
+class TriggerCache:
+    """短时间内相同触发消息的生成结果复用（线程安全）"""
+
+    def __init__(self, window: float = 30.0):
+        """
+        Args:
+            window: 复用窗口（秒，0 为关闭）
+        """
+        self.window = window
+        self._entries: Dict[Tuple[Hashable, str], Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, group_id: Hashable, trigger: str, now: float | None = None) -> str | None:
+        """窗口内相同触发消息的生成结果"""
+        if self.window <= 0:
+            return None
+        key = normalize(trigger)
+        if not key:  # 纯标点、纯空白的消息不复用
+            return None
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get((group_id, key))
+        if entry is None or now - entry[0] > self.window:
+            return None
+        TRIGGER_REUSE.inc()
+        return entry[1]
+
+    def put(self, group_id: Hashable, trigger: str, completion: str, now: float | None = None):
+        """记录生成结果，顺带清理过期项"""
+        key = normalize(trigger)
+        if self.window <= 0 or not key:
+            return
+        now = time.time() if now is None else now
+        with self._lock:
+            self._entries[(group_id, key)] = (now, completion)
+            if len(self._entries) > 1024:
+                self._entries = {k: v for k, v in self._entries.items() if now - v[0] <= self.window}
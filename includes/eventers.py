@@ -5,29 +5,82 @@
 from typing import Callable, Tuple, Any, List
 from dataclasses import dataclass
 from .models import MessageInfo
+import inspect
 import re
 
 
+class Execution:
+    """
+    处理器执行方式
+    
+    INLINE: 直接在事件循环中执行，适合 async def 且很快的处理器（不能调用同步 API）
+    THREAD: 在线程池中执行（默认）
+    PROCESS: 在进程池中执行 callback(info)，只传可 pickle 的数据；
+             返回值交给 .then 注册的 (bot, info, result) 回调在线程中处理
+    """
+    
+    INLINE = "inline"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class Priority:
+    """
+    处理器优先级通道（数值越大越先执行；过载时低优先级先被丢弃）
+    
+    处理器未指定优先级时由 Bot 按事件推断：命令处理器为 COMMAND，
+    @机器人或回复机器人的消息为 HIGH，心跳为 LOW，其余为 NORMAL。
+    """
+    
+    LOW = -1  # 心跳、可丢弃的闲聊处理
+    NORMAL = 0  # 普通消息
+    HIGH = 1  # @机器人、回复机器人
+    COMMAND = 2  # 命令
+    
+    NAMES = {LOW: "low", NORMAL: "normal", HIGH: "high", COMMAND: "command"}
+
+
 class EventHandler:
     """事件处理器基类"""
     
-    def __init__(self, whens: Tuple, conditions: Tuple):
+    def __init__(self, whens: Tuple, conditions: Tuple, execution: str = Execution.THREAD,
+                 priority: int | None = None):
         """
         初始化事件处理器
         
         Args:
             whens: When 条件元组
             conditions: Condition 条件元组
+            execution: 执行方式（见 Execution）
+            priority: 优先级（见 Priority；None 为按事件推断）
         """
+        if execution not in (Execution.INLINE, Execution.THREAD, Execution.PROCESS):
+            raise ValueError(f"未知的执行方式: {execution}")
         self.whens = whens if isinstance(whens, tuple) else (whens,)
         self.conditions = conditions if isinstance(conditions, tuple) else (conditions,)
+        self.execution = execution
+        self.priority = priority
+        self.is_command = any(isinstance(w, GotCommand) for w in self.whens)
         self.callback = None
+        self.result_callback: Callable | None = None
     
     def __call__(self, func: Callable):
         """装饰器，绑定处理函数"""
         self.callback = func
         return self
     
+    def then(self, func: Callable):
+        """装饰器，绑定 PROCESS 处理器的结果回调 (bot, info, result)"""
+        self.result_callback = func
+        return self
+    
+    @property
+    def name(self) -> str:
+        """处理器名称（处理函数的限定名）"""
+        if self.callback is None:
+            return "<unbound>"
+        return getattr(self.callback, "__qualname__", repr(self.callback))
+    
     def should_process(self, info: Any) -> bool:
         """判断是否应该处理此事件"""
         # 检查 When 条件
@@ -48,6 +101,13 @@ class EventHandler:
         """执行处理函数"""
         if self.callback:
             self.callback(bot, info)
+    
+    async def execute_inline(self, bot, info: Any):
+        """在事件循环中执行处理函数（async def 会被等待）"""
+        if self.callback:
+            result = self.callback(bot, info)
+            if inspect.isawaitable(result):
+                await result
 
 
 class WhenCondition:
@@ -209,20 +269,23 @@ class ContainsKeyword(ConditionBase):
 class MessageReceiver:
     """消息接收器"""
     
-    def Message(self, When: Tuple | None = None, Conditions: Tuple | None = None) -> EventHandler:
+    def Message(self, When: Tuple | None = None, Conditions: Tuple | None = None,
+                Execution: str = Execution.THREAD, Priority: int | None = None) -> EventHandler:
         """
         创建消息事件处理器
         
         Args:
             When: When 条件元组
             Conditions: Condition 条件元组
+            Execution: 执行方式（Execution.INLINE / THREAD / PROCESS）
+            Priority: 优先级（Priority.LOW / NORMAL / HIGH / COMMAND，None 为按事件推断）
         
         Returns:
             EventHandler: 事件处理器
         """
         whens = When if When else (Received(),)
         conditions = Conditions if Conditions else (AllMessage(),)
-        return EventHandler(whens, conditions)
+        return EventHandler(whens, conditions, Execution, Priority)
 
 
 class When:
@@ -4,8 +4,9 @@
 """
 
 from includes.bot import Bot
-from includes.eventers import Receive, When, Condition
+from includes.eventers import Receive, When, Condition, Execution, Priority
 from includes.models import MessageInfo, CQCode, MessageBuilder
+from includes.log import setup_logging
 import config as config
 import inspect
 
@@ -13,6 +14,8 @@ import inspect
 # 初始化 Bot
 # ============================================
 
+setup_logging(config.LOG_LEVEL, config.LOG_LEVELS, use_queue=config.LOG_ASYNC)
+
 bot = Bot(
     ws_url="ws://127.0.0.1:6700",
     self_id=0 # 0 自动匹配
@@ -220,7 +223,8 @@ keyword_message = Receive.Message(
     ),
     Conditions=(
         Condition.ContainsKeyword(["hello", "hi", "你好"]) #type:ignore
-    )
+    ),
+    Priority=Priority.LOW  # 过载时优先丢弃
 )
 
 @keyword_message
@@ -295,23 +299,58 @@ def handle_ban_command(bot_instance: Bot, info: MessageInfo):
 
 
 # ============================================
-# 主程序
+# 示例 11: 在子进程中执行 CPU 密集的工作
 # ============================================
 
+# PROCESS 处理器的函数只接收 info（必须可 pickle），在子进程中执行，不能调用 bot；
+# 返回值交给 .then 注册的回调在线程中处理。处理函数必须定义在模块顶层。
+count_command = Receive.Message(
+    When=(
+        When.Received,
+        When.GotCommand(name="count")
+    ),
+    Conditions=(
+        Condition.AllMessage,
+    ),
+    Execution=Execution.PROCESS
+)
+
+@count_command
+def handle_count_command(info: MessageInfo) -> int:
+    """处理 /count <文本> 命令 - 统计不同字符数（子进程中执行）"""
+    return len(set(info.raw_message.replace("/count", "", 1).strip()))
 
-print("机器人启动中...")
+@count_command.then
+def reply_count(bot_instance: Bot, info: MessageInfo, result: int):
+    """把子进程的结果发回去"""
+    bot_instance.send_msg(info.message_type, info.user_id, info.group_id, f"不同字符数: {result}")
 
-# 注册所有处理器到 bot
-bot.register_message_handler(all_message)
-bot.register_message_handler(help_command)
-bot.register_message_handler(echo_command)
-bot.register_message_handler(group_command)
-bot.register_message_handler(private_message)
-bot.register_message_handler(regex_message)
-bot.register_message_handler(cq_code_message)
-bot.register_message_handler(keyword_message)
-bot.register_message_handler(user_info_command)
-bot.register_message_handler(admin_command)
 
-# 启动 bot（阻塞式）
-bot.run()
+# ============================================
+# 主程序
+# ============================================
+
+def main():
+    """注册所有处理器并启动 bot（阻塞式）"""
+    print("机器人启动中...")
+
+    # 注册所有处理器到 bot
+    bot.register_message_handler(all_message)
+    bot.register_message_handler(help_command)
+    bot.register_message_handler(echo_command)
+    bot.register_message_handler(group_command)
+    bot.register_message_handler(private_message)
+    bot.register_message_handler(regex_message)
+    bot.register_message_handler(cq_code_message)
+    bot.register_message_handler(keyword_message)
+    bot.register_message_handler(user_info_command)
+    bot.register_message_handler(admin_command)
+    bot.register_message_handler(count_command)
+
+    # 启动 bot（阻塞式）
+    bot.run()
+
+
+# 进程池以 spawn 方式启动子进程，子进程会重新导入本模块，启动代码不能在导入时执行
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+处理器执行器 - 有界线程池、排队上限与过载时的准入策略
+
+默认的 asyncio.to_thread 线程池队列无上限，消息洪峰时任务无限堆积。
+这里同时执行的处理器数和排队数都有上限，队列满时按事件类型的策略丢弃任务并计数，
+过载时优雅降级而不是延迟无限增长。
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Tuple
+
+from .eventers import Priority
+from .log import get_logger
+from .metrics import registry
+
+logger = get_logger("executor")
+
+HANDLER_SHED = registry.counter("bot_handler_shed_total", "因过载被丢弃的处理器任务数")
+HANDLER_QUEUE_DEPTH = registry.gauge("bot_handler_queue_depth", "等待线程的处理器任务数")
+
+
+class Admission:
+    """队列满时的准入策略"""
+
+    REJECT = "reject"  # 拒绝新任务
+    DROP_OLDEST = "drop_oldest"  # 丢弃同类型中最早排队的任务，接收新任务
+    SHED_LOW = "shed_low"  # 先丢弃排队中的低优先级任务；新任务本身是低优先级则直接拒绝
+
+
+DEFAULT_POLICIES: Dict[str, str] = {
+    "message": Admission.SHED_LOW,
+    "notice": Admission.REJECT,
+    "request": Admission.REJECT,
+    "meta_event": Admission.DROP_OLDEST,
+}
+
+_Job = Tuple[str, Callable[[], None], asyncio.Future]  # (事件类型, 函数, 完成时得到是否执行)
+
+
+class HandlerExecutor:
+    """有界处理器执行器（run 只能在事件循环线程中调用）"""
+
+    def __init__(self, max_workers: int = 16, queue_size: int = 256,
+                 policies: Dict[str, str] | None = None):
+        """
+        初始化执行器
+
+        Args:
+            max_workers: 同时执行的处理器数（线程数）
+            queue_size: 等待线程的任务上限
+            policies: 各事件类型的准入策略，未列出的类型使用 Admission.REJECT
+        """
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.policies = dict(DEFAULT_POLICIES)
+        self.policies.update(policies or {})
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="handler")
+        self._lanes: Dict[int, Deque[_Job]] = {}  # 优先级 -> 排队任务
+        self._waiting = 0
+        self._running = 0
+        self._last_warning = 0.0
+        HANDLER_QUEUE_DEPTH.set_function(lambda: self._waiting)
+
+    def __len__(self) -> int:
+        """排队中的任务数"""
+        return self._waiting
+
+    async def run(self, kind: str, func: Callable[[], None], priority: int = Priority.NORMAL) -> bool:
+        """
+        在线程中执行 func，线程不足时排队
+
+        Args:
+            kind: 事件类型（决定准入策略）
+            func: 要执行的函数
+            priority: 优先级，排队时高优先级先执行
+
+        Returns:
+            bool: 是否执行（False 表示因过载被丢弃）；func 抛出的异常会原样抛出
+        """
+        loop = asyncio.get_running_loop()
+        done: asyncio.Future = loop.create_future()
+        job = (kind, func, done)
+
+        if self._running < self.max_workers:
+            self._start(loop, job)
+        elif self._admit(kind, priority):
+            self._lanes.setdefault(priority, deque()).append(job)
+            self._waiting += 1
+        else:
+            return False
+        return await done
+
+    def _admit(self, kind: str, priority: int) -> bool:
+        """队列满时按策略腾出位置；返回新任务能否入队"""
+        if self._waiting < self.queue_size:
+            return True
+
+        policy = self.policies.get(kind, Admission.REJECT)
+        if policy == Admission.DROP_OLDEST:
+            # 各优先级中同类型最早入队的任务
+            for lane in self._lanes.values():
+                for job in lane:
+                    if job[0] == kind:
+                        self._evict(lane, job, "drop_oldest")
+                        return True
+        elif policy == Admission.SHED_LOW and priority >= Priority.NORMAL:
+            # 从最低优先级里丢弃最新入队的任务
+            for level in sorted(self._lanes):
+                lane = self._lanes[level]
+                if level < priority and lane:
+                    self._evict(lane, lane[-1], "shed_low")
+                    return True
+
+        HANDLER_SHED.inc(kind=kind, reason="rejected")
+        now = time.monotonic()
+        if now - self._last_warning >= 1.0:  # 洪峰时每秒最多一条
+            self._last_warning = now
+            logger.warning("处理器队列已满，丢弃任务", extra={"fields": {"kind": kind, "policy": policy}})
+        return False
+
+    def _evict(self, lane: Deque[_Job], job: _Job, reason: str):
+        lane.remove(job)
+        self._waiting -= 1
+        HANDLER_SHED.inc(kind=job[0], reason=reason)
+        if not job[2].done():
+            job[2].set_result(False)
+
+    def _next(self) -> _Job | None:
+        """取出优先级最高、最早入队的任务"""
+        for level in sorted(self._lanes, reverse=True):
+            lane = self._lanes[level]
+            while lane:
+                job = lane.popleft()
+                self._waiting -= 1
+                if not job[2].done():  # 调用方已取消的任务跳过
+                    return job
+        return None
+
+    def _start(self, loop: asyncio.AbstractEventLoop, job: _Job):
+        self._running += 1
+        future = loop.run_in_executor(self._pool, job[1])
+        future.add_done_callback(lambda f: self._finish(loop, job, f))
+
+    def _finish(self, loop: asyncio.AbstractEventLoop, job: _Job, future: asyncio.Future):
+        self._running -= 1
+        done = job[2]
+        if not done.done():
+            if future.cancelled():
+                done.cancel()
+            elif future.exception() is not None:
+                done.set_exception(future.exception())  # type: ignore
+            else:
+                done.set_result(True)
+        following = self._next()
+        if following is not None:
+            self._start(loop, following)
+
+    def shutdown(self, wait: bool = False):
+        """关闭线程池"""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,128 @@
+"""
+合并转发 - 把较长或分段较多的回复打包成一条合并转发消息发送
+
+原本每个 "\n\n" 分段各发一条群消息，N 段就是 N 次 API 调用；
+打包后一条 send_group_forward_msg 即可，超出节点数或体积上限时按上限拆成多条转发。
+"""
+
+from typing import List
+
+from .models import Seg, Segment
+from .metrics import registry
+
+FORWARD_SENT = registry.counter("forward_messages_total", "发送的合并转发消息数")
+FORWARD_FALLBACK = registry.counter("forward_fallback_total", "合并转发失败后改为逐条发送的次数")
+
+
+class ForwardComposer:
+    """合并转发消息打包器"""
+
+    def __init__(self, nickname: str = "TLoH Bot", min_chunks: int = 4, min_chars: int = 500,
+                 max_nodes: int = 80, max_bytes: int = 24000, max_node_chars: int = 2000):
+        """
+        初始化打包器
+
+        Args:
+            nickname: 转发节点显示的昵称
+            min_chunks: 分段数达到该值时改用合并转发
+            min_chars: 总字数达到该值时改用合并转发
+            max_nodes: 单条转发消息的最大节点数
+            max_bytes: 单条转发消息的最大文本体积（UTF-8 字节）
+            max_node_chars: 单个节点的最大字数，超出的分段按行（必要时硬切）拆成多个节点
+        """
+        self.nickname = nickname
+        self.min_chunks = min_chunks
+        self.min_chars = min_chars
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+        self.max_node_chars = max_node_chars
+
+    def should_forward(self, chunks: List[str]) -> bool:
+        """是否应当打包为合并转发"""
+        return len(chunks) >= self.min_chunks or sum(len(c) for c in chunks) >= self.min_chars
+
+    def _split_chunk(self, chunk: str) -> List[str]:
+        """把过长的分段拆到单节点字数以内"""
+        limit = self.max_node_chars
+        if len(chunk) <= limit:
+            return [chunk]
+        pieces: List[str] = []
+        current = ""
+        for line in chunk.split("\n"):
+            while len(line) > limit:
+                if current:
+                    pieces.append(current)
+                    current = ""
+                pieces.append(line[:limit])
+                line = line[limit:]
+            if current and len(current) + 1 + len(line) > limit:
+                pieces.append(current)
+                current = line
+            else:
+                current = f"{current}\n{line}" if current else line
+        if current:
+            pieces.append(current)
+        return pieces
+
+    def compose(self, self_id: int, chunks: List[str]) -> List[List[Segment]]:
+        """
+        把分段打包成若干条转发消息
+
+        Args:
+            self_id: 节点显示的 QQ 号（一般为机器人自身）
+            chunks: 回复分段
+
+        Returns:
+            List[List[Segment]]: 每个元素是一条转发消息的节点列表
+        """
+        messages: List[List[Segment]] = []
+        nodes: List[Segment] = []
+        size = 0
+        for chunk in chunks:
+            if not chunk.strip():
+                continue
+            for piece in self._split_chunk(chunk):
+                piece_size = len(piece.encode("utf-8"))
+                if nodes and (len(nodes) >= self.max_nodes or size + piece_size > self.max_bytes):
+                    messages.append(nodes)
+                    nodes, size = [], 0
+                nodes.append(Seg.node_custom(self_id, self.nickname, piece))
+                size += piece_size
+        if nodes:
+            messages.append(nodes)
+        return messages
+
+    def send_group(self, bot, group_id: int, chunks: List[str], reply_to: int | None = None) -> List[int]:
+        """
+        向群发送回复：短回复逐条发送，长回复打包为合并转发
+
+        Args:
+            bot: Bot 实例
+            group_id: 群号
+            chunks: 回复分段（按纯文本发送，不解析 CQ 码）
+            reply_to: 逐条发送时第一条引用回复的消息 ID（合并转发无法引用，忽略）
+
+        Returns:
+            List[int]: 发送出的消息 ID（失败为 -1）
+        """
+        chunks = [c for c in chunks if c.strip()]
+        if not self.should_forward(chunks):
+            message_ids = []
+            for i, chunk in enumerate(chunks):
+                segments = [Seg.text(chunk)]
+                if i == 0 and reply_to is not None:
+                    segments.insert(0, Seg.reply(reply_to))
+                message_ids.append(bot.send_group_msg(group_id, segments))
+            return message_ids
+
+        message_ids = []
+        for nodes in self.compose(bot.self_id, chunks):
+            message_id = bot.send_group_forward_msg(group_id, nodes)
+            if message_id == -1:
+                # 实现端不支持或拒收时退回逐条发送该批节点
+                FORWARD_FALLBACK.inc()
+                message_ids.extend(bot.send_group_msg(group_id, node["data"]["content"]) for node in nodes)
+            else:
+                FORWARD_SENT.inc()
+                message_ids.append(message_id)
+        return message_ids
@@ -0,0 +1,143 @@
+"""
+在途请求表 - API 调用的 echo 关联、统一超时时间轮与容量限制
+
+echo 使用递增整数；所有请求的超时由一个时间轮任务统一处理，
+而不是每个调用各自挂一个 wait_for 定时器。表满时新调用在 acquire 处等待（背压）。
+"""
+
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+from .metrics import registry
+
+ORPHANED = registry.counter("bot_api_orphan_responses_total", "找不到对应请求的 API 响应数")
+EXPIRED = registry.counter("bot_api_expired_total", "被时间轮判定超时的 API 调用数")
+BACKPRESSURE = registry.counter("bot_api_backpressure_total", "因在途请求表已满而等待的 API 调用数")
+
+
+class InflightTable:
+    """在途 API 请求表（只在事件循环线程中使用）"""
+
+    def __init__(self, capacity: int = 4096, tick: float = 0.1, wheel_size: int = 512):
+        """
+        初始化请求表
+
+        Args:
+            capacity: 最多同时在途的请求数
+            tick: 时间轮精度（秒）
+            wheel_size: 时间轮槽数，超过一圈的超时按圈数轮转
+        """
+        self.capacity = capacity
+        self.tick = tick
+        self._next_echo = 0
+        self._futures: Dict[int, asyncio.Future] = {}
+        self._wheel: List[List[Tuple[int, int]]] = [[] for _ in range(wheel_size)]  # (echo, 到期刻度)
+        self._cursor = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._timer: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._futures)
+
+    def __contains__(self, echo: Any) -> bool:
+        return self._normalize(echo) in self._futures
+
+    @staticmethod
+    def _normalize(echo: Any) -> int | None:
+        if isinstance(echo, int):
+            return echo
+        if isinstance(echo, str) and echo.isdigit():
+            return int(echo)
+        return None
+
+    def _bind(self):
+        """绑定当前事件循环（首次使用或事件循环更换时）"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.capacity)
+            self._futures.clear()
+            for slot in self._wheel:
+                slot.clear()
+            self._timer = loop.create_task(self._run_wheel())
+
+    async def acquire(self, timeout: float, wait: float | None = None) -> Tuple[int, asyncio.Future]:
+        """
+        登记一个新请求
+
+        Args:
+            timeout: 请求超时（秒），到期时 future 收到 TimeoutError
+            wait: 表满时最多等待多久（秒，None 为一直等待），超时抛出 TimeoutError
+
+        Returns:
+            (echo, future): 整数 echo 与等待响应的 future
+        """
+        self._bind()
+        if not self._slots.locked():  # type: ignore
+            await self._slots.acquire()  # type: ignore  # 有空位时不会挂起
+        else:
+            BACKPRESSURE.inc()
+            await asyncio.wait_for(self._slots.acquire(), wait)  # type: ignore
+
+        self._next_echo += 1
+        echo = self._next_echo
+        future = self._loop.create_future()  # type: ignore
+        self._futures[echo] = future
+
+        ticks = max(1, int(timeout / self.tick + 0.999))
+        deadline = self._cursor + ticks
+        self._wheel[deadline % len(self._wheel)].append((echo, deadline))
+        return echo, future
+
+    def resolve(self, echo: Any, response: Dict[str, Any]) -> bool:
+        """
+        用响应完成请求
+
+        Returns:
+            bool: 是否找到对应请求（找不到记为孤儿响应）
+        """
+        future = self._futures.get(self._normalize(echo))  # type: ignore
+        if future is None or future.done():
+            ORPHANED.inc()
+            return False
+        future.set_result(response)
+        return True
+
+    def fail(self, echo: int, error: BaseException):
+        """让请求以异常结束（如发送失败）"""
+        future = self._futures.get(echo)
+        if future is not None and not future.done():
+            future.set_exception(error)
+
+    def release(self, echo: int):
+        """注销请求并归还容量（调用方在 finally 中调用）"""
+        future = self._futures.pop(echo, None)
+        if future is None:
+            return
+        if not future.done():
+            future.cancel()
+        if self._slots is not None:
+            self._slots.release()
+
+    async def _run_wheel(self):
+        """时间轮：每个刻度检查一个槽，到期的请求以 TimeoutError 结束"""
+        size = len(self._wheel)
+        while True:
+            await asyncio.sleep(self.tick)
+            self._cursor += 1
+            index = self._cursor % size
+            slot = self._wheel[index]
+            if not slot:
+                continue
+            remaining = []
+            for echo, deadline in slot:
+                future = self._futures.get(echo)
+                if future is None or future.done():
+                    continue
+                if deadline <= self._cursor:
+                    EXPIRED.inc()
+                    future.set_exception(asyncio.TimeoutError())
+                else:
+                    remaining.append((echo, deadline))
+            self._wheel[index] = remaining
@@ -0,0 +1,136 @@
+"""
+LLM 回复缓存 - 按规范化的触发消息和最近上下文的指纹缓存生成结果
+
+"bot?"、"@bot"、"bot 吗" 这类触发消息的回复基本相同，却每次都要带着几千行历史调用一次 LLM。
+键为（群号, 模型, 规范化触发消息, 最近几条群友发言的指纹），按 TTL 过期、按 LRU 淘汰；
+缓存内容随状态快照一起写入磁盘，重启后仍然有效。
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Sequence, Tuple
+
+from .dedupe import normalize
+from .metrics import registry
+
+AT_CODE = re.compile(r"\[CQ:at,qq=(\d+|all)[^\]]*\]")
+OTHER_CODE = re.compile(r"\[CQ:(\w+)[^\]]*\]")
+TRAILING_PARTICLES = re.compile(r"[吗嘛呢吧啊呀哦哇么]+$")
+HISTORY_CONTENT = re.compile(r"^\d+: (.*) : \(MessageId\)-?\d+\s*$", re.S)
+
+LLM_CACHE_LOOKUPS = registry.counter("llm_cache_lookups_total", "LLM 回复缓存查询次数")
+LLM_CACHE_TOKENS_SAVED = registry.counter("llm_cache_tokens_saved_total", "缓存命中省下的 token 数（按原请求用量估计）")
+LLM_CACHE_HIT_RATIO = registry.gauge("llm_cache_hit_ratio", "LLM 回复缓存命中率")
+LLM_CACHE_ENTRIES = registry.gauge("llm_cache_entries", "LLM 回复缓存条目数")
+
+
+def canonical_trigger(text: str, self_id: int = 0) -> str:
+    """
+    触发消息的规范形式
+
+    @ 机器人统一为 "bot"，其他 CQ 码只保留类型，去掉标点、空白和句末语气词。
+    """
+    def at(match: re.Match) -> str:
+        return "bot" if self_id and match.group(1) == str(self_id) else "@"
+
+    text = OTHER_CODE.sub(lambda m: f"[{m.group(1)}]", AT_CODE.sub(at, text))
+    return TRAILING_PARTICLES.sub("", normalize(text))
+
+
+def context_fingerprint(history: Sequence[str], lines: int = 3) -> str:
+    """最近 lines 条群友发言（去掉发送者和消息 ID）的指纹；bot 自己的发言不参与"""
+    recent: List[str] = []
+    for line in reversed(history):
+        match = HISTORY_CONTENT.match(line)
+        if match is not None:
+            recent.append(normalize(match.group(1)))
+            if len(recent) >= lines:
+                break
+    return hashlib.blake2b("\n".join(recent).encode("utf-8"), digest_size=8).hexdigest()
+
+
+class LLMResponseCache:
+    """有 TTL 和容量上限的 LLM 回复缓存（线程安全）"""
+
+    def __init__(self, size: int = 2048, ttl: float = 3600.0, context_lines: int = 3):
+        """
+        初始化缓存
+
+        Args:
+            size: 最多缓存的回复数（0 为关闭缓存）
+            ttl: 缓存有效期（秒）
+            context_lines: 参与指纹的最近群友发言数
+        """
+        self.size = size
+        self.ttl = ttl
+        self.context_lines = context_lines
+        self._entries: OrderedDict[str, Tuple[float, str, int]] = OrderedDict()  # 键 -> (写入时间, 回复, token 数)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._lookups = 0
+        LLM_CACHE_HIT_RATIO.set_function(lambda: self._hits / self._lookups if self._lookups else 0.0)
+        LLM_CACHE_ENTRIES.set_function(lambda: len(self._entries))
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def key(self, group_id: int, model: str, trigger: str, history: Sequence[str], self_id: int = 0) -> str | None:
+        """缓存键；触发消息规范化后为空时不缓存，返回 None"""
+        canonical = canonical_trigger(trigger, self_id)
+        if not canonical:
+            return None
+        return f"{group_id}:{model}:{canonical}:{context_fingerprint(history, self.context_lines)}"
+
+    def get(self, key: str | None, accept: Callable[[str], bool] | None = None, now: float | None = None) -> str | None:
+        """
+        查询缓存
+
+        Args:
+            key: 缓存键
+            accept: 命中后的额外检查（例如与最近回复重复时不用），返回 False 时按未命中处理
+        """
+        if not self.enabled or key is None:
+            return None
+        now = time.time() if now is None else now
+        with self._lock:
+            self._lookups += 1
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None or (accept is not None and not accept(entry[1])):
+            LLM_CACHE_LOOKUPS.inc(result="miss")
+            return None
+        with self._lock:
+            self._hits += 1
+        LLM_CACHE_LOOKUPS.inc(result="hit")
+        LLM_CACHE_TOKENS_SAVED.inc(entry[2])
+        return entry[1]
+
+    def put(self, key: str | None, content: str, tokens: int = 0, now: float | None = None):
+        """写入缓存（tokens 为生成这条回复的 token 用量，用于估计节省量）"""
+        if not self.enabled or key is None:
+            return
+        now = time.time() if now is None else now
+        with self._lock:
+            self._entries[key] = (now, content, tokens)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def dump(self) -> List[list]:
+        """导出未过期的条目（用于状态快照）"""
+        now = time.time()
+        with self._lock:
+            return [[key, *entry] for key, entry in self._entries.items() if now - entry[0] <= self.ttl]
+
+    def load(self, state: List[list]):
+        """从 dump 的结果恢复"""
+        for key, ts, content, tokens in state:
+            self.put(key, content, tokens, now=ts)
@@ -0,0 +1,291 @@
+"""
+LLM 路由 - 多个提供方之间按延迟选择、慢请求对冲与熔断
+
+每个路由（模型 + 提供方）记录最近的延迟和成败。请求先发往估计最快的健康路由；
+超过该路由 p95 延迟仍未返回时向下一个路由发出备份请求，谁先成功用谁。
+连续失败的路由熔断一段时间，之后放行一个探测请求，成功才恢复。
+
+每次请求带单次超时交给客户端，整个调用另有总期限：到期仍未返回的请求记为失败，
+对冲中落败、仍未返回的请求按已耗时记一个延迟样本，卡住的路由因此会被降级或熔断。
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Sequence, Tuple, TypeVar
+
+from .log import get_logger
+from .metrics import registry
+
+logger = get_logger("llmrouter")
+
+T = TypeVar("T")
+
+ROUTE_REQUESTS = registry.counter("llm_route_requests_total", "各路由的 LLM 请求数")
+ROUTE_LATENCY = registry.histogram("llm_route_seconds", "各路由的 LLM 请求耗时")
+ROUTE_HEDGES = registry.counter("llm_route_hedges_total", "因主请求过慢发出的备份请求数")
+ROUTE_BREAKER = registry.gauge("llm_route_breaker_open", "路由是否处于熔断状态")
+
+
+class NoRouteAvailable(RuntimeError):
+    """所有路由都处于熔断状态"""
+
+
+@dataclass
+class Route:
+    """一个可用的模型（模型名, 请求用的模型标识, 客户端）"""
+    name: str
+    model_identifier: str
+    client: Any
+
+
+class _Attempt:
+    """一次发往某个路由的请求；结果只记录一次（超时或落败时由 call 先行记录）"""
+
+    def __init__(self, route: Route):
+        self.route = route
+        self.start = time.perf_counter()
+        self.settled = False
+
+
+class RouteStats:
+    """单个路由的滚动统计与熔断状态（调用方加锁）"""
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.results: Deque[bool] = deque(maxlen=window)
+        self.failures = 0  # 连续失败次数
+        self.open_until = 0.0  # 熔断结束时间，0 为未熔断
+        self.probing = False  # 半开状态下是否已有探测请求
+
+    @property
+    def error_rate(self) -> float:
+        return self.results.count(False) / len(self.results) if self.results else 0.0
+
+    def latency(self, default: float) -> float:
+        """延迟估计（最近延迟的中位数，没有样本时为 default）"""
+        return statistics.median(self.latencies) if self.latencies else default
+
+    def p95(self) -> float | None:
+        if len(self.latencies) < 5:
+            return None
+        return statistics.quantiles(self.latencies, n=20)[-1]
+
+
+class LLMRouter:
+    """LLM 请求路由（线程安全）"""
+
+    def __init__(self, window: int = 50, hedge_min: float = 1.0, hedge_max: float = 20.0,
+                 hedge_default: float = 8.0, breaker_failures: int = 3, breaker_cooldown: float = 30.0,
+                 request_timeout: float = 60.0, deadline: float = 90.0, max_workers: int = 16):
+        """
+        初始化路由器
+
+        Args:
+            window: 每个路由保留的最近请求数
+            hedge_min / hedge_max: 对冲延迟（主路由 p95）的下限和上限（秒）
+            hedge_default: 样本不足时的对冲延迟，也作为未知路由的延迟估计（秒，0 为不对冲）
+            breaker_failures: 连续失败多少次后熔断
+            breaker_cooldown: 熔断持续时间（秒）
+            request_timeout: 单次请求的超时（秒），交给客户端
+            deadline: 一次 call 的总期限（秒），含对冲和换路由
+            max_workers: 同时进行的请求数（含被对冲后仍在进行的请求）
+        """
+        self.window = window
+        self.hedge_min = hedge_min
+        self.hedge_max = hedge_max
+        self.hedge_default = hedge_default
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self.request_timeout = request_timeout
+        self.deadline = deadline
+        self._stats: Dict[str, RouteStats] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="llm")
+
+    def _get_stats(self, name: str) -> RouteStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = RouteStats(self.window)
+        return stats
+
+    def rank(self, routes: Sequence[Route], now: float | None = None) -> List[Route]:
+        """
+        可用路由按估计延迟（按错误率加权）排序；延迟相同时保持配置顺序
+
+        熔断中的路由不参与；熔断到期的路由在发出请求时只放行一个探测请求（见 _begin）。
+        """
+        now = time.monotonic() if now is None else now
+        available: List[Tuple[float, int, Route]] = []
+        with self._lock:
+            for order, route in enumerate(routes):
+                stats = self._get_stats(route.name)
+                if stats.open_until and (now < stats.open_until or stats.probing):
+                    continue
+                score = stats.latency(self.hedge_default) * (1 + 4 * stats.error_rate)
+                available.append((score, order, route))
+        return [route for _, _, route in sorted(available, key=lambda item: item[:2])]
+
+    def _begin(self, route: Route) -> bool:
+        """发出请求前检查熔断状态；熔断到期（半开）时只有第一个请求作为探测放行"""
+        with self._lock:
+            stats = self._get_stats(route.name)
+            if not stats.open_until:
+                return True
+            if time.monotonic() < stats.open_until or stats.probing:
+                return False
+            stats.probing = True
+            return True
+
+    def hedge_delay(self, route: Route) -> float | None:
+        """发出备份请求前等待的时间（None 为不对冲）"""
+        if self.hedge_default <= 0:
+            return None
+        with self._lock:
+            p95 = self._get_stats(route.name).p95()
+        if p95 is None:
+            return self.hedge_default
+        return min(max(p95, self.hedge_min), self.hedge_max)
+
+    def _record(self, route: Route, elapsed: float, ok: bool):
+        with self._lock:
+            stats = self._get_stats(route.name)
+            stats.results.append(ok)
+            stats.probing = False
+            if ok:
+                stats.latencies.append(elapsed)
+                stats.failures = 0
+                stats.open_until = 0.0
+            else:
+                stats.failures += 1
+                if stats.open_until or stats.failures >= self.breaker_failures:
+                    stats.open_until = time.monotonic() + self.breaker_cooldown
+                    logger.warning("LLM 路由熔断: %s", route.name,
+                                   extra={"fields": {"cooldown": self.breaker_cooldown}})
+            opened = bool(stats.open_until)
+        ROUTE_REQUESTS.inc(route=route.name, result="ok" if ok else "error")
+        ROUTE_BREAKER.set(1 if opened else 0, route=route.name)
+        if ok:
+            ROUTE_LATENCY.observe(elapsed, route=route.name)
+
+    def _settle(self, attempt: _Attempt) -> float | None:
+        """标记请求已记录，返回已耗时；已经记录过时返回 None"""
+        with self._lock:
+            if attempt.settled:
+                return None
+            attempt.settled = True
+        return time.perf_counter() - attempt.start
+
+    def _attempt(self, attempt: _Attempt, request: Callable[[Route, float], T], timeout: float) -> T:
+        try:
+            result = request(attempt.route, timeout)
+        except Exception:
+            elapsed = self._settle(attempt)
+            if elapsed is not None:
+                self._record(attempt.route, elapsed, False)
+            raise
+        elapsed = self._settle(attempt)
+        if elapsed is not None:
+            self._record(attempt.route, elapsed, True)
+        return result
+
+    def _abandon(self, future: Future, attempt: _Attempt, failed: bool):
+        """
+        放弃仍在进行的请求：未开始的直接取消；已开始的不再等待，立即记录
+
+        Args:
+            failed: True 记为失败（总期限到期），False 只按已耗时记一个延迟样本（对冲落败）
+        """
+        if future.cancel():
+            with self._lock:
+                self._get_stats(attempt.route.name).probing = False
+            return
+        elapsed = self._settle(attempt)
+        if elapsed is None:
+            return
+        if failed:
+            self._record(attempt.route, elapsed, False)
+        else:
+            with self._lock:
+                stats = self._get_stats(attempt.route.name)
+                stats.latencies.append(elapsed)
+                stats.probing = False
+
+    def call(self, routes: Sequence[Route], request: Callable[[Route, float], T]) -> Tuple[T, Route]:
+        """
+        按路由顺序发出请求：主请求超过对冲延迟未返回时发出备份请求，失败时立即换下一个路由
+
+        Args:
+            routes: 候选路由（配置顺序，第一个为首选）
+            request: 用指定路由发出请求的函数，第二个参数为这次请求的超时（秒）
+
+        Returns:
+            Tuple: (最先成功的结果, 对应的路由)
+
+        Raises:
+            NoRouteAvailable: 所有路由都在熔断中
+            TimeoutError: 总期限内没有请求成功
+            Exception: 所有路由都失败时，最后一个错误
+        """
+        candidates = self.rank(routes)
+        if not candidates:
+            raise NoRouteAvailable("所有 LLM 路由都在熔断中")
+
+        deadline = time.monotonic() + self.deadline
+        pending: Dict[Future, _Attempt] = {}
+        error: Exception | None = None
+        launched = 0
+
+        def launch():
+            nonlocal launched
+            while launched < len(candidates):
+                route = candidates[launched]
+                launched += 1
+                if self._begin(route):
+                    attempt = _Attempt(route)
+                    timeout = min(self.request_timeout, max(0.0, deadline - time.monotonic()))
+                    pending[self._pool.submit(self._attempt, attempt, request, timeout)] = attempt
+                    return
+
+        launch()
+        if not pending:
+            raise NoRouteAvailable("所有 LLM 路由都在熔断中")
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    for future, attempt in pending.items():
+                        self._abandon(future, attempt, failed=True)
+                    pending.clear()
+                    logger.warning("LLM 请求超过总期限: %ss", self.deadline)
+                    raise TimeoutError(f"LLM 请求超过 {self.deadline} 秒仍未完成")
+                hedge = self.hedge_delay(candidates[launched - 1]) if launched < len(candidates) else None
+                timeout = remaining if hedge is None else min(hedge, remaining)
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    if hedge is not None and hedge <= remaining:
+                        ROUTE_HEDGES.inc(route=candidates[launched - 1].name)
+                        launch()
+                    continue
+                for future in done:
+                    route = pending.pop(future).route
+                    try:
+                        return future.result(), route
+                    except Exception as e:
+                        error = e
+                        logger.warning("LLM 请求失败: %s: %s", route.name, e)
+                        if launched < len(candidates):
+                            launch()
+        finally:
+            # 对冲中落败的请求不再等待，按已耗时记延迟样本，未开始的取消
+            for future, attempt in pending.items():
+                self._abandon(future, attempt, failed=False)
+        if error is None:
+            raise NoRouteAvailable("所有 LLM 路由都在熔断中")
+        raise error
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,90 @@
+"""
+日志 - 按子系统分级的结构化日志
+
+所有子系统的 logger 都挂在 "tloh" 之下（tloh.bot、tloh.speak ...），
+可以分别设置级别；附加字段通过 extra={"fields": {...}} 传入，
+输出为 "k=v" 形式。可选用队列 + 后台线程输出，避免工作线程在控制台 I/O 上排队。
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Dict
+
+ROOT = "tloh"
+DEFAULT_FORMAT = "TIME: %(asctime)s | %(levelname)s | %(name)s | %(message)s%(fields_text)s"
+
+_listener: logging.handlers.QueueListener | None = None
+_handlers: list[logging.Handler] = []
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """获取子系统 logger（tloh.<subsystem>）"""
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+
+class StructuredFormatter(logging.Formatter):
+    """把 record.fields 中的字段以 " | k=v k=v" 的形式追加到消息之后"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", None)
+        if fields:
+            record.fields_text = " | " + " ".join(f"{k}={v}" for k, v in fields.items())
+        else:
+            record.fields_text = ""
+        return super().format(record)
+
+
+def setup_logging(level: str | int = "INFO", levels: Dict[str, str | int] | None = None,
+                  use_queue: bool = False, fmt: str = DEFAULT_FORMAT, stream=None):
+    """
+    配置日志输出，重复调用会替换之前的配置
+
+    Args:
+        level: "tloh" 根 logger 的级别
+        levels: 各子系统的级别，如 {"speak": "DEBUG", "bot": "WARNING"}
+        use_queue: 是否通过队列交给后台线程输出
+        fmt: 日志格式
+        stream: 输出流（默认 stderr）
+    """
+    global _listener
+
+    root = logging.getLogger(ROOT)
+    for handler in _handlers:
+        root.removeHandler(handler)
+    _handlers.clear()
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(StructuredFormatter(fmt))
+
+    if use_queue:
+        q: queue.SimpleQueue = queue.SimpleQueue()
+        handler: logging.Handler = logging.handlers.QueueHandler(q)
+        _listener = logging.handlers.QueueListener(q, output, respect_handler_level=True)
+        _listener.start()
+    else:
+        handler = output
+
+    root.addHandler(handler)
+    _handlers.append(handler)
+    root.setLevel(level)
+    root.propagate = False
+
+    for name, sub_level in (levels or {}).items():
+        get_logger(name).setLevel(sub_level)
+
+
+def shutdown_logging():
+    """停止后台输出线程并刷出剩余日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
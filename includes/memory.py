@@ -0,0 +1,102 @@
+"""
+历史记录 - 群聊历史的读取与保存
+
+历史文件为 {群号: [历史行]} 的 JSON，历史行格式：
+    [user_id]: [content] : (MessageId)[message id]
+bot 自己的发言以 "你：" 开头。
+
+超出 MAX_LINES 的旧历史不再丢弃，而是转入 includes/archive.py 的按群归档。
+"""
+
+import json
+
+from .archive import HistoryArchive
+from .metrics import registry
+
+MEMORY_PATH = "./data/botmemories.ign"
+MAX_LINES = 6000
+PLACEHOLDER = "[暂无消息]"
+
+MEMORY_LOAD = registry.histogram("memory_load_seconds", "读取历史文件耗时")
+MEMORY_SAVE = registry.histogram("memory_save_seconds", "写入历史文件耗时")
+
+
+def get_memories(doc) -> dict:
+    return json.load(doc)
+
+
+def extract_mem_by_group_id(memories: dict, gid: str) -> list[str]:
+    group_mem = memories.get(gid, [PLACEHOLDER])
+
+    if len(group_mem) >= MAX_LINES:
+        return group_mem [-MAX_LINES:]
+    else:
+        return group_mem[:]
+
+
+def load_memories(path: str = MEMORY_PATH) -> dict:
+    with MEMORY_LOAD.time():
+        with open(path, "r", encoding="utf-8") as doc:
+            return get_memories(doc)
+
+
+_archive: HistoryArchive | None = None
+
+
+def get_archive() -> HistoryArchive:
+    """历史归档（首次使用时创建）"""
+    global _archive
+    if _archive is None:
+        _archive = HistoryArchive()
+    return _archive
+
+
+def set_archive(archive: HistoryArchive):
+    """替换历史归档（基准测试等使用独立目录时）"""
+    global _archive
+    _archive = archive
+
+
+def archive_overflow(gid: str, mem: list[str], times: list[float | None] | None = None) -> int:
+    """
+    把超出 MAX_LINES 的最旧历史移入归档（原地截断 mem，只保留最新的 MAX_LINES 行）
+
+    Args:
+        times: 与 mem 一一对应的消息时间（None 为未知），随 mem 一起截断
+
+    Returns:
+        int: 归档的行数
+    """
+    overflow = len(mem) - MAX_LINES
+    if overflow <= 0:
+        return 0
+    get_archive().append(gid, mem[:overflow], times[:overflow] if times is not None else None)
+    del mem[:overflow]
+    if times is not None:
+        del times[:overflow]
+    return overflow
+
+
+def history_offset(gid: str, mem: list[str]) -> int:
+    """下一条追加到 mem 的历史行在群历史中的行号（含已归档部分）"""
+    return len(get_archive().group(gid)) + len(mem)
+
+
+def history_line(gid: str, offset: int, mem: list[str]) -> str | None:
+    """按群历史中的行号取出一行（mem 为该群当前的热历史），不存在时返回 None"""
+    archive = get_archive().group(gid)
+    archived = len(archive)
+    if offset < 0:
+        return None
+    if offset < archived:
+        return archive.lines(offset, offset + 1)[0]
+    return mem[offset - archived] if offset - archived < len(mem) else None
+
+
+def pack_memories(gid: str, mem: list[str], path: str = MEMORY_PATH):
+    archive_overflow(gid, mem)
+    _mem = load_memories(path)
+    _mem [gid] = mem
+    with MEMORY_SAVE.time():
+        with open(path, "w", encoding="utf-8") as doc:
+            json.dump(_mem, doc, ensure_ascii=False, indent=2)
@@ -0,0 +1,346 @@
+"""
+指标 - 计数器、直方图、仪表盘，以及 Prometheus 文本 / JSON 快照导出
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# 默认直方图分桶（秒），覆盖 1ms ~ 2min
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    items = key + extra
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{v}"' for k, v in items)
+    return "{" + body + "}"
+
+
+class Metric:
+    """指标基类"""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str = ""):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        """Prometheus 文本格式的样本行"""
+        raise NotImplementedError
+
+    def snapshot(self) -> Any:
+        """可 JSON 序列化的当前值"""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """只增不减的计数器"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = ""):
+        super().__init__(name, help)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_key(labels), 0)
+
+    def total(self, **labels) -> float:
+        """所有包含这些标签的计数之和（其余标签任意）"""
+        wanted = set(_key(labels))
+        with self._lock:
+            return sum(v for k, v in self._values.items() if wanted.issubset(k))
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_fmt_labels(k)} {v}" for k, v in self._values.items()]
+
+    def snapshot(self) -> Any:
+        with self._lock:
+            return [{"labels": dict(k), "value": v} for k, v in self._values.items()]
+
+
+class Gauge(Metric):
+    """可增可减的仪表盘，也可以绑定一个取值函数"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str = ""):
+        super().__init__(name, help)
+        self._values: Dict[LabelKey, float] = {}
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]):
+        """绑定取值函数，导出时实时计算（无标签）"""
+        self._function = function
+
+    def value(self, **labels) -> float:
+        if self._function is not None and not labels:
+            return self._function()
+        return self._values.get(_key(labels), 0)
+
+    def _items(self) -> List[Tuple[LabelKey, float]]:
+        with self._lock:
+            items = list(self._values.items())
+        if self._function is not None:
+            items.append(((), self._function()))
+        return items
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_fmt_labels(k)} {v}" for k, v in self._items()]
+
+    def snapshot(self) -> Any:
+        return [{"labels": dict(k), "value": v} for k, v in self._items()]
+
+
+class Histogram(Metric):
+    """分桶直方图"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        # 每组标签：[各桶计数..., +Inf 计数, 总和]
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = _key(labels)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+                    break
+            else:
+                data[len(self.buckets)] += 1
+            data[-1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """计时上下文：with hist.time(action="x"): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        data = self._values.get(_key(labels))
+        return int(sum(data[:-1])) if data else 0
+
+    def quantile(self, q: float, **labels) -> float:
+        """按分桶线性插值估算分位数（无数据返回 0）"""
+        with self._lock:
+            data = self._values.get(_key(labels))
+            if not data:
+                return 0.0
+            counts = data[:-1]
+        total = sum(counts)
+        if total == 0:
+            return 0.0
+        rank = q * total
+        seen = 0.0
+        lower = 0.0
+        for i, c in enumerate(counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+            if seen + c >= rank and c > 0:
+                return lower + (upper - lower) * (rank - seen) / c
+            seen += c
+            lower = upper
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        for key, data in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets, data):
+                cumulative += c
+                lines.append(f"{self.name}_bucket{_fmt_labels(key, (('le', str(bound)),))} {cumulative}")
+            cumulative += data[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_fmt_labels(key, (('le', '+Inf'),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(key)} {data[-1]}")
+            lines.append(f"{self.name}_count{_fmt_labels(key)} {cumulative}")
+        return lines
+
+    def snapshot(self) -> Any:
+        with self._lock:
+            keys = list(self._values)
+        result = []
+        for key in keys:
+            labels = dict(key)
+            data = self._values[key]
+            count = int(sum(data[:-1]))
+            result.append({
+                "labels": labels,
+                "count": count,
+                "sum": data[-1],
+                "p50": self.quantile(0.5, **labels),
+                "p99": self.quantile(0.99, **labels),
+            })
+        return result
+
+
+class MetricsRegistry:
+    """指标注册表，同名指标只创建一次"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str, **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"指标 {name} 已注册为 {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str = "") -> Gauge:
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name: str, help: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def render_prometheus(self) -> str:
+        """导出为 Prometheus 文本格式"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """导出为可 JSON 序列化的字典"""
+        return {
+            "time": time.time(),
+            "metrics": {name: {"type": m.kind, "samples": m.snapshot()} for name, m in list(self._metrics.items())},
+        }
+
+
+# 默认注册表
+registry = MetricsRegistry()
+
+
+def serve_prometheus(port: int, host: str = "0.0.0.0", reg: MetricsRegistry | None = None) -> "ThreadingHTTPServer":
+    """
+    在后台线程启动 Prometheus 文本端点（GET /metrics）
+
+    Args:
+        port: 监听端口
+        host: 监听地址
+        reg: 注册表（默认全局 registry）
+
+    Returns:
+        ThreadingHTTPServer: 服务器对象，调用 shutdown() 停止
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # 只有开启端点时才需要
+
+    reg = reg or registry
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = reg.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+class SnapshotWriter:
+    """定期把指标快照写入 JSON 文件（先写临时文件再替换）"""
+
+    def __init__(self, path: str, interval: float = 60.0, reg: MetricsRegistry | None = None):
+        """
+        初始化快照写入器
+
+        Args:
+            path: 输出文件路径
+            interval: 写入间隔（秒）
+            reg: 注册表（默认全局 registry）
+        """
+        self.path = path
+        self.interval = interval
+        self.registry = reg or registry
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def write(self):
+        """立即写入一次"""
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as doc:
+            json.dump(self.registry.snapshot(), doc, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def start(self):
+        """启动后台写入线程"""
+        self._thread = threading.Thread(target=self._run, name="metrics-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止并写入最后一次快照"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError:
+                pass
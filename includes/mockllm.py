@@ -0,0 +1,224 @@
+"""
+模拟 LLM - 本地 OpenAI 兼容的 /v1/chat/completions 服务，用于离线压测
+
+可模拟首 token 延迟、生成速度、流式输出、429 限流以及固定的 BOTCALL[...] 输出。
+回复内容由种子和用户消息决定，同样的输入得到同样的输出，便于复现。
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+DEFAULT_RESPONSES = [
+    "确实，这波有点离谱了。",
+    "没看懂，你这说的有点抽象",
+    "管他呢，反正我又不用",
+    "BOTCALL[send,emoji,xbs]\n笑不活了",
+    "BOTCALL[msg,reply,{message_id}]\n你认真的？",
+    "好家伙，我直接好家伙\n\n不过说回来，这事也不全怪他",
+    "😡",
+]
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9_]+|[^\sA-Za-z0-9_]")
+MESSAGE_ID_PATTERN = re.compile(r"\(MessageId\)(-?\d+)")
+
+
+def count_tokens(text: str) -> int:
+    """粗略估算 token 数：英文按词、其它按字符"""
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def split_tokens(text: str) -> List[str]:
+    """把文本切成流式输出用的片段（保留空白）"""
+    return re.findall(r"\s*(?:[A-Za-z0-9_]+|[^\sA-Za-z0-9_])|\s+", text)
+
+
+@dataclass
+class MockLLMConfig:
+    """模拟 LLM 配置"""
+
+    ttft: float = 0.3  # 首 token 延迟（秒）
+    tokens_per_second: float = 40.0  # 生成速度
+    rate_limit: float = 0.0  # 随机返回 429 的比例
+    max_concurrency: int = 0  # 同时处理的请求上限，超出返回 429（0 为不限）
+    responses: List[str] = field(default_factory=lambda: list(DEFAULT_RESPONSES))
+    seed: int = 0
+
+
+class MockLLMServer:
+    """OpenAI 兼容的模拟 LLM 服务端"""
+
+    def __init__(self, config: MockLLMConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        初始化模拟服务端
+
+        Args:
+            config: 模拟配置
+            host: 监听地址
+            port: 监听端口（0 为自动分配）
+        """
+        self.config = config or MockLLMConfig()
+        self.requests = 0
+        self.rate_limited = 0
+        self.inflight = 0
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start_in_thread(self) -> "MockLLMServer":
+        """在后台线程中启动"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """在当前线程中运行"""
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _draw(self, key: str) -> float:
+        """由种子、输入和出现次数决定的 [0, 1) 伪随机数"""
+        with self._lock:
+            n = self._seen.get(key, 0)
+            self._seen[key] = n + 1
+        digest = hashlib.sha256(f"{self.config.seed}|{n}|{key}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+    def complete(self, messages: List[Dict[str, Any]]) -> str:
+        """根据对话选出固定回复"""
+        user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        text = self.config.responses[int(self._draw("reply|" + str(user)) * len(self.config.responses))]
+        ids = MESSAGE_ID_PATTERN.findall("\n".join(str(m.get("content", "")) for m in messages))
+        return text.replace("{message_id}", ids[-1] if ids else "0")
+
+    def _make_handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _json(self, status: int, body: Dict[str, Any]):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._json(200, {"object": "list", "data": [{"id": "mock-chat", "object": "model"}]})
+                else:
+                    self._json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._json(404, {"error": {"message": "not found"}})
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._json(400, {"error": {"message": "invalid json"}})
+                    return
+
+                cfg = server.config
+                messages = body.get("messages", [])
+                user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+                limited = server._draw("429|" + str(user)) < cfg.rate_limit
+                with server._lock:
+                    server.requests += 1
+                    limited = limited or 0 < cfg.max_concurrency <= server.inflight
+                    if limited:
+                        server.rate_limited += 1
+                    else:
+                        server.inflight += 1
+                if limited:
+                    self._json(429, {"error": {"message": "rate limited", "type": "rate_limit_exceeded"}})
+                    return
+
+                try:
+                    self._complete(body, messages)
+                finally:
+                    with server._lock:
+                        server.inflight -= 1
+
+            def _complete(self, body: Dict[str, Any], messages: List[Dict[str, Any]]):
+                cfg = server.config
+                model = body.get("model", "mock-chat")
+                text = server.complete(messages)
+                prompt_tokens = sum(count_tokens(str(m.get("content", ""))) for m in messages)
+                pieces = split_tokens(text)
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(pieces),
+                    "total_tokens": prompt_tokens + len(pieces),
+                }
+                created = int(time.time())
+                completion_id = f"chatcmpl-mock-{server.requests}"
+                step = 1.0 / cfg.tokens_per_second if cfg.tokens_per_second > 0 else 0.0
+
+                time.sleep(cfg.ttft)
+                if not body.get("stream"):
+                    time.sleep(step * max(len(pieces) - 1, 0))
+                    self._json(200, {
+                        "id": completion_id,
+                        "object": "chat.completion",
+                        "created": created,
+                        "model": model,
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": text},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": usage,
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                def send(delta: Dict[str, Any], finish: str | None = None, extra: Dict[str, Any] | None = None):
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                    }
+                    chunk.update(extra or {})
+                    self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                send({"role": "assistant", "content": ""})
+                for i, piece in enumerate(pieces):
+                    if i:
+                        time.sleep(step)
+                    send({"content": piece})
+                send({}, "stop", {"usage": usage})
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+        return _Handler
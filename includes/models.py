@@ -6,6 +6,23 @@ from dataclasses import dataclass, field
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+# CQ 码转义表：文本中转义 & [ ]，参数值中还要转义逗号
+_TEXT_ESCAPE = str.maketrans({"&": "&amp;", "[": "&#91;", "]": "&#93;"})
+_PARAM_ESCAPE = str.maketrans({"&": "&amp;", "[": "&#91;", "]": "&#93;", ",": "&#44;"})
+
+Segment = Dict[str, Any]  # OneBot 数组格式消息段：{"type": ..., "data": {...}}
+
+
+def escape(text: str, param: bool = False) -> str:
+    """
+    CQ 码转义
+    
+    Args:
+        text: 原文
+        param: 是否作为 CQ 码参数值（额外转义逗号）
+    """
+    return text.translate(_PARAM_ESCAPE if param else _TEXT_ESCAPE)
+
 
 @dataclass
 class MessageInfo:
@@ -101,16 +118,23 @@ class CQCode:
         """
         self.function = function
         self.params = params
+        self._str: str | None = None  # 参数在构造后视为不可变，字符串只生成一次
     
     def __str__(self) -> str:
-        """转换为 CQ 码字符串"""
-        if not self.params:
-            return f"[CQ:{self.function}]"
-        
-        params_str = ",".join(
-            f"{k}={v}" for k, v in self.params.items()
-        )
-        return f"[CQ:{self.function},{params_str}]"
+        """转换为 CQ 码字符串（参数值已转义）"""
+        if self._str is None:
+            if not self.params:
+                self._str = f"[CQ:{self.function}]"
+            else:
+                params_str = ",".join(
+                    f"{k}={escape(str(v), param=True)}" for k, v in self.params.items()
+                )
+                self._str = f"[CQ:{self.function},{params_str}]"
+        return self._str
+    
+    def to_segment(self) -> Segment:
+        """转换为数组格式消息段"""
+        return {"type": self.function, "data": {k: str(v) for k, v in self.params.items()}}
     
     @staticmethod
     def face(id: int) -> "CQCode":
@@ -280,3 +304,157 @@ class MessageBuilder:
     def __str__(self) -> str:
         """转换为字符串"""
         return self.build()
+
+
+class Seg:
+    """
+    数组格式消息段工厂
+    
+    返回的消息段直接作为 OneBot 数组消息发送，不需要实现端再解析 CQ 码，也不需要转义；
+    文本中的 CQ 码因此按原文显示，需要表情、@ 等时用对应的工厂方法。
+    每次调用都返回新的字典，调用方可以放心修改。
+    """
+    
+    @staticmethod
+    def rps() -> Segment:
+        """猜拳魔法表情"""
+        return {"type": "rps", "data": {}}
+    
+    @staticmethod
+    def dice() -> Segment:
+        """掷骰子魔法表情"""
+        return {"type": "dice", "data": {}}
+    
+    @staticmethod
+    def shake() -> Segment:
+        """窗口抖动"""
+        return {"type": "shake", "data": {}}
+    
+    @staticmethod
+    def text(text: str) -> Segment:
+        """纯文本"""
+        return {"type": "text", "data": {"text": text}}
+    
+    @staticmethod
+    def face(id: int) -> Segment:
+        """QQ 表情"""
+        return {"type": "face", "data": {"id": str(id)}}
+    
+    @staticmethod
+    def emoji(id: int) -> Segment:
+        """emoji 表情"""
+        return {"type": "emoji", "data": {"id": str(id)}}
+    
+    @staticmethod
+    def at(qq: int | str) -> Segment:
+        """@某人（qq 为 "all" 时 @全体）"""
+        return {"type": "at", "data": {"qq": str(qq)}}
+    
+    @staticmethod
+    def reply(id: int) -> Segment:
+        """回复"""
+        return {"type": "reply", "data": {"id": str(id)}}
+    
+    @staticmethod
+    def image(file: str, url: str = "", cache: int = 1) -> Segment:
+        """图片"""
+        data = {"file": file, "cache": str(cache)}
+        if url:
+            data["url"] = url
+        return {"type": "image", "data": data}
+    
+    @staticmethod
+    def record(file: str, cache: int = 1) -> Segment:
+        """语音"""
+        return {"type": "record", "data": {"file": file, "cache": str(cache)}}
+    
+    @staticmethod
+    def poke(type: str, id: int) -> Segment:
+        """戳一戳"""
+        return {"type": "poke", "data": {"type": type, "id": str(id)}}
+    
+    @staticmethod
+    def node(id: int) -> Segment:
+        """转发节点（消息ID）"""
+        return {"type": "node", "data": {"id": str(id)}}
+    
+    @staticmethod
+    def node_custom(user_id: int, nickname: str, content: "str | List[Segment]") -> Segment:
+        """转发节点（自定义，content 为纯文本或消息段列表）"""
+        if isinstance(content, str):
+            content = [Seg.text(content)]
+        return {"type": "node", "data": {"user_id": str(user_id), "nickname": nickname, "content": content}}
+
+
+
+class SegmentBuilder:
+    """数组格式消息构建器（build() 的结果可直接传给 send_group_msg 等接口）"""
+    
+    def __init__(self):
+        """初始化构建器"""
+        self.segments: List[Segment] = []
+    
+    def text(self, content: str) -> "SegmentBuilder":
+        """添加文本（与前一个文本段合并）"""
+        if not content:
+            return self
+        last = self.segments[-1] if self.segments else None
+        if last is not None and last["type"] == "text":
+            self.segments[-1] = Seg.text(last["data"]["text"] + content)
+        else:
+            self.segments.append(Seg.text(content))
+        return self
+    
+    def add(self, content: Any) -> "SegmentBuilder":
+        """添加消息段、CQCode 或文本"""
+        if isinstance(content, dict):
+            self.segments.append(content)
+        elif isinstance(content, CQCode):
+            self.segments.append(content.to_segment())
+        elif isinstance(content, (list, tuple)):
+            for item in content:
+                self.add(item)
+        else:
+            self.text(str(content))
+        return self
+    
+    def reply(self, id: int) -> "SegmentBuilder":
+        """添加回复"""
+        return self.add(Seg.reply(id))
+    
+    def at(self, qq: int | str) -> "SegmentBuilder":
+        """添加 @"""
+        return self.add(Seg.at(qq))
+    
+    def face(self, id: int) -> "SegmentBuilder":
+        """添加 QQ 表情"""
+        return self.add(Seg.face(id))
+    
+    def image(self, file: str, url: str = "") -> "SegmentBuilder":
+        """添加图片"""
+        return self.add(Seg.image(file, url))
+    
+    def build(self) -> List[Segment]:
+        """构建数组格式消息"""
+        return list(self.segments)
+    
+    def to_cq(self) -> str:
+        """转换为 CQ 码字符串（用于日志或只接受字符串的场合）"""
+        parts = []
+        for seg in self.segments:
+            data = seg["data"]
+            if seg["type"] == "text":
+                parts.append(escape(data["text"]))
+            elif data:
+                params = ",".join(f"{k}={escape(str(v), param=True)}" for k, v in data.items())
+                parts.append(f"[CQ:{seg['type']},{params}]")
+            else:
+                parts.append(f"[CQ:{seg['type']}]")
+        return "".join(parts)
+    
+    def __len__(self) -> int:
+        return len(self.segments)
+    
+    def __str__(self) -> str:
+        """转换为字符串"""
+        return self.to_cq()
@@ -0,0 +1,114 @@
+"""
+消息索引 - message_id 到（群号, 发送者, 时间, 历史行号）的索引
+
+历史行只以文本形式保存 (MessageId)，校验模型输出的 message_id 或取回原消息原本要
+线性扫描历史或调用 get_msg。收到消息时增量记录到这里，查询为 O(1)，不需要额外的 API 调用。
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, NamedTuple
+
+from .metrics import registry
+
+HISTORY_LINE = re.compile(r"^(\d+): .* : \(MessageId\)(-?\d+)\s*$", re.S)
+
+MSGINDEX_LOOKUPS = registry.counter("msgindex_lookups_total", "消息索引查询次数")
+MSGINDEX_ENTRIES = registry.gauge("msgindex_entries", "消息索引条目数")
+
+
+class MessageRef(NamedTuple):
+    """索引中的一条消息"""
+
+    group_id: int
+    user_id: int
+    time: float
+    offset: int  # 在群历史中的行号（含已归档部分），-1 表示没有写入历史
+
+
+class MessageIndex:
+    """有容量上限的消息索引（线程安全，超出容量时淘汰最早加入的消息）"""
+
+    def __init__(self, capacity: int = 100000):
+        """
+        初始化索引
+
+        Args:
+            capacity: 最多保留的消息数
+        """
+        self.capacity = capacity
+        self._entries: "OrderedDict[int, MessageRef]" = OrderedDict()
+        self._lock = threading.Lock()
+        MSGINDEX_ENTRIES.set_function(lambda: len(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self._entries
+
+    def add(self, message_id: int, group_id: int, user_id: int, time: float, offset: int = -1):
+        """记录一条消息（已存在时覆盖）"""
+        with self._lock:
+            self._entries[message_id] = MessageRef(group_id, user_id, time, offset)
+            self._entries.move_to_end(message_id)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def set_offset(self, message_id: int, offset: int):
+        """消息写入历史后记录其行号"""
+        with self._lock:
+            ref = self._entries.get(message_id)
+            if ref is not None:
+                self._entries[message_id] = ref._replace(offset=offset)
+
+    def get(self, message_id: int) -> MessageRef | None:
+        return self._entries.get(message_id)
+
+    def resolve(self, message_id: int, group_id: int) -> MessageRef | None:
+        """
+        校验 message_id 是否为该群中的消息
+
+        Returns:
+            MessageRef | None: 不存在或属于其他群时为 None
+        """
+        ref = self._entries.get(message_id)
+        if ref is None:
+            MSGINDEX_LOOKUPS.inc(result="miss")
+            return None
+        if ref.group_id != group_id:
+            MSGINDEX_LOOKUPS.inc(result="foreign")
+            return None
+        MSGINDEX_LOOKUPS.inc(result="hit")
+        return ref
+
+    def index_history(self, group_id: int, lines: Iterable[str], base: int = 0) -> int:
+        """
+        从历史行建立索引（历史行不带时间，time 记为 0）
+
+        Args:
+            group_id: 群号
+            lines: 历史行
+            base: 第一行在群历史中的行号
+
+        Returns:
+            int: 索引的消息数
+        """
+        count = 0
+        for i, line in enumerate(lines):
+            match = HISTORY_LINE.match(line)
+            if match is not None:
+                self.add(int(match.group(2)), group_id, int(match.group(1)), 0.0, base + i)
+                count += 1
+        return count
+
+    def dump(self) -> List[list]:
+        """导出为 [[message_id, 群号, 发送者, 时间, 行号], ...]（用于状态快照）"""
+        with self._lock:
+            return [[message_id, *ref] for message_id, ref in self._entries.items()]
+
+    def load(self, state: List[list]):
+        """从 dump 的结果恢复"""
+        for message_id, group_id, user_id, time, offset in state:
+            self.add(message_id, group_id, user_id, time, offset)
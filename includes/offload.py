@@ -0,0 +1,91 @@
+"""
+进程池卸载 - 把 CPU 密集的处理器工作放到独立进程执行
+
+事件循环线程只负责收发和 echo 分发；JSON 序列化、大段历史的正则扫描、分词等
+重活在子进程中跑，不和事件循环争 GIL。只有可 pickle 的参数会被送进子进程。
+"""
+
+import asyncio
+import importlib
+import os
+from typing import TYPE_CHECKING, Any, Callable
+
+from .log import get_logger
+from .metrics import registry
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+logger = get_logger("offload")
+
+OFFLOAD_TASKS = registry.counter("offload_tasks_total", "送入进程池的任务数")
+OFFLOAD_ERRORS = registry.counter("offload_errors_total", "进程池任务失败数")
+
+
+def _call_by_reference(module: str, qualname: str, args: tuple) -> Any:
+    """
+    子进程入口：按模块名与限定名找到函数后调用
+
+    处理函数被装饰后，模块里同名属性是 EventHandler 而不是函数本身，
+    无法直接按引用 pickle，所以只传名字，在子进程中取出 callback。
+    """
+    target: Any = importlib.import_module(module)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    target = getattr(target, "callback", None) or target
+    return target(*args)
+
+
+class ProcessOffload:
+    """按需启动的进程池（首次提交任务时才创建子进程）"""
+
+    def __init__(self, max_workers: int | None = None, start_method: str = "spawn"):
+        """
+        初始化进程池
+
+        Args:
+            max_workers: 子进程数（None 为 CPU 核数减一，至少 1）
+            start_method: 子进程启动方式；默认 spawn，避免在多线程进程中 fork
+        """
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.start_method = start_method
+        self._executor: "ProcessPoolExecutor | None" = None
+
+    def _get_executor(self) -> "ProcessPoolExecutor":
+        if self._executor is None:
+            # 多数部署没有 PROCESS 处理器，进程池相关模块用到时才导入
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            context = multiprocessing.get_context(self.start_method)
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=context)
+            logger.info("进程池已启动: %s 个子进程", self.max_workers)
+        return self._executor
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """
+        在子进程中执行 func(*args)
+
+        Args:
+            func: 模块级函数（或被 EventHandler 装饰的函数）
+            *args: 参数，必须可 pickle
+
+        Returns:
+            Any: 函数返回值（必须可 pickle）
+        """
+        module = getattr(func, "__module__", None)
+        qualname = getattr(func, "__qualname__", None)
+        if not module or not qualname or "<locals>" in qualname:
+            raise TypeError(f"只有模块级函数可以在子进程中执行: {func!r}")
+        OFFLOAD_TASKS.inc()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), _call_by_reference, module, qualname, args)
+        except Exception:
+            OFFLOAD_ERRORS.inc()
+            raise
+
+    def shutdown(self, wait: bool = True):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,298 @@
+"""
+历史持久化 - 单写线程负责历史文件的全部写入
+
+处理器不再各自 读取整个 JSON → 修改 → 整个写回：历史常驻内存，读取直接取内存中的副本；
+追加、覆盖都作为操作放进队列，由唯一的写线程按顺序应用，攒一批后写一次文件。
+写入先写临时文件再 os.replace，崩溃不会留下写了一半的 JSON；fsync 策略可单独配置，
+持久性和吞吐量互不牵制。超出 MAX_LINES 的旧历史同样由写线程移入归档。
+
+内存副本可以随状态快照导出（dump / restore）：启动时快照与历史文件一致就直接用快照，
+不必解析整个 JSON；文件在快照之后写入过则照常读取文件。
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+from .log import get_logger
+from .memory import MAX_LINES, MEMORY_LOAD, MEMORY_PATH, MEMORY_SAVE, PLACEHOLDER, archive_overflow, get_archive
+from .metrics import registry
+
+logger = get_logger("persist")
+
+MEMORY_BATCH = registry.histogram("memory_write_batch_size", "每次写入文件合并的操作数",
+                                  buckets=(1, 2, 5, 10, 20, 50, 100, 200))
+MEMORY_QUEUE_DEPTH = registry.gauge("memory_queue_depth", "等待写线程处理的历史操作数")
+
+
+class FsyncPolicy:
+    """写入文件后何时 fsync"""
+
+    ALWAYS = "always"  # 每次写入都 fsync
+    INTERVAL = "interval"  # 距上次 fsync 超过 fsync_interval 才 fsync
+    NEVER = "never"  # 交给操作系统
+
+
+_Op = Tuple[str, Any, Any, Any]  # (类型, 群号, 内容, 回调/_Done)
+
+
+FILE_STAMP = "@file"  # dump 结果中记录历史文件大小和修改时间的键（群号不会与之冲突）
+
+
+class _Done(threading.Event):
+    """flush/stop/dump 的完成通知，ok 为 False 表示写入文件失败；dump 的结果在 result 中"""
+
+    ok = True
+    result: Any = None
+
+
+class HistoryStore:
+    """群聊历史的内存副本与单写线程（线程安全）"""
+
+    def __init__(self, path: str = MEMORY_PATH, flush_interval: float = 1.0,
+                 fsync: str = FsyncPolicy.INTERVAL, fsync_interval: float = 10.0):
+        """
+        初始化（首次访问时才读取文件、启动写线程）
+
+        Args:
+            path: 历史文件路径
+            flush_interval: 有修改后最多等待多久写入文件（秒），期间的操作合并为一次写入
+            fsync: fsync 策略（FsyncPolicy）
+            fsync_interval: INTERVAL 策略下两次 fsync 的最小间隔（秒）
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._memories: Dict[str, List[str]] | None = None
+        self._times: Dict[str, List[float | None]] = {}  # 与历史行一一对应的消息时间（只在内存和快照中，None 为未知）
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[_Op]" = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._last_fsync = 0.0
+        MEMORY_QUEUE_DEPTH.set_function(self._queue.qsize)
+
+    def _load(self) -> Dict[str, List[str]]:
+        with self._lock:
+            if self._memories is None:
+                try:
+                    with MEMORY_LOAD.time(), open(self.path, "r", encoding="utf-8") as doc:
+                        self._memories = json.load(doc)
+                except FileNotFoundError:
+                    self._memories = {}
+                self._start()
+            return self._memories
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def _stamp(self) -> List[int] | None:
+        """历史文件的 [大小, 修改时间]，文件不存在时为 None"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    # ========== 读取 ==========
+
+    def get(self, gid: str) -> List[str]:
+        """某个群最近 MAX_LINES 行历史的副本（没有历史时为占位行）"""
+        memories = self._load()
+        with self._lock:
+            return memories.get(gid, [PLACEHOLDER])[-MAX_LINES:]
+
+    def tail(self, gid: str) -> Tuple[int, List[str]]:
+        """
+        同 get，另外给出第一行在群历史中的行号
+
+        从文件读取的历史可能超过 MAX_LINES 行（下次写入时才移入归档），行号要算上超出的部分。
+        """
+        memories = self._load()
+        with self._lock:
+            lines = memories.get(gid, [PLACEHOLDER])
+            return len(get_archive().group(gid)) + max(0, len(lines) - MAX_LINES), lines[-MAX_LINES:]
+
+    def groups(self) -> List[str]:
+        memories = self._load()
+        with self._lock:
+            return list(memories)
+
+    # ========== 状态快照 ==========
+
+    def dump(self, timeout: float = 10.0) -> Dict[str, Any]:
+        """
+        导出内存副本（按群拆分为 [历史行, 消息时间]，用于状态快照）
+
+        由写线程在写入已提交的操作之后复制，此时内存副本与历史文件的内容一致，
+        同时记下文件的大小和修改时间。
+
+        Raises:
+            OSError: 超时或历史未能写入文件（这次快照不含历史）
+        """
+        if self._memories is None:
+            return {}
+        done = _Done()
+        self._queue.put(("dump", None, None, done))
+        if not done.wait(timeout) or not done.ok:
+            raise OSError("历史未能写入文件，快照跳过历史")
+        return done.result
+
+    def restore(self, state: Mapping[str, Any]):
+        """用 dump 的结果代替读取历史文件（已经读取过，或文件在快照之后有变化时什么也不做）"""
+        with self._lock:
+            if self._memories is not None:
+                return
+            if state.get(FILE_STAMP) != self._stamp():
+                logger.info("历史文件在快照之后有变化，从文件读取")
+                return
+            self._memories = {}
+            for gid in state:
+                if gid != FILE_STAMP:
+                    self._memories[gid], self._times[gid] = state[gid]
+            self._start()
+
+    # ========== 写入（由写线程按提交顺序应用） ==========
+
+    def append(self, gid: str, line: str, on_offset: Callable[[int], None] | None = None, ts: float | None = None):
+        """
+        追加一行历史
+
+        Args:
+            on_offset: 应用后在写线程中以该行在群历史中的行号（含已归档部分）调用
+            ts: 消息的时间（默认为应用时刻），该行移入归档时作为归档的时间戳
+        """
+        self._load()
+        self._queue.put(("append", gid, (line, ts), on_offset))
+
+    def update(self, gid: str, lines: List[str]):
+        """覆盖某个群的历史"""
+        self._load()
+        self._queue.put(("update", gid, list(lines), None))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        立即写入已提交的操作，等待写入完成
+
+        Returns:
+            bool: 已写入文件；超时或写入失败时为 False
+        """
+        if self._memories is None:
+            return True
+        done = _Done()
+        self._queue.put(("flush", None, None, done))
+        return done.wait(timeout) and done.ok
+
+    def close(self, timeout: float | None = 10.0) -> bool:
+        """
+        写入剩余操作并停止写线程
+
+        Returns:
+            bool: 剩余操作已写入文件；超时或写入失败时为 False
+        """
+        if self._thread is None:
+            return True
+        done = _Done()
+        self._queue.put(("stop", None, None, done))
+        written = done.wait(timeout) and done.ok
+        self._thread.join(timeout)
+        self._thread = None
+        if not written:
+            logger.error("停止写线程时历史未能写入文件")
+        return written
+
+    # ========== 写线程 ==========
+
+    def _group_times(self, gid: str, lines: List[str]) -> List[float | None]:
+        """与 lines 对齐的消息时间（从文件读取的历史没有时间，全为 None；调用方持锁）"""
+        times = self._times.get(gid)
+        if times is None or len(times) != len(lines):
+            return [None] * len(lines)
+        return times
+
+    def _apply(self, op: _Op):
+        kind, gid, value, callback = op
+        assert self._memories is not None
+        with self._lock:
+            if kind == "append":
+                line, ts = value
+                lines = self._memories.setdefault(gid, [PLACEHOLDER])
+                times = self._times[gid] = self._group_times(gid, lines)
+                offset = len(get_archive().group(gid)) + len(lines)
+                lines.append(line)
+                times.append(time.time() if ts is None else ts)
+            else:
+                lines = self._memories[gid] = value
+                times = self._times[gid] = [None] * len(lines)
+            archive_overflow(gid, lines, times)
+        if kind == "append" and callback is not None:
+            callback(offset)
+
+    def _run(self):
+        dirty = 0  # 尚未写入文件的操作数
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if dirty else None
+            try:
+                op = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                op = None
+
+            if op is not None and op[0] in ("append", "update"):
+                try:
+                    self._apply(op)
+                except Exception as e:
+                    logger.error("应用历史操作失败: %s", e)
+                    continue
+                if not dirty:
+                    deadline = time.monotonic() + self.flush_interval
+                dirty += 1
+                continue
+
+            if dirty:
+                try:
+                    self._write()
+                    MEMORY_BATCH.observe(dirty)
+                    dirty = 0
+                except Exception as e:  # 任何异常都不能让写线程退出，否则 flush() 会一直等下去
+                    logger.error("写入历史文件失败: %s", e)
+                    deadline = time.monotonic() + self.flush_interval
+            if op is not None:
+                op[3].ok = not dirty
+                if op[0] == "dump" and not dirty:
+                    op[3].result = self._copy()
+                op[3].set()
+                if op[0] == "stop":
+                    return
+
+    def _copy(self) -> Dict[str, Any]:
+        """已全部写入文件时的内存副本与文件标记（写线程中调用）"""
+        with self._lock:
+            state: Dict[str, Any] = {gid: [list(lines), list(self._group_times(gid, lines))]
+                                     for gid, lines in self._memories.items()}  # type: ignore
+        state[FILE_STAMP] = self._stamp()
+        return state
+
+    def _write(self):
+        """整个历史写入临时文件后替换"""
+        with self._lock:  # 只在复制时持锁，序列化期间不挡读取
+            snapshot = {gid: list(lines) for gid, lines in self._memories.items()}  # type: ignore
+        with MEMORY_SAVE.time():
+            data = json.dumps(snapshot, ensure_ascii=False, indent=2)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as doc:
+                doc.write(data)
+                doc.flush()
+                now = time.monotonic()
+                if self.fsync == FsyncPolicy.ALWAYS or \
+                        (self.fsync == FsyncPolicy.INTERVAL and now - self._last_fsync >= self.fsync_interval):
+                    os.fsync(doc.fileno())
+                    self._last_fsync = now
+            os.replace(tmp, self.path)
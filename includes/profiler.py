@@ -0,0 +1,127 @@
+"""
+性能剖析 - 采样所有线程的调用栈，输出火焰图可用的折叠栈格式
+
+折叠栈（folded stacks）每行形如 "线程;函数a;函数b 采样数"，
+可直接交给 flamegraph.pl、speedscope、inferno 等工具。
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{frame.f_lineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """采样分析器：后台线程按固定间隔抓取所有线程的调用栈"""
+
+    def __init__(self, interval: float = 0.005, thread_labels: Callable[[], Dict[int, str]] | None = None):
+        """
+        初始化采样分析器
+
+        Args:
+            interval: 采样间隔（秒）
+            thread_labels: 返回 {线程 ident: 标签} 的函数，标签会作为该线程栈的根，
+                           用于把采样归到当时正在执行的处理器上
+        """
+        self.interval = interval
+        self.thread_labels = thread_labels
+        self.stacks: Counter = Counter()
+        self.labels: Counter = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def sample(self):
+        """采集一次所有线程的调用栈"""
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        labels = self.thread_labels() if self.thread_labels else {}
+
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.reverse()
+
+            root = [names.get(ident, f"thread-{ident}").replace(";", ":")]
+            label = labels.get(ident)
+            if label:
+                root.append(f"handler:{label}".replace(";", ":"))
+                self.labels[label] += 1
+            self.stacks[";".join(root + stack)] += 1
+        self.samples += 1
+
+    def run(self, duration: float):
+        """在当前线程中采样 duration 秒（阻塞）"""
+        start = time.perf_counter()
+        deadline = start + duration
+        while time.perf_counter() < deadline:
+            self.sample()
+            time.sleep(self.interval)
+        self.elapsed = time.perf_counter() - start
+
+    def start(self, duration: float, on_finish: Callable[["SamplingProfiler"], None] | None = None) -> bool:
+        """
+        在后台线程中采样 duration 秒
+
+        Args:
+            duration: 采样时长（秒）
+            on_finish: 采样结束后调用，参数为分析器本身
+
+        Returns:
+            bool: 已有采样在进行时返回 False
+        """
+        if self.running:
+            return False
+
+        def target():
+            self.run(duration)
+            if on_finish:
+                on_finish(self)
+
+        self._thread = threading.Thread(target=target, name="profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def write_folded(self, path: str):
+        """写出折叠栈文件"""
+        with open(path, "w", encoding="utf-8") as doc:
+            for stack, count in self.stacks.most_common():
+                doc.write(f"{stack} {count}\n")
+
+    def write_summary(self, path: str, handler_wall: Dict[str, float] | None = None):
+        """
+        写出处理器耗时汇总
+
+        Args:
+            path: 输出路径
+            handler_wall: 采样期间各处理器实际执行的墙钟时间（秒）
+        """
+        lines = [
+            f"采样时长: {self.elapsed:.2f}s  采样次数: {self.samples}  间隔: {self.interval * 1000:.1f}ms",
+            "",
+            f"{'处理器':<48}{'采样线程数':>10}{'估算墙钟(s)':>14}{'实测墙钟(s)':>14}",
+        ]
+        step = self.elapsed / self.samples if self.samples else 0.0
+        names = set(self.labels) | set(handler_wall or {})
+        for name in sorted(names, key=lambda n: -(handler_wall or {}).get(n, self.labels[n] * step)):
+            measured = (handler_wall or {}).get(name)
+            measured_text = f"{measured:.3f}" if measured is not None else "-"
+            lines.append(f"{name:<48}{self.labels[name]:>10}{self.labels[name] * step:>14.3f}{measured_text:>14}")
+        with open(path, "w", encoding="utf-8") as doc:
+            doc.write("\n".join(lines) + "\n")
@@ -0,0 +1,314 @@
+"""
+OneBot 模拟器 - 本地假 OneBot v11 WebSocket 服务端，用于压测和测试
+
+Bot(ws_url=simulator.url) 可以直接连接。模拟器按设定速率向 N 个群推送
+群消息事件（回放给定消息或合成消息），按可配置延迟回应 API 调用，
+并统计推送量、API 调用量以及被丢弃（不回应）的调用。
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+import websockets
+
+from .log import get_logger
+
+logger = get_logger("simulator")
+
+SYNTHETIC_MESSAGES = [
+    "笑死", "bot 你在吗", "这也太离谱了", "有人玩原神吗？", "绷不住了",
+    "python 怎么装库", "今天好热", "[CQ:face,id=178]", "确实", "gpt 又降智了",
+]
+
+
+@dataclass
+class SimulatorConfig:
+    """模拟器配置"""
+
+    groups: int = 10  # 群数量
+    users_per_group: int = 20  # 每个群的发言人数
+    rate: float = 20.0  # 每秒推送的消息事件总数（0 表示不自动推送）
+    duration: float = 0.0  # 自动推送时长（秒，0 表示一直推送）
+    api_latency: float = 0.02  # API 回应的基础延迟（秒）
+    api_jitter: float = 0.0  # 在基础延迟上叠加的随机延迟上限（秒）
+    drop_rate: float = 0.0  # 不回应的 API 调用比例
+    heartbeat_interval: float = 5.0  # 心跳间隔（秒，0 为关闭）
+    self_id: int = 10000
+    base_group_id: int = 100000
+    messages: List[str] = field(default_factory=lambda: list(SYNTHETIC_MESSAGES))
+    seed: int | None = None
+
+
+@dataclass
+class ApiRecord:
+    """一次 API 调用记录"""
+
+    action: str
+    params: Dict[str, Any]
+    received: float
+    dropped: bool
+
+
+class OneBotSimulator:
+    """本地 OneBot v11 模拟服务端"""
+
+    def __init__(self, config: SimulatorConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        初始化模拟器
+
+        Args:
+            config: 模拟器配置
+            host: 监听地址
+            port: 监听端口（0 为自动分配）
+        """
+        self.config = config or SimulatorConfig()
+        self.host = host
+        self.port = port
+        self.rng = random.Random(self.config.seed)
+        self.actions: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "send_group_msg": self._send_msg,
+            "send_private_msg": self._send_msg,
+            "send_msg": self._send_msg,
+            "send_group_forward_msg": self._send_msg,
+            "send_private_forward_msg": self._send_msg,
+            "get_group_info": self._get_group_info,
+            "get_group_member_info": self._get_group_member_info,
+            "get_login_info": lambda params: {"user_id": self.config.self_id, "nickname": "TLoH Bot"},
+            "get_status": lambda params: {"online": True, "good": True},
+        }
+        self.clients: set = set()
+        self.calls: List[ApiRecord] = []
+        self.events_sent = 0
+        self.started = 0.0
+        self.stopped = 0.0
+        self._message_ids = itertools.count(1)
+        self._server = None
+        self._tasks: List[asyncio.Task] = []
+        self._connected = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._call_listeners: List[Callable[[ApiRecord], None]] = []
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    # ========== 生命周期 ==========
+
+    async def start(self):
+        """启动服务端（在当前事件循环中）"""
+        self._loop = asyncio.get_running_loop()
+        self._connected = asyncio.Event()
+        self._server = await websockets.serve(self._serve_client, self.host, self.port)
+        self.port = next(iter(self._server.sockets)).getsockname()[1]
+        if self.config.rate > 0:
+            self._tasks.append(asyncio.create_task(self._push_loop()))
+        if self.config.heartbeat_interval > 0:
+            self._tasks.append(asyncio.create_task(self._heartbeat_loop()))
+
+    async def stop(self):
+        """停止服务端"""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def start_in_thread(self) -> "OneBotSimulator":
+        """在后台线程的独立事件循环中启动，返回时已开始监听"""
+        ready = threading.Event()
+
+        def target():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        self._thread = threading.Thread(target=target, name="onebot-simulator", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop_thread(self):
+        """停止 start_in_thread 启动的模拟器"""
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    def wait_connected(self, timeout: float = 10.0) -> bool:
+        """（线程安全）等待 Bot 连接"""
+        future = asyncio.run_coroutine_threadsafe(asyncio.wait_for(self._connected.wait(), timeout), self._loop)  # type: ignore
+        try:
+            future.result(timeout + 1)
+            return True
+        except Exception:
+            return False
+
+    # ========== 事件推送 ==========
+
+    def make_group_message(self, group_id: int, user_id: int, text: str) -> Dict[str, Any]:
+        """构造 OneBot v11 群消息事件"""
+        return {
+            "time": int(time.time()),
+            "self_id": self.config.self_id,
+            "post_type": "message",
+            "message_type": "group",
+            "sub_type": "normal",
+            "message_id": next(self._message_ids),
+            "group_id": group_id,
+            "user_id": user_id,
+            "anonymous": None,
+            "message": text,
+            "raw_message": text,
+            "font": 0,
+            "sender": {"user_id": user_id, "nickname": f"user{user_id}", "role": "member"},
+        }
+
+    async def broadcast(self, event: Dict[str, Any]):
+        """向所有已连接的客户端推送事件"""
+        data = json.dumps(event, ensure_ascii=False)
+        for client in list(self.clients):
+            try:
+                await client.send(data)
+            except websockets.ConnectionClosed:
+                self.clients.discard(client)
+        if event.get("post_type") == "message":
+            self.events_sent += 1
+
+    def push_group_message(self, group_id: int, user_id: int, text: str) -> int:
+        """（线程安全）推送一条群消息，返回 message_id"""
+        event = self.make_group_message(group_id, user_id, text)
+        asyncio.run_coroutine_threadsafe(self.broadcast(event), self._loop).result()  # type: ignore
+        return event["message_id"]
+
+    def _random_message(self) -> Dict[str, Any]:
+        cfg = self.config
+        group_id = cfg.base_group_id + self.rng.randrange(cfg.groups)
+        user_id = 1000000 + self.rng.randrange(cfg.users_per_group)
+        return self.make_group_message(group_id, user_id, self.rng.choice(cfg.messages))
+
+    async def _push_loop(self):
+        await self._connected.wait()
+        cfg = self.config
+        self.started = time.perf_counter()
+        sent = 0
+        while True:
+            elapsed = time.perf_counter() - self.started
+            if cfg.duration and elapsed >= cfg.duration:
+                break
+            due = int(elapsed * cfg.rate) + 1
+            while sent < due:
+                await self.broadcast(self._random_message())
+                sent += 1
+            await asyncio.sleep(max(0.001, (due / cfg.rate) - (time.perf_counter() - self.started)))
+        self.stopped = time.perf_counter()
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.config.heartbeat_interval)
+            await self.broadcast({
+                "time": int(time.time()),
+                "self_id": self.config.self_id,
+                "post_type": "meta_event",
+                "meta_event_type": "heartbeat",
+                "status": {"online": True, "good": True},
+                "interval": int(self.config.heartbeat_interval * 1000),
+            })
+
+    # ========== API 回应 ==========
+
+    def on_call(self, listener: Callable[[ApiRecord], None]):
+        """注册 API 调用监听器（在模拟器线程中调用）"""
+        self._call_listeners.append(listener)
+
+    async def _serve_client(self, websocket, *args):
+        self.clients.add(websocket)
+        self._connected.set()
+        await websocket.send(json.dumps({
+            "time": int(time.time()),
+            "self_id": self.config.self_id,
+            "post_type": "meta_event",
+            "meta_event_type": "lifecycle",
+            "sub_type": "connect",
+        }))
+        try:
+            async for message in websocket:
+                try:
+                    request = json.loads(message)
+                except json.JSONDecodeError:
+                    continue
+                asyncio.create_task(self._answer(websocket, request))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.clients.discard(websocket)
+
+    async def _answer(self, websocket, request: Dict[str, Any]):
+        cfg = self.config
+        action = request.get("action", "")
+        params = request.get("params") or {}
+        dropped = self.rng.random() < cfg.drop_rate
+        record = ApiRecord(action, params, time.perf_counter(), dropped)
+        self.calls.append(record)
+        for listener in self._call_listeners:
+            listener(record)
+        if dropped:
+            return
+
+        await asyncio.sleep(cfg.api_latency + self.rng.uniform(0, cfg.api_jitter))
+        handler = self.actions.get(action)
+        data = handler(params) if handler else None
+        response = {"status": "ok", "retcode": 0, "data": data, "echo": request.get("echo")}
+        try:
+            await websocket.send(json.dumps(response, ensure_ascii=False))
+        except websockets.ConnectionClosed:
+            pass
+
+    def _send_msg(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"message_id": next(self._message_ids)}
+
+    def _get_group_info(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        group_id = params.get("group_id", 0)
+        return {
+            "group_id": group_id,
+            "group_name": f"模拟群 {group_id}",
+            "member_count": self.config.users_per_group,
+            "max_member_count": 500,
+        }
+
+    def _get_group_member_info(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        user_id = params.get("user_id", 0)
+        return {
+            "group_id": params.get("group_id", 0),
+            "user_id": user_id,
+            "nickname": f"user{user_id}",
+            "card": "",
+            "role": "member",
+        }
+
+    # ========== 统计 ==========
+
+    def report(self) -> Dict[str, Any]:
+        """模拟器侧统计"""
+        end = self.stopped or time.perf_counter()
+        elapsed = end - self.started if self.started else 0.0
+        return {
+            "events_sent": self.events_sent,
+            "elapsed": elapsed,
+            "events_per_second": self.events_sent / elapsed if elapsed else 0.0,
+            "api_calls": dict(Counter(c.action for c in self.calls)),
+            "api_dropped": sum(1 for c in self.calls if c.dropped),
+        }
@@ -0,0 +1,258 @@
+"""
+状态快照 - 运行时状态的二进制快照与热重启恢复
+
+文件格式：
+    头部（魔数、marshal 版本、Python 版本、索引长度）| 索引 {段名: (偏移, 长度)} | 各段 marshal 数据
+
+读取时整个文件 mmap，启动只解析头部和索引；按群拆分的段（如 pending/<群号>）恢复时只复制出原始字节，
+首次访问才反序列化，即使有几百个群，启动也几乎不花时间。恢复结束即关闭文件，之后的 save() 可以直接替换它。
+"""
+
+import marshal
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Tuple
+
+from .log import get_logger
+from .metrics import registry
+
+logger = get_logger("snapshot")
+
+MAGIC = b"TLOHSNP1"
+HEADER = struct.Struct("<8sHBBI")  # 魔数, marshal 版本, Python 主/次版本, 索引长度
+
+SNAPSHOT_SAVE = registry.histogram("snapshot_save_seconds", "写入状态快照耗时")
+SNAPSHOT_RESTORE = registry.histogram("snapshot_restore_seconds", "恢复状态快照耗时")
+SNAPSHOT_BYTES = registry.gauge("snapshot_bytes", "最近一次状态快照的大小")
+
+
+def write_snapshot(path: str, sections: Dict[str, Any]) -> int:
+    """
+    写入快照（先写临时文件再替换，写到一半崩溃不会损坏旧快照）
+
+    Args:
+        path: 快照文件路径
+        sections: {段名: 值}，值只能由 dict/list/tuple/str/bytes/int/float/bool/None 组成
+
+    Returns:
+        int: 文件大小（字节）
+    """
+    index: Dict[str, Tuple[int, int]] = {}
+    payloads: List[bytes] = []
+    offset = 0
+    for name, value in sections.items():
+        data = marshal.dumps(value)
+        index[name] = (offset, len(data))
+        payloads.append(data)
+        offset += len(data)
+    index_data = marshal.dumps(index)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, marshal.version, sys.version_info[0], sys.version_info[1], len(index_data)))
+        f.write(index_data)
+        for data in payloads:
+            f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return HEADER.size + len(index_data) + offset
+
+
+class SnapshotReader:
+    """mmap 方式读取快照，各段按需反序列化"""
+
+    def __init__(self, path: str):
+        """
+        打开快照
+
+        Raises:
+            ValueError: 文件不是快照，或由不兼容的 Python 版本写入
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # 空文件
+            self._file.close()
+            raise ValueError("快照文件为空")
+        try:
+            magic, version, major, minor, index_length = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError("不是状态快照文件")
+            if version != marshal.version or (major, minor) != sys.version_info[:2]:
+                raise ValueError(f"快照由 Python {major}.{minor} 写入，与当前版本不兼容")
+            self._index: Dict[str, Tuple[int, int]] = marshal.loads(self._mm[HEADER.size:HEADER.size + index_length])
+            self._base = HEADER.size + index_length
+        except (ValueError, EOFError, struct.error):
+            self.close()
+            raise
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def names(self, prefix: str = "") -> List[str]:
+        """段名列表（可按前缀过滤）"""
+        return [name for name in self._index if name.startswith(prefix)]
+
+    def raw(self, name: str) -> bytes | None:
+        """一个段的原始数据（复制出映射，关闭读取器后仍可使用）"""
+        entry = self._index.get(name)
+        if entry is None:
+            return None
+        offset, length = entry
+        start = self._base + offset
+        return self._mm[start:start + length]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """反序列化一个段"""
+        data = self.raw(name)
+        return default if data is None else marshal.loads(data)
+
+    def close(self):
+        mm = getattr(self, "_mm", None)
+        if mm is not None:
+            mm.close()
+        self._file.close()
+
+
+class SectionView(Mapping):
+    """按前缀拆分的一组段（如 pending/<群号>），构造时复制出原始数据，访问某个键时才反序列化"""
+
+    def __init__(self, reader: SnapshotReader, prefix: str):
+        self._data: Dict[str, bytes] = {name[len(prefix):]: reader.raw(name) for name in reader.names(prefix)}  # type: ignore
+
+    def __getitem__(self, key: str) -> Any:
+        return marshal.loads(self._data[str(key)])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _Provider:
+    def __init__(self, dump: Callable[[], Any], restore: Callable[[Any], None], split: bool):
+        self.dump = dump
+        self.restore = restore
+        self.split = split
+
+
+class StateSnapshotter:
+    """运行时状态的定期快照与启动恢复"""
+
+    def __init__(self, path: str, interval: float = 60.0):
+        """
+        初始化快照器
+
+        Args:
+            path: 快照文件路径
+            interval: 定期写入间隔（秒，0 为只在退出时写入）
+        """
+        self.path = path
+        self.interval = interval
+        self._providers: Dict[str, _Provider] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def register(self, name: str, dump: Callable[[], Any], restore: Callable[[Any], None], split: bool = False):
+        """
+        注册一项状态
+
+        Args:
+            name: 段名
+            dump: 返回当前状态（只含基本类型）
+            restore: 用快照中的状态恢复
+            split: dump 返回 {键: 值} 时按键拆成多个段，恢复时得到按需反序列化的 SectionView
+        """
+        self._providers[name] = _Provider(dump, restore, split)
+
+    def save(self) -> int:
+        """立即写入快照，返回文件大小"""
+        sections: Dict[str, Any] = {}
+        for name, provider in self._providers.items():
+            try:
+                state = provider.dump()
+            except Exception as e:
+                logger.error("导出状态失败: %s: %s", name, e)
+                continue
+            if provider.split:
+                for key, value in state.items():
+                    sections[f"{name}/{key}"] = value
+            else:
+                sections[name] = state
+
+        with self._lock, SNAPSHOT_SAVE.time():
+            size = write_snapshot(self.path, sections)
+        SNAPSHOT_BYTES.set(size)
+        return size
+
+    def restore(self) -> List[str]:
+        """
+        从快照恢复已注册的状态（没有快照或快照不可用时什么也不做）
+
+        Returns:
+            List[str]: 已恢复的段名
+        """
+        start = time.perf_counter()
+        try:
+            reader = SnapshotReader(self.path)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            logger.warning("忽略无法读取的状态快照: %s", e)
+            return []
+
+        restored = []
+        try:
+            for name, provider in self._providers.items():
+                try:
+                    if provider.split:
+                        view = SectionView(reader, f"{name}/")
+                        if not len(view):
+                            continue
+                        provider.restore(view)
+                    elif name in reader:
+                        provider.restore(reader.get(name))
+                    else:
+                        continue
+                except Exception as e:
+                    logger.error("恢复状态失败: %s: %s", name, e)
+                    continue
+                restored.append(name)
+        finally:
+            # 不保留打开的文件：Windows 上 save() 的 os.replace 无法替换仍打开的文件
+            reader.close()
+        SNAPSHOT_RESTORE.observe(time.perf_counter() - start)
+        logger.info("已从状态快照恢复: %s", ", ".join(restored) or "无")
+        return restored
+
+    def start(self):
+        """启动定期写入线程"""
+        if self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="state-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止定期写入并写入最后一次快照"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.save()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.save()
+            except OSError as e:
+                logger.error("写入状态快照失败: %s", e)
@@ -0,0 +1,203 @@
+"""
+发言决策 - 判断 bot 是否要加入话题
+
+权重集中在 SpeakWeights 表中，SpeakDecisionEngine 既可以逐条评分，
+也可以用 NumPy 对一批消息统一评分（回放日志、合并窗口交来的多条消息）。
+"""
+
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+DEFAULT_KEYWORDS: Dict[str, float] = {
+    "bot": 0.6,
+    "@": 0.6,
+    "at": 100000000,  # 被at 100% 回复
+    "ai": 0.15,
+    "gpt": 0.15,
+    "python": 0.15,
+    "离谱": 0.08,
+    "笑死": 0.08,
+    "绷不住": 0.08,
+    "?": 0.10,
+    "？": 0.10,
+}
+
+
+@dataclass
+class SpeakWeights:
+    """发言决策权重表"""
+
+    base_rate: float = 0.03  # 基础触发率（建议 0.02~0.05）
+    keywords: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_KEYWORDS))
+    # 冷却惩罚：距上次发言不足 N 秒时乘以系数，按秒数升序排列
+    cooldown: Tuple[Tuple[float, float], ...] = ((30, 0.1), (120, 0.4))
+    # 群活跃度：最近消息数 >= busy_count 时惩罚，<= quiet_count 时奖励
+    busy_count: int = 6
+    busy_factor: float = 0.3
+    quiet_count: int = 1
+    quiet_factor: float = 1.5
+    # 随机抖动区间与最终概率上限
+    jitter: Tuple[float, float] = (0.7, 1.3)
+    max_rate: float = 0.95
+
+
+@dataclass
+class SpeakScore:
+    """单条消息的评分明细"""
+
+    keyword_bonus: float
+    delta: float  # 距 bot 上次发言的秒数（无记录时为 0）
+    activity_change: float  # 活跃度调整带来的概率变化量
+    rate: float  # 抖动并截断后的最终概率
+    speak: bool
+
+
+class SpeakDecisionEngine:
+    """发言决策引擎"""
+
+    def __init__(self, weights: SpeakWeights | None = None, rng: random.Random | None = None,
+                 np_rng: Any = None, seed: int | None = None):
+        """
+        初始化决策引擎
+
+        Args:
+            weights: 权重表（默认 SpeakWeights()）
+            rng: 逐条评分使用的随机数发生器
+            np_rng: 批量评分使用的 numpy.random.Generator
+            seed: 随机种子，未传入 rng / np_rng 时用于创建它们，便于复现
+        """
+        self.weights = weights or SpeakWeights()
+        self.seed = seed
+        self.rng = rng or random.Random(seed)
+        self._np_rng = np_rng
+
+    @property
+    def np_rng(self):
+        """批量评分的随机数发生器（首次使用时创建）"""
+        if self._np_rng is None:
+            import numpy as np
+            self._np_rng = np.random.default_rng(self.seed)
+        return self._np_rng
+
+    def score(self, msg: str, *, last_bot_time: float | None = None, now: float | None = None,
+              recent_msg_count: int = 0) -> SpeakScore:
+        """
+        对单条消息评分
+
+        Args:
+            msg: 当前消息文本
+            last_bot_time: bot 上次发言的时间戳（time.time()）
+            now: 当前时间戳
+            recent_msg_count: 最近 N 秒的消息数量（如 10 秒内）
+
+        Returns:
+            SpeakScore: 评分明细
+        """
+        w = self.weights
+        if now is None:
+            now = time.time()
+
+        # ===== 关键词加权 =====
+        lower_msg = msg.lower()
+        bonus = 0.0
+        for k, b in w.keywords.items():
+            if k in lower_msg:
+                bonus += b
+        rate = w.base_rate + bonus
+
+        # ===== 冷却惩罚 =====
+        delta = 0.0
+        if last_bot_time is not None:
+            delta = now - last_bot_time
+            for limit, factor in w.cooldown:
+                if delta < limit:
+                    rate *= factor
+                    break
+
+        # ===== 群活跃度惩罚 =====
+        before = rate
+        if recent_msg_count >= w.busy_count:
+            rate *= w.busy_factor
+        elif recent_msg_count <= w.quiet_count:
+            rate *= w.quiet_factor
+        activity_change = rate - before
+
+        # ===== 随机抖动 & 限制上下界 =====
+        rate *= self.rng.uniform(*w.jitter)
+        rate = max(0.0, min(rate, w.max_rate))
+
+        return SpeakScore(bonus, delta, activity_change, rate, self.rng.random() < rate)
+
+    def should_speak(self, msg: str, **kwargs) -> bool:
+        """判断 bot 是否要加入话题，参数同 score"""
+        return self.score(msg, **kwargs).speak
+
+    def score_batch(self, msgs: Sequence[str], *, last_bot_time: Any = None, now: Any = None,
+                    recent_msg_counts: Any = 0) -> Dict[str, Any]:
+        """
+        用 NumPy 对一批消息评分
+
+        Args:
+            msgs: 消息文本列表
+            last_bot_time: bot 上次发言时间，标量或与 msgs 等长的数组（NaN 表示无记录）
+            now: 当前时间，标量或与 msgs 等长的数组
+            recent_msg_counts: 最近消息数量，标量或与 msgs 等长的数组
+
+        Returns:
+            Dict[str, ndarray]: keyword_bonus / rate / speak 三个等长数组
+        """
+        import numpy as np
+
+        w = self.weights
+        n = len(msgs)
+        if n == 0:
+            empty = np.zeros(0)
+            return {"keyword_bonus": empty, "rate": empty, "speak": empty.astype(bool)}
+
+        if now is None:
+            now = time.time()
+
+        # ===== 关键词加权：命中矩阵 (n, k) 与权重向量相乘 =====
+        # 所有消息拼成一个字符串，每个关键词只扫描一遍，再按偏移映射回消息
+        lower = [m.lower() for m in msgs]
+        joined = "\0".join(lower)
+        starts = np.zeros(n, dtype=np.int64)
+        np.cumsum([len(m) + 1 for m in lower[:-1]], out=starts[1:])
+        hits = np.zeros((n, len(w.keywords)), dtype=bool)
+        for j, k in enumerate(w.keywords):
+            pos = [m.start() for m in re.finditer(re.escape(k.lower()), joined)]
+            if pos:
+                hits[np.searchsorted(starts, pos, side="right") - 1, j] = True
+        bonus = hits @ np.fromiter(w.keywords.values(), dtype=float, count=len(w.keywords))
+        rate = w.base_rate + bonus
+
+        # ===== 冷却惩罚 =====
+        if last_bot_time is not None:
+            last = np.broadcast_to(np.asarray(last_bot_time, dtype=float), (n,))
+            delta = np.broadcast_to(np.asarray(now, dtype=float), (n,)) - last
+            factor = np.ones(n)
+            pending = ~np.isnan(delta)
+            for limit, f in w.cooldown:
+                matched = pending & (delta < limit)
+                factor[matched] = f
+                pending &= ~matched
+            rate = rate * factor
+
+        # ===== 群活跃度惩罚 =====
+        counts = np.broadcast_to(np.asarray(recent_msg_counts), (n,))
+        rate = rate * np.where(counts >= w.busy_count, w.busy_factor,
+                               np.where(counts <= w.quiet_count, w.quiet_factor, 1.0))
+
+        # ===== 随机抖动 & 限制上下界 =====
+        rng = self.np_rng
+        rate = np.clip(rate * rng.uniform(*w.jitter, size=n), 0.0, w.max_rate)
+
+        return {"keyword_bonus": bonus, "rate": rate, "speak": rng.random(n) < rate}
+
+    def should_speak_batch(self, msgs: Sequence[str], **kwargs) -> List[bool]:
+        """批量判断，参数同 score_batch"""
+        return self.score_batch(msgs, **kwargs)["speak"].tolist()
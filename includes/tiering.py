@@ -0,0 +1,119 @@
+"""
+分级选模 - 按触发消息的复杂度选择模型和上下文长度
+
+"bot 你个废物" 只需要一个表情，"python 的 GIL 为什么..." 才值得大模型和完整历史。
+复杂度由长度、是否提问、话题关键词（发言决策的关键词表，去掉 @/bot 这类点名词）加权得到，
+达到某一级的 min_score 就用那一级的模型和历史行数。分级在 configuration.toml 的 [tiering] 中配置：
+
+    [tiering]
+    length_scale = 80        # 规范化后的字数达到此值时长度分满（1.0）
+    length_weight = 0.4
+    question_weight = 0.4
+    keyword_weight = 1.0     # 关键词权重之和的系数
+
+    [[tiering.tiers]]
+    name = "fast"
+    models = ["small-chat"]
+    max_history = 200        # 只带最近 200 行历史
+    min_score = 0.0
+    price_per_1k = 0.001     # 每千 token 价格，用于成本指标（可选）
+
+    [[tiering.tiers]]
+    name = "full"
+    models = []              # 为空时使用 model 与 fallback_models
+    min_score = 0.5
+
+没有 [tiering] 时只有一级 "full"：默认模型、完整历史。
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from .dedupe import normalize
+from .metrics import registry
+
+QUESTION_PATTERN = re.compile(r"[?？]|吗|什么|怎么|为什么|为啥|如何|哪|多少|是不是|能不能|how|what|why|which", re.I)
+CQ_CODE = re.compile(r"\[CQ:[^\]]*\]")
+MENTION_KEYWORDS = frozenset(("bot", "@", "at", "?", "？"))  # 点名和问号不代表话题复杂
+
+TIER_REQUESTS = registry.counter("llm_tier_requests_total", "各级模型的请求数")
+TIER_LATENCY = registry.histogram("llm_tier_seconds", "各级模型的请求耗时")
+TIER_TOKENS = registry.counter("llm_tier_tokens_total", "各级模型的 token 用量")
+TIER_COST = registry.counter("llm_tier_cost_total", "各级模型的估计费用（按 price_per_1k）")
+
+
+@dataclass
+class Tier:
+    """一级模型配置"""
+    name: str
+    models: List[str] = field(default_factory=list)  # 为空时使用默认模型
+    max_history: int = 0  # 带的历史行数（0 为全部）
+    min_score: float = 0.0
+    price_per_1k: float = 0.0
+
+
+class TierPolicy:
+    """复杂度评分与分级选择"""
+
+    def __init__(self, tiers: List[Tier], keywords: Dict[str, float] | None = None, length_scale: float = 80.0,
+                 length_weight: float = 0.4, question_weight: float = 0.4, keyword_weight: float = 1.0):
+        """
+        Args:
+            tiers: 各级配置
+            keywords: 话题关键词及权重（通常为发言决策的关键词表）
+            length_scale / length_weight / question_weight / keyword_weight: 复杂度各项的权重
+        """
+        self.tiers = sorted(tiers, key=lambda t: t.min_score)
+        self.keywords = {k.lower(): w for k, w in (keywords or {}).items() if k.lower() not in MENTION_KEYWORDS}
+        self.length_scale = length_scale
+        self.length_weight = length_weight
+        self.question_weight = question_weight
+        self.keyword_weight = keyword_weight
+
+    @classmethod
+    def from_config(cls, configuration: Dict[str, Any], keywords: Dict[str, float] | None = None) -> "TierPolicy":
+        """从 configuration.toml 的 [tiering] 构造"""
+        section = configuration.get("tiering") or {}
+        tiers = [Tier(
+            name=t["name"],
+            models=list(t.get("models", [])),
+            max_history=int(t.get("max_history", 0)),
+            min_score=float(t.get("min_score", 0.0)),
+            price_per_1k=float(t.get("price_per_1k", 0.0)),
+        ) for t in section.get("tiers", [])]
+        return cls(
+            tiers or [Tier("full")],
+            keywords,
+            length_scale=float(section.get("length_scale", 80.0)),
+            length_weight=float(section.get("length_weight", 0.4)),
+            question_weight=float(section.get("question_weight", 0.4)),
+            keyword_weight=float(section.get("keyword_weight", 1.0)),
+        )
+
+    def complexity(self, msg: str) -> float:
+        """触发消息的复杂度（0 起，大致在 0~1.5 之间）"""
+        text = CQ_CODE.sub("", msg).lower()
+        score = self.length_weight * min(len(normalize(text)) / self.length_scale, 1.0)
+        if QUESTION_PATTERN.search(text):
+            score += self.question_weight
+        score += self.keyword_weight * sum(w for k, w in self.keywords.items() if k in text)
+        return score
+
+    def select(self, msg: str) -> Tier:
+        """复杂度达到的最高一级"""
+        score = self.complexity(msg)
+        chosen = self.tiers[0]
+        for tier in self.tiers:
+            if score >= tier.min_score:
+                chosen = tier
+        return chosen
+
+    @staticmethod
+    def record(tier: Tier, elapsed: float, tokens: int):
+        """记录一次请求的耗时、用量和费用"""
+        TIER_REQUESTS.inc(tier=tier.name)
+        TIER_LATENCY.observe(elapsed, tier=tier.name)
+        TIER_TOKENS.inc(tokens, tier=tier.name)
+        if tier.price_per_1k:
+            TIER_COST.inc(tokens / 1000 * tier.price_per_1k, tier=tier.name)
@@ -1,129 +1,112 @@
 from includes.bot import Bot
 from includes.eventers import Receive, When, Condition
 from includes.models import MessageInfo, CQCode, MessageBuilder
+from includes.botcall import BotCallContext, interpreter as botcall_interpreter
+from includes.coalesce import MessageCoalescer
+from includes.dedupe import ReplyDeduper, TriggerCache
+from includes.llmcache import LLMResponseCache
+from includes.llmrouter import LLMRouter, Route
+from includes.tiering import Tier, TierPolicy
+from includes.forward import ForwardComposer
+from includes.speak import SpeakDecisionEngine
+from includes.log import get_logger, setup_logging
+from includes.metrics import registry, serve_prometheus, SnapshotWriter
+from includes.persist import HistoryStore
+from includes.msgindex import MessageIndex
+from includes.snapshot import StateSnapshotter
 import config as config
-import datetime, time, random, json, toml, openai
+import datetime, time, logging, os, threading
+from dataclasses import asdict
 
 """
 TLoH Bot 二代
 > 目前作为插件，而不是主程序。
 """
 
+logger = get_logger("main")
+speak_logger = get_logger("speak")
+
+LLM_LATENCY = registry.histogram("llm_request_seconds", "LLM 请求耗时")
+LLM_TOKENS = registry.counter("llm_tokens_total", "LLM token 用量")
+COALESCE_BATCH = registry.histogram("coalesce_batch_size", "合并后每批消息数", buckets=(1, 2, 3, 5, 8, 13, 20))
+
+
+def start():
+    """配置日志输出并启动指标导出（只在作为主程序运行时调用，import 本模块没有这些副作用）"""
+    setup_logging(config.LOG_LEVEL, config.LOG_LEVELS, use_queue=config.LOG_ASYNC)
+    if config.METRICS_PORT:
+        serve_prometheus(config.METRICS_PORT)
+    if config.METRICS_SNAPSHOT:
+        SnapshotWriter(config.METRICS_SNAPSHOT, config.METRICS_SNAPSHOT_INTERVAL).start()
+
+
 bot = Bot(
     ws_url="ws://127.0.0.1:6700",
-    self_id=0 # 0 自动匹配
+    self_id=0, # 0 自动匹配
+    handler_workers=config.HANDLER_WORKERS,
+    handler_queue=config.HANDLER_QUEUE,
 )
 
 global last_message_time, rmc, rmc_record_time
 last_message_time = 0
 rmc: int = 0
 rmc_record_time: datetime.datetime = datetime.datetime.now()
+coalescer = MessageCoalescer(window=0.4)
+forwarder = ForwardComposer(
+    nickname=config.FORWARD_NICKNAME,
+    min_chunks=config.FORWARD_MIN_CHUNKS,
+    min_chars=config.FORWARD_MIN_CHARS,
+)
+
+speak_engine = SpeakDecisionEngine()
+message_index = MessageIndex(config.MSGINDEX_CAPACITY)
+history_store = HistoryStore(
+    flush_interval=config.MEMORY_FLUSH_INTERVAL,
+    fsync=config.MEMORY_FSYNC,
+    fsync_interval=config.MEMORY_FSYNC_INTERVAL,
+)
+deduper = ReplyDeduper(
+    history=config.DEDUPE_HISTORY,
+    window=config.DEDUPE_WINDOW,
+    threshold=config.DEDUPE_THRESHOLD,
+    regenerate=config.DEDUPE_REGENERATE,
+)
+trigger_cache = TriggerCache(config.TRIGGER_REUSE_WINDOW)
+llm_cache = LLMResponseCache(config.LLM_CACHE_SIZE, config.LLM_CACHE_TTL, config.LLM_CACHE_CONTEXT)
+llm_router = LLMRouter(
+    hedge_min=config.LLM_HEDGE_MIN,
+    hedge_max=config.LLM_HEDGE_MAX,
+    hedge_default=config.LLM_HEDGE_DEFAULT,
+    breaker_failures=config.LLM_BREAKER_FAILURES,
+    breaker_cooldown=config.LLM_BREAKER_COOLDOWN,
+    request_timeout=config.LLM_REQUEST_TIMEOUT,
+    deadline=config.LLM_DEADLINE,
+)
 
 def should_bot_speak(
     msg: str,
     *,
-    base_rate: float = 0.03,
     last_bot_time: float | None = None,
     now: float | None = None,
     recent_msg_count: int = 0,
 ) -> bool:
     """
-    判断 bot 是否要加入话题
+    判断 bot 是否要加入话题（权重见 includes.speak.SpeakWeights）
     :param msg: 当前消息文本
-    :param base_rate: 基础触发率（建议 0.02~0.05）
     :param last_bot_time: bot 上次发言的时间戳（time.time()）
     :param now: 当前时间戳
     :param recent_msg_count: 最近 N 秒的消息数量（如 10 秒内）
     """
+    score = speak_engine.score(msg, last_bot_time=last_bot_time, now=now, recent_msg_count=recent_msg_count)
 
-    if now is None:
-        now = time.time()
-
-    rate = base_rate
-    print("    :: Should Bot Speak Synthesizer")
-
-    # ===== 关键词加权 =====
-    keywords = {
-        "bot": 0.6,
-        "@": 0.6,
-        "at": 100000000, #被at 100% 回复
-        "ai": 0.15,
-        "gpt": 0.15,
-        "python": 0.15,
-        "离谱": 0.08,
-        "笑死": 0.08,
-        "绷不住": 0.08,
-        "?": 0.10,
-        "？": 0.10,
-    }
-
-    lower_msg = msg.lower()
-    global _b, _delta
-    _b = 0
-    for k, bonus in keywords.items():
-        if k in lower_msg:
-            rate += bonus
-            _b += bonus
-
-    print("        - Rate bonus: " + _b.__str__())
-
-    # ===== 冷却惩罚 =====
-    _delta = 0.0
-    if last_bot_time is not None:
-        delta = now - last_bot_time
-        _delta = delta
-        if delta < 30:
-            rate *= 0.1
-        elif delta < 120:
-            rate *= 0.4
-    print("        - Rate delta: " + _delta.__str__())
-
-
-    # ===== 群活跃度惩罚 =====
-    global _hrate
-    _hrate = rate
-    if recent_msg_count >= 6:
-        rate *= 0.3
-        _hrate = _hrate - rate
-    elif recent_msg_count <= 1:
-        rate *= 1.5
-        _hrate = rate - _hrate
-    print("        - HRate: " +_hrate.__str__())
-
-    # ===== 随机抖动 =====
-    rate *= random.uniform(0.7, 1.3)
-    print("        - Random change: " + rate.__str__())
-
-    # ===== 限制上下界 =====
-    rate = max(0.0, min(rate, 0.95))
-    print("        - Final: " + rate.__str__())
-
-    join_conversation = random.random() < rate
-    if join_conversation:
-        print("        - SPEAK")
-    else:
-        print("        - Will not speak")
-    return join_conversation
-
-def get_memories_doc():
-    return open("./data/botmemories.ign", "r+")
-
-def get_memories(doc) -> dict:
-    return json.load(doc)
-
-def extract_mem_by_group_id(memories: dict, gid: str) -> list[str]:
-    group_mem = memories.get(gid, ["[暂无消息]"])
-
-    if len(group_mem) >= 6000:
-        return group_mem [-6000:]
-    else:
-        return group_mem[:]
-    
-def pack_memories(gid: str, mem: list[str]):
-    _mem = get_memories(open("./data/botmemories.ign", "r", encoding="utf-8"))
-    _mem [gid] = mem
-    with open("./data/botmemories.ign", "w", encoding="utf-8") as doc:
-        json.dump(_mem, doc, ensure_ascii=False, indent=2)
+    if speak_logger.isEnabledFor(logging.DEBUG):
+        speak_logger.debug("发言决策: %s", "SPEAK" if score.speak else "Will not speak", extra={"fields": {
+            "bonus": score.keyword_bonus,
+            "delta": round(score.delta, 1),
+            "hrate": round(score.activity_change, 4),
+            "final": round(score.rate, 4),
+        }})
+    return score.speak
 
 all_message = Receive.Message(
     When=(
@@ -134,10 +117,7 @@ all_message = Receive.Message(
     )
 )
 
-@all_message
-def handle_all_messages(bot_instance: Bot, event: MessageInfo):
-    msg = event.raw_message
-    prompt = """
+PROMPT = """
 你是一个叫 TLoH Bot 的 AI，但说话风格接近 B 站或贴吧用户。
 
 说话要求：
@@ -257,22 +237,11 @@ BOTCALL[msg,reply,xxx]
 
 （就会出现回复一条消息，然后下面写着"傻逼？"）
 """
-    with open("./data/botmemories.ign", "r", encoding="utf-8") as doc:
-        memories = json.load(doc)
-        group_mem = extract_mem_by_group_id(memories, event.group_id.__str__())
-    
-    with open("./allpre.deepseek.preData", "r", encoding="utf-8") as doc:
-        if doc.readlines() [1:5] != group_mem [1:5]:
-            group_mem = doc.readlines() + group_mem
-
-    if len(group_mem) >= 6000:
-        group_mem = group_mem[6000:]
 
-    # save memories
-    pack_memories(event.group_id.__str__(), group_mem)
-
-    # 这些 group_mem 的格式为：
-    # [user_id]: [content] : (MessageId)[message id]
+@all_message
+def handle_all_messages(bot_instance: Bot, event: MessageInfo):
+    msg = event.raw_message
+    message_index.add(event.message_id, event.group_id, event.user_id, event.time)
 
     # 提示词 gpt 写的不关我事
     global rmc, last_message_time, rmc_record_time
@@ -289,106 +258,299 @@ BOTCALL[msg,reply,xxx]
             rmc_record_time = current_time
         rmc += 1
         msg_str = f"{event.user_id.__str__()}: {msg} : (MessageId){event.message_id}"
-        group_mem.append(msg_str)
-        pack_memories(event.group_id.__str__(), group_mem)
+        history_store.append(event.group_id.__str__(), msg_str, ts=event.time,
+                             on_offset=lambda offset: message_index.set_offset(event.message_id, offset))
         return
 
     # 记录 bot 发言时间
     last_message_time = time.time()
 
+    # 同一个群的突发消息合并为一次回复
+    coalescer.submit(event.group_id, event, lambda batch: reply_to_batch(bot_instance, batch))
+
+
+_configuration_cache: tuple[float, dict] | None = None
+_llm_clients: dict = {}
+
+
+def load_configuration(path: str = "configuration.toml") -> dict:
+    """读取 configuration.toml（toml 首次使用时才导入；文件未修改时复用上次的结果）"""
+    global _configuration_cache
+    mtime = os.path.getmtime(path)
+    if _configuration_cache is None or _configuration_cache[0] != mtime:
+        import toml
+        with open(path, "r", encoding="utf-8") as f:
+            _configuration_cache = (mtime, toml.load(f))
+    return _configuration_cache[1]
+
+
+def get_llm_client(api_key: str, base_url: str):
+    """按 (api_key, base_url) 复用 OpenAI 客户端（openai SDK 导入很慢，首次调用时才导入）"""
+    key = (api_key, base_url)
+    client = _llm_clients.get(key)
+    if client is None:
+        import openai
+        client = _llm_clients[key] = openai.OpenAI(api_key=api_key, base_url=base_url)
+    return client
+
+
+def build_routes(configuration: dict, names: list[str]) -> list[Route]:
+    """按模型名找到模型与提供方配置，构造路由（找不到的模型跳过）"""
+    models = {m["name"]: m for m in configuration["models"]}
+    providers = {p["name"]: p for p in configuration["api_providers"]}
+    routes = []
+    for name in names:
+        model_config = models.get(name)
+        provider_config = providers.get(model_config["api_provider"]) if model_config else None
+        if not model_config or not provider_config:
+            logger.warning("配置中找不到模型或提供方: %s", name)
+            continue
+        client = get_llm_client(provider_config["api_key"], provider_config["base_url"].replace("/chat/completions", ""))
+        routes.append(Route(name, model_config["model_identifier"], client))
+    return routes
+
+
+def complete(client, model_identifier: str, messages: list[dict], timeout: float | None = None) -> tuple[str | None, int]:
+    """调用一次 LLM 并记录耗时与 token 用量，返回 (回复, 总 token 数)"""
+    with LLM_LATENCY.time(model=model_identifier):
+        response = client.chat.completions.create(
+            model=model_identifier,
+            messages=messages,
+            temperature=0.9,
+            top_p=0.7,
+            frequency_penalty=0,
+            presence_penalty=0,
+            timeout=timeout,
+        )
+
+    tokens = 0
+    if response.usage is not None:
+        LLM_TOKENS.inc(response.usage.prompt_tokens, model=model_identifier, kind="prompt")
+        LLM_TOKENS.inc(response.usage.completion_tokens, model=model_identifier, kind="completion")
+        tokens = response.usage.prompt_tokens + response.usage.completion_tokens
+    return response.choices[0].message.content, tokens
+
+
+def request_completion(routes: list[Route], messages: list[dict], tier: Tier) -> tuple[str | None, int]:
+    """经路由器调用 LLM（慢则对冲、失败则换提供方），返回 (回复, 总 token 数)"""
+    start = time.perf_counter()
+    (content, tokens), _ = llm_router.call(
+        routes, lambda route, timeout: complete(route.client, route.model_identifier, messages, timeout))
+    TierPolicy.record(tier, time.perf_counter() - start, tokens)
+    return content, tokens
+
+
+_tier_policy: tuple[dict, TierPolicy] | None = None
+
+
+def get_tier_policy(configuration: dict) -> TierPolicy:
+    """configuration.toml 的 [tiering]（配置未变化时复用）"""
+    global _tier_policy
+    if _tier_policy is None or _tier_policy[0] is not configuration:
+        _tier_policy = (configuration, TierPolicy.from_config(configuration, speak_engine.weights.keywords))
+    return _tier_policy[1]
+
+
+def visible_chunks(content: str) -> list[str]:
+    """回复中实际发送的分段（含 BOTCALL 的段不发送）"""
+    return [line for line in content.split("\n\n") if not "BOTCALL[" in line]
+
+
+def reply_to_batch(bot_instance: Bot, batch: list[MessageInfo]):
+    """对合并后的一批消息发起一次 LLM 回复，最后一条消息作为回复对象"""
+    event = batch[-1]
+    if len(batch) == 1:
+        msg = event.raw_message
+    else:
+        msg = "\n".join(f"{e.user_id}: {e.raw_message} : (MessageId){e.message_id}" for e in batch)
+
+    # 窗口期间历史可能已更新，重新读取；每行格式为 [user_id]: [content] : (MessageId)[message id]
+    group_mem = history_store.get(event.group_id.__str__())
+
     # 调用 AI 接口
-    cfg_path = "configuration.toml"
-
-    with open(cfg_path, "r", encoding="utf-8") as f:
-        config = toml.load(f)
-        config_model = config["model"]
-        model_config = next((m for m in config["models"] if m["name"] == config_model), None)
-        provider_config = next((p for p in config["api_providers"] if p["name"] == model_config["api_provider"]),
-                               None) if model_config else None
-        enable_query_info = bool(config["EnableGroupQuery"])
-        enable_r18 = bool(config["EnableR18"])
-        enable_world = bool(config["EnableWorld"])
-
-        if model_config and provider_config:
-            base_url = provider_config["base_url"]
-            api_key = provider_config["api_key"]
-            model_identifier = model_config["model_identifier"]
-
-    client = openai.OpenAI(api_key=api_key, base_url=base_url.replace("/chat/completions", ""))#type:ignore
-    response = client.chat.completions.create(
-        model=model_identifier, #type:ignore
-        messages=[
-            {"role": "system", "content": prompt},
-            {"role": "system", "content": "[ 历史对话 HISTORY ]\n" + "\n".join(group_mem)},
-            {"role": "user", "content": msg},
-        ],
-        temperature=0.9,
-        top_p=0.7,
-        frequency_penalty=0,
-        presence_penalty=0,
+    config = load_configuration()
+    config_model = config["model"]
+    enable_query_info = bool(config["EnableGroupQuery"])
+    enable_r18 = bool(config["EnableR18"])
+    enable_world = bool(config["EnableWorld"])
+
+    # 按触发消息的复杂度分级：简单的用小模型、少带历史；该级没有指定模型时，
+    # 首选 model，其余 fallback_models 在其过慢或故障时接替
+    tier = get_tier_policy(config).select(msg)
+    routes = build_routes(config, tier.models or [config_model, *config.get("fallback_models", [])])
+    history = group_mem[-tier.max_history:] if tier.max_history else group_mem
+    COALESCE_BATCH.observe(len(batch))
+    messages = [
+        {"role": "system", "content": PROMPT},
+        {"role": "system", "content": "[ 历史对话 HISTORY ]\n" + "\n".join(history)},
+        {"role": "user", "content": msg},
+    ]
+
+    # 短时间内相同的触发消息直接复用上一次发出的回复：有意不经过去重，同样的问题给同样的回答，省一次 LLM 调用
+    final_content = trigger_cache.get(event.group_id, msg)
+    triggered = final_content is not None
+    cache_key = llm_cache.key(event.group_id, f"{tier.name}/{config_model}", msg, group_mem, bot_instance.self_id) \
+        if len(batch) == 1 else None #type:ignore
+    if final_content is None:
+        # 回复缓存的有效期远长于去重窗口，与最近回复重复的缓存不用
+        final_content = llm_cache.get(cache_key, accept=lambda cached: deduper.similar(
+            event.group_id, "\n".join(visible_chunks(cached))) is None)
+    reused = final_content is not None
+    tokens = 0
+    if not reused:
+        final_content, tokens = request_completion(routes, messages, tier)
+
+    # 新生成的回复与最近的回复近似重复时重新生成一次，仍然重复则不发送
+    if final_content is not None and not reused:
+        similar = deduper.similar(event.group_id, "\n".join(visible_chunks(final_content)))
+        if similar is not None and deduper.regenerate:
+            final_content, tokens = request_completion(routes, messages + [
+                {"role": "system", "content": f"[ 避免重复 ] 你刚刚说过：\n{similar}\n换一种说法，或者只回复一个表情。"},
+            ], tier)
+            similar = deduper.similar(event.group_id, "\n".join(visible_chunks(final_content or "")))
+        if similar is not None:
+            logger.info("丢弃近似重复的回复", extra={"fields": {"group_id": event.group_id}})
+            return
+        llm_cache.put(cache_key, final_content, tokens) #type:ignore
+    # 两个缓存都只记录实际发送的回复（去重和重新生成之后）；复用本身不刷新复用窗口
+    if final_content is not None and not triggered:
+        trigger_cache.put(event.group_id, msg, final_content)
+
+    if final_content is None:
+        bot_instance.send_group_msg(event.group_id, "ERROR: 无法连接至硅基流动 API。")
+    else:
+        # 执行回复中的 BOTCALL（见 includes/botcall.py）
+        final_content = str(final_content)
+        reply_text = final_content
+        botcalls = botcall_interpreter.run(bot_instance, BotCallContext(
+            group_id=event.group_id, #type:ignore
+            user_id=event.user_id, #type:ignore
+            message_id=event.message_id,
+            index=message_index,
+        ), final_content)
+        reply_to = botcalls.reply_to
+        if reply_to is not None:
+            final_content = MessageBuilder()\
+                .add(CQCode.reply(reply_to))\
+                .add(final_content)
+
+        history_store.append(event.group_id.__str__(), f"你：{final_content}")
+
+        # 分段较多或较长时打包为合并转发，一次 API 调用发完
+        chunks = visible_chunks(reply_text)
+        deduper.remember(event.group_id, "\n".join(chunks))
+        forwarder.send_group(bot_instance, event.group_id, chunks, reply_to=reply_to)#type:ignore
+
+# ============ 热重启：运行时状态快照 ============
+
+snapshotter = StateSnapshotter(config.SNAPSHOT_PATH, config.SNAPSHOT_INTERVAL)
+
+
+def dump_cooldown() -> dict:
+    return {
+        "last_message_time": last_message_time,
+        "rmc": rmc,
+        "rmc_record_time": rmc_record_time.timestamp(),
+    }
+
+
+def restore_cooldown(state: dict):
+    global last_message_time, rmc, rmc_record_time
+    last_message_time = state["last_message_time"]
+    rmc = state["rmc"]
+    rmc_record_time = datetime.datetime.fromtimestamp(state["rmc_record_time"])
+
+
+def dump_pending() -> dict:
+    """已决定回复、但还没开始生成的消息（按群拆分）"""
+    return {str(gid): [asdict(e) for e in events] for gid, events in coalescer.pending().items()}
+
+
+def restore_pending(pending):
+    """重启前没来得及回复的消息：连接后重新提交，太旧的不再回复"""
+    cutoff = time.time() - config.SNAPSHOT_REPLAY_AGE
+    events = [MessageInfo(**e) for gid in pending for e in pending[gid] if e["time"] >= cutoff]
+    if not events:
+        return
+
+    def replay():
+        deadline = time.monotonic() + 30
+        while not bot.connected and time.monotonic() < deadline:
+            time.sleep(0.1)
+        logger.info("重新提交重启前未回复的消息: %s 条", len(events))
+        for event in events:
+            # submit 在当前线程生成回复，每条消息一个线程，同群的会被合并
+            threading.Thread(
+                target=coalescer.submit,
+                args=(event.group_id, event, lambda batch: reply_to_batch(bot, batch)),
+                daemon=True,
+            ).start()
+
+    threading.Thread(target=replay, name="pending-replay", daemon=True).start()
+
+
+snapshotter.register("history", history_store.dump, history_store.restore, split=True)
+snapshotter.register("cooldown", dump_cooldown, restore_cooldown)
+snapshotter.register("bot", bot.dump_state, bot.load_state)
+snapshotter.register("pending", dump_pending, restore_pending, split=True)
+snapshotter.register("msgindex", message_index.dump, message_index.load)
+snapshotter.register("llmcache", llm_cache.dump, llm_cache.load)
+
+
+def index_history():
+    """没有可恢复的消息索引时，从历史文件建立"""
+    for gid in history_store.groups():
+        base, lines = history_store.tail(gid)
+        message_index.index_history(int(gid), lines, base)
+    logger.info("已从历史建立消息索引: %s 条", len(message_index))
+
+
+profile_command = Receive.Message(
+    When=(
+        When.Received,
+        When.GotCommand(name="profile")
+    ),
+    Conditions=(
+        Condition.AllMessage,
     )
+)
 
-    # 处理 AI 回复
-    final_content = response.choices[0].message.content
+@profile_command
+def handle_profile_command(bot_instance: Bot, info: MessageInfo):
+    """处理 /profile [秒数] 命令 - 管理员采集一段时间的性能剖析"""
+    if info.user_id not in config.ADMINS:
+        return
 
-    emojiIds = {
-        "xbs": 424,
-        "sugar": 147,
-        "qu": 128027
-    }
+    args = info.raw_message.replace("/profile", "", 1).strip()
+    try:
+        duration = min(float(args), 300.0) if args else 30.0
+    except ValueError:
+        bot_instance.send_msg(info.message_type, info.user_id, info.group_id, "用法: /profile [秒数]")
+        return
 
-    if type(final_content) == None:
-        bot_instance.send_group_msg(event.group_id, "ERROR: 无法连接至硅基流动 API。")
+    def done(path: str):
+        bot_instance.send_msg(info.message_type, info.user_id, info.group_id, f"性能剖析完成: {path}")
+
+    if bot_instance.start_profile(duration, on_finish=done):
+        message = f"开始性能剖析，持续 {duration:g} 秒"
     else:
-        # 解析函数
-        final_content = str(final_content)
-        if "BOTCALL[" in final_content:
-            # 检测到函数
-            lines = final_content.split("\n")
-            for line in lines:
-                if not "BOTCALL[" in line: continue
-                else:
-                    # 该行存在 BotCALL
-                    # begin interpret
-                    # 弃之，食参
-                    line = line.replace("BOTCALL[", "").replace("]", "")
-                    line = line.split(",")
-                    if line[0] == "send":
-                        # 发消息回应
-                        if line[1] == "emoji":
-                            bot_instance._call_api("set_msg_emoji_like", {
-                                "message_id": line[1],
-                                "emoji_id": emojiIds[line[2]],
-                                "set": True
-                            })
-                        elif line[1] == "mute":
-                            bot_instance.set_group_ban(event.group_id, event.user_id, 600)
-                            bot_instance.set_group_ban(event.group_id, event.user_id, 0)
-
-                    elif line[0] == "msg":
-                        # 回复消息
-                        if line[1] == "reply":
-                            final_content = MessageBuilder()\
-                                .add(CQCode.reply(int(line[2])))\
-                                .add(final_content)
-                        elif line[1] == "recall":
-                            bot_instance.delete_msg(int(line[2]))
-                        elif line[1] == "essence":
-                            bot_instance._call_api("set_essence_msg", {
-                                "message_id": line[2]
-                            })
-                    
-
-        group_mem.append(f"你：{final_content}")
-        pack_memories(event.group_id.__str__(), group_mem)
-
-        final_content = final_content.__str__().split("\n\n")
-        for line in final_content:
-            if not "BOTCALL[" in line:
-                bot_instance.send_group_msg(event.group_id, line)#type:ignore
-
-print("TLoH Bot 2")
-print(":: Bot 正在注册消息监听器")
-bot.register_message_handler(all_message)
-print(":: Bot 启动中...")
-bot.run()
\ No newline at end of file
+        message = "已有性能剖析在进行"
+    bot_instance.send_msg(info.message_type, info.user_id, info.group_id, message)
+
+if __name__ == "__main__":
+    start()
+    logger.info("TLoH Bot 2")
+    logger.info("Bot 正在注册消息监听器")
+    bot.register_message_handler(all_message)
+    bot.register_message_handler(profile_command)
+    bot.enable_profile_signal()
+    if config.SNAPSHOT_PATH:
+        snapshotter.restore()
+        snapshotter.start()
+    if not len(message_index):
+        index_history()
+    logger.info("Bot 启动中...")
+    bot.run()
+    if config.SNAPSHOT_PATH:
+        snapshotter.stop()
+    history_store.close()
\ No newline at end of file
@@ -1,2 +1,6 @@
 RUN_EXAMPLE = True
-import includes.examples
\ No newline at end of file
+import includes.examples
+
+# 进程池的子进程会重新导入主模块，启动代码放在 __main__ 判断中
+if __name__ == "__main__":
+    includes.examples.main()
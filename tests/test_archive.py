@@ -0,0 +1,75 @@
+from includes.archive import GroupArchive
+
+
+def test_append_and_read(tmp_path):
+    archive = GroupArchive(str(tmp_path / "g"))
+    assert archive.append([f"{i}: u : line {i} : (MessageId){1000 + i}" for i in range(5)], ts=100.0) == 5
+    assert archive.append(["5: u : 中文 : (MessageId)1005"], ts=200.0) == 6
+    assert archive.lines(0, 2) == ["0: u : line 0 : (MessageId)1000", "1: u : line 1 : (MessageId)1001"]
+    assert archive.tail(1) == ["5: u : 中文 : (MessageId)1005"]
+    assert archive.text(4, 6) == "4: u : line 4 : (MessageId)1004\n5: u : 中文 : (MessageId)1005"
+    assert archive.find_message(1003) == 3
+    assert archive.find_message(42) is None
+    assert archive.range_by_time(150.0) == (5, 6)
+    archive.close()
+
+
+def test_reopen(tmp_path):
+    archive = GroupArchive(str(tmp_path / "g"))
+    archive.append(["a", "b"])
+    archive.close()
+    reopened = GroupArchive(str(tmp_path / "g"))
+    assert len(reopened) == 2
+    assert reopened.lines(0, 2) == ["a", "b"]
+    reopened.close()
+
+
+def test_segments_split(tmp_path):
+    archive = GroupArchive(str(tmp_path / "g"), segment_bytes=16)
+    archive.append([f"line-{i:02d}" for i in range(6)])
+    views = archive.raw(0, 6)
+    assert len(views) > 1
+    assert archive.text(0, 6) == "\n".join(f"line-{i:02d}" for i in range(6))
+    archive.close()
+
+
+def test_append_while_views_held(tmp_path):
+    """raw() 的视图仍被持有时，追加导致的重新映射和 close() 都不能失败"""
+    archive = GroupArchive(str(tmp_path / "g"))
+    archive.append(["first", "second"])
+    views = archive.raw(0, 2)
+    archive.append(["third"])
+    assert archive.lines(0, 3) == ["first", "second", "third"]
+    assert bytes(views[0]) == b"first\nsecond"
+    archive.close()
+    assert bytes(views[0]) == b"first\nsecond"
+    del views
+
+
+def test_timestamps_per_line_stay_sorted(tmp_path):
+    archive = GroupArchive(str(tmp_path / "g"))
+    archive.append(["a", "b", "c"], ts=[100.0, None, 300.0])  # 未知时间沿用前一行
+    archive.append(["d"], ts=[200.0])  # 早于已归档的最后时间时取最后时间，保持不减
+    archive.append(["e", "f"], ts=[None, 400.0])
+    assert archive.range_by_time(150.0, 350.0) == (2, 5)
+    assert archive.range_by_time(400.0) == (5, 6)
+    archive.close()
+
+
+def test_find_message_uses_sorted_table(tmp_path, monkeypatch):
+    monkeypatch.setattr("includes.archive._ID_TAIL", 2)
+    archive = GroupArchive(str(tmp_path / "g"))
+    archive.append([f"u : m : (MessageId){mid}" for mid in (30, 10, 20)])
+    assert archive.find_message(10) == 1
+    archive.append(["u : again : (MessageId)10", "u : m : (MessageId)40"])  # 尾部
+    assert archive.find_message(10) == 3
+    assert archive.find_message(40) == 4
+    archive.append(["u : m : (MessageId)5", "u : m : (MessageId)10"])  # 尾部超出上限，下次查找时合并
+    assert archive.find_message(10) == 6
+    assert archive.find_message(5) == 5
+    assert archive.find_message(30) == 0
+    assert archive.find_message(99) is None
+    archive.close()
+    reopened = GroupArchive(str(tmp_path / "g"))
+    assert reopened.find_message(10) == 6
+    reopened.close()
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from includes.botcall import BotCallContext, BotCallError, EMOJI_IDS, emoji_arg, interpreter, message_id_arg
+from includes.msgindex import MessageIndex
+
+
+class RecordingBot:
+    """只记录 batch 调用的 Bot 替身"""
+
+    def __init__(self):
+        self.batches = []
+
+    def batch(self, calls):
+        self.batches.append([(c.action, c.params) for c in calls])
+
+
+def make_context(index=None):
+    return BotCallContext(group_id=100000, user_id=1000000, message_id=1, index=index)
+
+
+def test_parse():
+    text = "BOTCALL[msg,reply,42]\n傻逼？\n\nBOTCALL[ send , emoji , xbs ]\nBOTCALL[send,mute]"
+    assert interpreter.parse(text) == [("msg", "reply", "42"), ("send", "emoji", "xbs"), ("send", "mute", "")]
+    assert interpreter.parse("没有命令的回复") == []
+
+
+def test_bracketed_argument():
+    """提示词里的写法 BOTCALL[msg,reply,[id]]：参数带方括号也能执行"""
+    index = MessageIndex()
+    index.add(42, 100000, 1000000, time.time())
+    ((kind, name, raw),) = interpreter.parse("BOTCALL[msg,reply,[42]]")
+    assert (kind, name) == ("msg", "reply")
+    assert interpreter.run(RecordingBot(), make_context(index), "BOTCALL[msg,reply,[42]]").reply_to == 42
+
+
+def test_argument_validation():
+    index = MessageIndex()
+    index.add(42, 100000, 1000000, time.time())
+    ctx = make_context(index)
+    assert message_id_arg(ctx, "[42]") == 42
+    with pytest.raises(BotCallError):
+        message_id_arg(ctx, "abc")
+    with pytest.raises(BotCallError):
+        message_id_arg(ctx, "43")  # 本群没有这条消息
+    with pytest.raises(BotCallError):
+        message_id_arg(BotCallContext(group_id=200000, user_id=1, message_id=1, index=index), "42")  # 别的群
+    assert emoji_arg(ctx, "sugar") == EMOJI_IDS["sugar"]
+    with pytest.raises(BotCallError):
+        emoji_arg(ctx, "unknown")
+
+
+def test_run_collects_calls():
+    index = MessageIndex()
+    index.add(42, 100000, 1000000, time.time())
+    bot = RecordingBot()
+    ctx = interpreter.run(bot, make_context(index), "BOTCALL[msg,reply,42]\nBOTCALL[send,emoji,qu]\nBOTCALL[send,mute]")
+
+    assert ctx.reply_to == 42
+    assert ctx.executed == ["msg.reply", "send.emoji", "send.mute"]
+    assert bot.batches == [
+        [("set_msg_emoji_like", {"message_id": 1, "emoji_id": EMOJI_IDS["qu"], "set": True}),
+         ("set_group_ban", {"group_id": 100000, "user_id": 1000000, "duration": 600})],
+        [("set_group_ban", {"group_id": 100000, "user_id": 1000000, "duration": 0})],
+    ]
+
+
+def test_run_skips_invalid_and_unknown():
+    bot = RecordingBot()
+    ctx = interpreter.run(bot, make_context(MessageIndex()),
+                          "BOTCALL[msg,recall,99]\nBOTCALL[send,emoji,nope]\nBOTCALL[foo,bar,1]\nBOTCALL[send,emoji,xbs]")
+    assert ctx.executed == ["send.emoji"]
+    assert bot.batches == [[("set_msg_emoji_like", {"message_id": 1, "emoji_id": EMOJI_IDS["xbs"], "set": True})]]
+
+
+def test_run_against_simulator(onebot_bot, onebot_simulator):
+    index = MessageIndex()
+    index.add(7, 100000, 1000000, time.time())
+    interpreter.run(onebot_bot, make_context(index), "BOTCALL[msg,essence,7]\n好")
+
+    deadline = time.monotonic() + 5
+    while not any(c.action == "set_essence_msg" for c in onebot_simulator.calls) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [c.params for c in onebot_simulator.calls if c.action == "set_essence_msg"] == [{"message_id": 7}]
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from includes.coalesce import MessageCoalescer
+
+
+def test_burst_is_one_batch():
+    coalescer = MessageCoalescer(window=0.1)
+    batches = []
+    results = []
+
+    def submit(item):
+        results.append(coalescer.submit(1, item, batches.append))
+
+    first = threading.Thread(target=submit, args=(0,))
+    first.start()
+    time.sleep(0.02)
+    for i in range(1, 4):
+        submit(i)
+    first.join()
+
+    assert batches == [[0, 1, 2, 3]]
+    assert sorted(results) == [False, False, False, True]
+    assert coalescer.pending() == {}
+
+
+def test_messages_during_processing_form_next_batch():
+    coalescer = MessageCoalescer(window=0.05)
+    batches = []
+    started = threading.Event()
+
+    def process(batch):
+        batches.append(batch)
+        if len(batches) == 1:
+            started.set()
+            time.sleep(0.1)
+
+    runner = threading.Thread(target=coalescer.submit, args=(1, "a", process))
+    runner.start()
+    assert started.wait(2)
+    assert coalescer.submit(1, "b", process) is False
+    assert coalescer.pending() == {1: ["b"]}
+    runner.join()
+
+    assert batches == [["a"], ["b"]]
+
+
+def test_keys_are_independent_and_batch_is_capped():
+    coalescer = MessageCoalescer(window=0.05, max_batch=2)
+    batches = {}
+
+    def submit(key, item):
+        coalescer.submit(key, item, lambda batch: batches.setdefault(key, []).append(batch))
+
+    threads = [threading.Thread(target=submit, args=(key, i)) for key in (1, 2) for i in range(3)]
+    for t in threads:
+        t.start()
+        time.sleep(0.005)
+    for t in threads:
+        t.join()
+
+    assert batches == {1: [[1, 2]], 2: [[1, 2]]}
+
+
+def test_failed_batch_releases_key():
+    coalescer = MessageCoalescer(window=0.01)
+
+    def fail(batch):
+        raise RuntimeError("boom")
+
+    try:
+        coalescer.submit(1, "a", fail)
+    except RuntimeError:
+        pass
+    assert coalescer.submit(1, "b", lambda batch: None) is True
@@ -0,0 +1,24 @@
+from includes.dedupe import ReplyDeduper, TriggerCache, normalize
+
+
+def test_normalize():
+    assert normalize("Ｂｏｔ， 你好！") == "bot你好"
+
+
+def test_similar_within_window():
+    deduper = ReplyDeduper(window=60, threshold=0.8)
+    deduper.remember(1, "管他呢，反正我又不搞 AI", now=0)
+    assert deduper.similar(1, "管他呢 反正我又不搞AI！", now=10) == "管他呢，反正我又不搞 AI"
+    assert deduper.similar(2, "管他呢，反正我又不搞 AI", now=10) is None  # 按群区分
+    assert deduper.similar(1, "完全不同的一句话", now=10) is None
+    assert deduper.similar(1, "管他呢，反正我又不搞 AI", now=100) is None  # 超出窗口
+
+
+def test_trigger_cache_window():
+    cache = TriggerCache(window=30)
+    cache.put(1, "bot?", "在", now=0)
+    assert cache.get(1, "BOT", now=10) == "在"
+    assert cache.get(2, "bot", now=10) is None
+    assert cache.get(1, "bot", now=31) is None
+    assert cache.get(1, "？？", now=10) is None
+    assert TriggerCache(window=0).get(1, "bot") is None
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+import pytest
+
+from includes.eventers import Priority
+from includes.executor import HANDLER_SHED, Admission, HandlerExecutor
+
+
+async def blocked(executor: HandlerExecutor):
+    """占满唯一的线程，返回放行用的 Event 和对应的任务"""
+    gate = threading.Event()
+    task = asyncio.ensure_future(executor.run("notice", gate.wait))
+    await asyncio.sleep(0)
+    return gate, task
+
+
+async def queue(executor, kind, order, name, priority=Priority.NORMAL):
+    task = asyncio.ensure_future(executor.run(kind, lambda: order.append(name), priority))
+    await asyncio.sleep(0)
+    return task
+
+
+def test_reject_when_full():
+    async def scenario():
+        executor = HandlerExecutor(max_workers=1, queue_size=1)
+        gate, first = await blocked(executor)
+        order = []
+        queued = await queue(executor, "notice", order, "a")
+        before = HANDLER_SHED.total(kind="notice", reason="rejected")
+        assert await executor.run("notice", lambda: order.append("b")) is False
+        assert HANDLER_SHED.total(kind="notice", reason="rejected") == before + 1
+        gate.set()
+        assert await first and await queued
+        executor.shutdown()
+        return order
+
+    assert asyncio.run(scenario()) == ["a"]
+
+
+def test_drop_oldest():
+    async def scenario():
+        executor = HandlerExecutor(max_workers=1, queue_size=2)
+        gate, first = await blocked(executor)
+        order = []
+        tasks = [await queue(executor, "meta_event", order, name) for name in "abc"]
+        gate.set()
+        results = [await task for task in tasks]
+        await first
+        executor.shutdown()
+        return order, results
+
+    assert asyncio.run(scenario()) == (["b", "c"], [False, True, True])
+
+
+def test_shed_low_evicts_newest_low_priority():
+    async def scenario():
+        executor = HandlerExecutor(max_workers=1, queue_size=2)
+        gate, first = await blocked(executor)
+        order = []
+        low = [await queue(executor, "message", order, name, Priority.LOW) for name in ("low1", "low2")]
+        high = await queue(executor, "message", order, "high", Priority.HIGH)
+        assert await executor.run("message", lambda: order.append("low3"), Priority.LOW) is False
+        gate.set()
+        results = [await task for task in low + [high]]
+        await first
+        executor.shutdown()
+        return order, results
+
+    assert asyncio.run(scenario()) == (["high", "low1"], [True, False, True])
+
+
+def test_queued_jobs_run_by_priority_then_fifo():
+    async def scenario():
+        executor = HandlerExecutor(max_workers=1, queue_size=10)
+        gate, first = await blocked(executor)
+        order = []
+        tasks = [await queue(executor, "message", order, name, priority) for name, priority in [
+            ("normal1", Priority.NORMAL), ("low", Priority.LOW), ("command", Priority.COMMAND),
+            ("normal2", Priority.NORMAL), ("high", Priority.HIGH),
+        ]]
+        gate.set()
+        await asyncio.gather(first, *tasks)
+        executor.shutdown()
+        return order
+
+    assert asyncio.run(scenario()) == ["command", "high", "normal1", "normal2", "low"]
+
+
+def test_exception_is_raised_to_caller():
+    async def scenario():
+        executor = HandlerExecutor(max_workers=1, policies={"custom": Admission.DROP_OLDEST})
+        assert executor.policies["custom"] == Admission.DROP_OLDEST
+        assert executor.policies["message"] == Admission.SHED_LOW
+        try:
+            with pytest.raises(ZeroDivisionError):
+                await executor.run("custom", lambda: 1 / 0)
+            assert await executor.run("custom", lambda: None) is True
+        finally:
+            executor.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,56 @@
+from includes.forward import FORWARD_FALLBACK, ForwardComposer
+
+
+class FakeBot:
+    self_id = 10000
+
+    def __init__(self, forward_ok: bool = True):
+        self.forward_ok = forward_ok
+        self.group_msgs = []
+        self.forwards = []
+
+    def send_group_msg(self, group_id, message):
+        self.group_msgs.append(message)
+        return len(self.group_msgs)
+
+    def send_group_forward_msg(self, group_id, nodes):
+        self.forwards.append(nodes)
+        return 100 + len(self.forwards) if self.forward_ok else -1
+
+
+def node_texts(nodes):
+    return [node["data"]["content"][0]["data"]["text"] for node in nodes]
+
+
+def test_short_reply_is_sent_one_by_one_with_reply():
+    bot = FakeBot()
+    ids = ForwardComposer(min_chunks=4).send_group(bot, 1, ["a", " ", "b"], reply_to=5)
+    assert ids == [1, 2]
+    assert bot.group_msgs[0] == [{"type": "reply", "data": {"id": "5"}}, {"type": "text", "data": {"text": "a"}}]
+    assert bot.group_msgs[1] == [{"type": "text", "data": {"text": "b"}}]
+    assert not bot.forwards
+
+
+def test_long_reply_is_one_forward():
+    bot = FakeBot()
+    ids = ForwardComposer(nickname="T", min_chunks=3).send_group(bot, 1, ["a", "b", "c"])
+    assert ids == [101] and not bot.group_msgs
+    assert node_texts(bot.forwards[0]) == ["a", "b", "c"]
+    assert bot.forwards[0][0]["data"]["nickname"] == "T"
+    assert bot.forwards[0][0]["data"]["user_id"] == "10000"
+
+
+def test_compose_respects_node_and_size_limits():
+    composer = ForwardComposer(max_nodes=2, max_bytes=10, max_node_chars=4)
+    messages = composer.compose(1, ["ab", "cd", "ef", "1234567\n89"])
+    assert [node_texts(nodes) for nodes in messages] == [["ab", "cd"], ["ef", "1234"], ["567", "89"]]
+    assert all(sum(len(t.encode()) for t in node_texts(nodes)) <= 10 for nodes in messages)
+
+
+def test_forward_failure_falls_back():
+    bot = FakeBot(forward_ok=False)
+    before = FORWARD_FALLBACK.total()
+    ids = ForwardComposer(min_chunks=2).send_group(bot, 1, ["a", "b"])
+    assert ids == [1, 2]
+    assert bot.group_msgs == [[{"type": "text", "data": {"text": "a"}}], [{"type": "text", "data": {"text": "b"}}]]
+    assert FORWARD_FALLBACK.total() == before + 1
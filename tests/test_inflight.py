@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from includes.inflight import InflightTable
+
+
+def test_resolve_before_timeout():
+    async def main():
+        table = InflightTable(tick=0.01)
+        echo, future = await table.acquire(timeout=1.0)
+        assert echo in table and str(echo) in table
+        assert table.resolve(str(echo), {"status": "ok"})
+        assert await future == {"status": "ok"}
+        table.release(echo)
+        assert len(table) == 0
+
+    asyncio.run(main())
+
+
+def test_timeout_from_wheel():
+    async def main():
+        table = InflightTable(tick=0.01, wheel_size=4)  # 超时超过一圈时按圈数轮转
+        echo, future = await table.acquire(timeout=0.1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with pytest.raises(asyncio.TimeoutError):
+            await future
+        assert loop.time() - start >= 0.08
+        table.release(echo)
+        assert not table.resolve(echo, {})  # 超时后到达的响应是孤儿响应
+
+    asyncio.run(main())
+
+
+def test_capacity_backpressure():
+    async def main():
+        table = InflightTable(capacity=1, tick=0.01)
+        echo, _ = await table.acquire(timeout=1.0)
+        with pytest.raises(asyncio.TimeoutError):
+            await table.acquire(timeout=1.0, wait=0.05)
+        table.release(echo)
+        second, _ = await table.acquire(timeout=1.0, wait=0.05)
+        assert second != echo
+        table.release(second)
+
+    asyncio.run(main())
+
+
+def test_fail_and_unknown_echo():
+    async def main():
+        table = InflightTable(tick=0.01)
+        echo, future = await table.acquire(timeout=1.0)
+        table.fail(echo, ConnectionError("closed"))
+        with pytest.raises(ConnectionError):
+            await future
+        table.release(echo)
+        assert not table.resolve("not-an-echo", {})
+        assert not table.resolve(12345, {})
+
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+from includes.llmcache import LLMResponseCache, canonical_trigger, context_fingerprint
+
+
+def test_canonical_trigger():
+    assert canonical_trigger("[CQ:at,qq=42] 在吗？", self_id=42) == canonical_trigger("[CQ:at,qq=42]在", self_id=42)
+    assert canonical_trigger("[CQ:at,qq=7]在吗", self_id=42) != canonical_trigger("[CQ:at,qq=42]在吗", self_id=42)
+    assert canonical_trigger("[CQ:image,file=a.png]") == canonical_trigger("[CQ:image,file=b.png]")
+    assert canonical_trigger("？！") == ""
+
+
+def test_context_fingerprint_ignores_sender_and_bot_lines():
+    a = ["1: 早 : (MessageId)1", "你：早上好", "2: 今天吃什么 : (MessageId)2"]
+    b = ["9: 早 : (MessageId)8", "3: 今天吃什么 : (MessageId)9"]
+    assert context_fingerprint(a) == context_fingerprint(b)
+    assert context_fingerprint(a, lines=1) == context_fingerprint(["4: 今天吃什么 : (MessageId)5"], lines=1)
+    assert context_fingerprint(a) != context_fingerprint(a + ["5: 不吃 : (MessageId)6"])
+
+
+def test_ttl_lru_and_accept():
+    cache = LLMResponseCache(size=2, ttl=10)
+    history = ["1: hi : (MessageId)1"]
+    k1 = cache.key(1, "m", "bot?", history)
+    k2 = cache.key(2, "m", "bot?", history)
+    k3 = cache.key(3, "m", "bot?", history)
+    assert cache.key(1, "m", "？", history) is None
+    cache.put(k1, "a", now=0)
+    cache.put(k2, "b", now=0)
+    assert cache.get(k1, now=5) == "a"
+    cache.put(k3, "c", now=5)  # 淘汰最久未用的 k2
+    assert cache.get(k2, now=5) is None
+    assert cache.get(k1, accept=lambda content: content != "a", now=5) is None
+    assert cache.get(k1, now=11) is None  # 过期
+    assert cache.get(k3, now=11) == "c"
+
+
+def test_dump_load_and_disabled():
+    cache = LLMResponseCache()
+    key = cache.key(1, "m", "bot?", [])
+    cache.put(key, "hello", tokens=100)
+    restored = LLMResponseCache()
+    restored.load(cache.dump())
+    assert restored.get(key) == "hello"
+    off = LLMResponseCache(size=0)
+    off.put(key, "x")
+    assert off.get(key) is None
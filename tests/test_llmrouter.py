@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+from includes.llmrouter import LLMRouter, NoRouteAvailable, Route
+
+PRIMARY = Route("primary", "p", None)
+BACKUP = Route("backup", "b", None)
+
+
+def make_request(hang: threading.Event, hanging=("primary",), calls=None, honor_timeout=True):
+    """primary 卡住直到超时（honor_timeout=False 时一直卡住，直到 hang 被设置），backup 立即返回"""
+    def request(route, timeout):
+        if calls is not None:
+            calls.append((route.name, timeout))
+        if route.name in hanging:
+            hang.wait(timeout if honor_timeout else None)
+            raise TimeoutError("request timed out")
+        return route.name
+    return request
+
+
+def test_fastest_route_first():
+    router = LLMRouter()
+    assert router.call([PRIMARY, BACKUP], lambda route, timeout: route.name) == ("primary", PRIMARY)
+    assert [r.name for r in router.rank([PRIMARY, BACKUP])] == ["primary", "backup"]
+    router.shutdown()
+
+
+def test_failure_fails_over():
+    router = LLMRouter(hedge_default=0)
+
+    def request(route, timeout):
+        if route is PRIMARY:
+            raise ConnectionError("down")
+        return route.name
+
+    assert router.call([PRIMARY, BACKUP], request) == ("backup", BACKUP)
+    router.shutdown()
+
+
+def test_hanging_primary_is_hedged_and_demoted():
+    hang = threading.Event()
+    router = LLMRouter(hedge_default=0.05, request_timeout=5, deadline=5)
+    start = time.monotonic()
+    assert router.call([PRIMARY, BACKUP], make_request(hang)) == ("backup", BACKUP)
+    assert time.monotonic() - start < 1
+    # 落败的主请求按已耗时记了延迟样本，排序随之降级
+    assert [r.name for r in router.rank([PRIMARY, BACKUP])] == ["backup", "primary"]
+    hang.set()
+    router.shutdown()
+
+
+def test_deadline_records_failure_and_opens_breaker():
+    hang = threading.Event()
+    calls = []
+    router = LLMRouter(hedge_default=0, request_timeout=5, deadline=0.05, breaker_failures=2, max_workers=2)
+    for _ in range(2):
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            router.call([PRIMARY], make_request(hang, calls=calls))
+        assert time.monotonic() - start < 1
+    assert all(timeout <= 0.05 for _, timeout in calls)  # 单次超时不超过总期限
+    with pytest.raises(NoRouteAvailable):
+        router.call([PRIMARY], make_request(hang))
+    hang.set()
+    router.shutdown()
+
+
+def test_full_pool_does_not_stall():
+    """卡住的请求占满线程池时，新的调用在总期限内结束，排队的请求被取消"""
+    hang = threading.Event()
+    calls = []
+    router = LLMRouter(hedge_default=0, request_timeout=5, deadline=0.05, breaker_failures=100, max_workers=1)
+    for _ in range(3):
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            router.call([PRIMARY], make_request(hang, calls=calls, honor_timeout=False))
+        assert time.monotonic() - start < 1
+    assert len(calls) == 1  # 后两次请求排在卡住的请求之后，到期时被取消，从未执行
+    hang.set()
+    router.shutdown()
+
+
+def test_half_open_allows_single_probe():
+    router = LLMRouter(hedge_default=0, breaker_failures=1, breaker_cooldown=0.05)
+    with pytest.raises(ConnectionError):
+        router.call([PRIMARY], lambda route, timeout: (_ for _ in ()).throw(ConnectionError("down")))
+    assert router.rank([PRIMARY]) == []
+    time.sleep(0.06)
+    assert router.call([PRIMARY], lambda route, timeout: "ok") == ("ok", PRIMARY)
+    assert router.rank([PRIMARY]) == [PRIMARY]
+    router.shutdown()
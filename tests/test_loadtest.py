@@ -0,0 +1,21 @@
+from includes.metrics import Counter
+from includes.simulator import SimulatorConfig
+from tools.onebot_loadtest import run_loadtest
+
+
+def test_counter_total_sums_over_other_labels():
+    counter = Counter("test_calls_total")
+    counter.inc(action="send_group_msg", status="timeout")
+    counter.inc(2, action="get_msg", status="timeout")
+    counter.inc(action="get_msg", status="ok")
+    assert counter.total(status="timeout") == 3
+    assert counter.total(action="get_msg") == 3
+    assert counter.total() == 4
+
+
+def test_loadtest_reports_every_event():
+    cfg = SimulatorConfig(groups=2, rate=40, duration=0.5, api_latency=0.0, heartbeat_interval=0, seed=0)
+    report = run_loadtest(cfg, "echo", workers=4)
+    assert report["events_sent"] > 0
+    assert report["handled"] == report["events_sent"]
+    assert report["api_timeouts"] == 0
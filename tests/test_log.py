@@ -0,0 +1,46 @@
+import io
+import logging
+
+import pytest
+
+from includes import log
+from includes.log import get_logger, setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def restore_logging():
+    root = logging.getLogger(log.ROOT)
+    saved = root.level, root.propagate
+    yield
+    shutdown_logging()
+    for handler in log._handlers:
+        root.removeHandler(handler)
+    log._handlers.clear()
+    root.setLevel(saved[0])
+    root.propagate = saved[1]
+    for name in ("speak", "bot"):
+        get_logger(name).setLevel(logging.NOTSET)
+
+
+def test_subsystem_levels_and_fields(restore_logging):
+    stream = io.StringIO()
+    setup_logging("INFO", {"speak": "DEBUG", "bot": "WARNING"}, fmt="%(name)s %(message)s%(fields_text)s",
+                  stream=stream)
+    get_logger("speak").debug("decision", extra={"fields": {"rate": 0.5, "speak": True}})
+    get_logger("bot").info("dropped")
+    get_logger("bot").warning("kept")
+    get_logger("main").debug("dropped")
+    assert stream.getvalue().splitlines() == ["tloh.speak decision | rate=0.5 speak=True", "tloh.bot kept"]
+    assert not get_logger("bot").isEnabledFor(logging.INFO)
+
+
+def test_queue_output_and_reconfigure(restore_logging):
+    first, second = io.StringIO(), io.StringIO()
+    setup_logging("INFO", use_queue=True, fmt="%(message)s", stream=first)
+    get_logger("main").info("one")
+    setup_logging("INFO", use_queue=True, fmt="%(message)s", stream=second)  # 停止旧的输出线程并刷出
+    get_logger("main").info("two")
+    shutdown_logging()
+    assert first.getvalue() == "one\n"
+    assert second.getvalue() == "two\n"
+    assert len(logging.getLogger(log.ROOT).handlers) == 1
@@ -0,0 +1,38 @@
+from includes.models import CQCode, Seg, SegmentBuilder, escape
+
+
+def test_escape_text_and_param():
+    assert escape("a&b[c]") == "a&amp;b&#91;c&#93;"
+    assert escape("x,y") == "x,y"
+    assert escape("x,y", param=True) == "x&#44;y"
+
+
+def test_seg_returns_fresh_dicts():
+    first = Seg.at(12345)
+    first["data"]["qq"] = "all"
+    assert Seg.at(12345) == {"type": "at", "data": {"qq": "12345"}}
+    face = Seg.face(1)
+    face["data"].clear()
+    assert Seg.face(1)["data"] == {"id": "1"}
+    assert Seg.dice() is not Seg.dice()
+
+
+def test_seg_text_is_not_parsed_as_cq():
+    assert Seg.text("[CQ:at,qq=all]") == {"type": "text", "data": {"text": "[CQ:at,qq=all]"}}
+
+
+def test_builder_merges_text_and_converts_cqcode():
+    segments = (SegmentBuilder().reply(7).text("你好").text("，").add("世界")
+                .add(CQCode.face(14)).at("all").build())
+    assert segments == [
+        {"type": "reply", "data": {"id": "7"}},
+        {"type": "text", "data": {"text": "你好，世界"}},
+        {"type": "face", "data": {"id": "14"}},
+        {"type": "at", "data": {"qq": "all"}},
+    ]
+
+
+def test_builder_to_cq_escapes():
+    builder = SegmentBuilder().text("[1]&").add(Seg.image("a,b.png")).add(Seg.shake())
+    assert builder.to_cq() == "&#91;1&#93;&amp;[CQ:image,file=a&#44;b.png,cache=1][CQ:shake]"
+    assert str(CQCode.at(10001)) == "[CQ:at,qq=10001]"
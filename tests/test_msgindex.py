@@ -0,0 +1,59 @@
+import json
+
+from includes import memory
+from includes.archive import HistoryArchive
+from includes.memory import history_line
+from includes.msgindex import MessageIndex
+from includes.persist import FsyncPolicy, HistoryStore
+
+
+def test_resolve_and_capacity():
+    index = MessageIndex(capacity=2)
+    index.add(1, 100, 10, 1.0)
+    index.add(2, 200, 20, 2.0)
+    assert index.resolve(1, 100).user_id == 10
+    assert index.resolve(1, 200) is None  # 别的群的消息
+    assert index.resolve(9, 100) is None
+    index.add(3, 100, 30, 3.0)
+    assert 1 not in index and len(index) == 2  # 淘汰最早加入的
+    index.set_offset(3, 42)
+    assert index.get(3).offset == 42
+
+
+def test_dump_and_load():
+    index = MessageIndex()
+    index.add(1, 100, 10, 1.0, 5)
+    restored = MessageIndex()
+    restored.load(index.dump())
+    assert restored.get(1) == index.get(1)
+
+
+def test_index_history_base():
+    index = MessageIndex()
+    lines = [memory.PLACEHOLDER, "10: 早 : (MessageId)1", "你：早", "20: 在吗 : (MessageId)2"]
+    assert index.index_history(100, lines, base=7) == 2
+    assert index.get(1).offset == 8 and index.get(2).offset == 10
+
+
+def test_index_history_longer_than_max_lines(tmp_path, monkeypatch):
+    """历史文件里超过 MAX_LINES 的部分尚未归档时，行号仍指向正确的行"""
+    import main
+
+    monkeypatch.setattr("includes.memory.MAX_LINES", 3)
+    monkeypatch.setattr("includes.persist.MAX_LINES", 3)
+    monkeypatch.setattr(memory, "_archive", HistoryArchive(str(tmp_path / "archive")))
+    lines = [f"10: 第{i}条 : (MessageId){i}" for i in range(6)]
+    path = tmp_path / "memories.json"
+    path.write_text(json.dumps({"100": lines}), encoding="utf-8")
+    store = HistoryStore(str(path), flush_interval=0.05, fsync=FsyncPolicy.NEVER)
+    index = MessageIndex()
+    monkeypatch.setattr(main, "history_store", store)
+    monkeypatch.setattr(main, "message_index", index)
+
+    main.index_history()
+    assert len(index) == 3
+    store.append("100", "10: 新 : (MessageId)6")  # 写入时超出部分移入归档
+    assert store.flush(timeout=5)
+    for message_id in (3, 4, 5):
+        assert history_line("100", index.get(message_id).offset, store.get("100")) == lines[message_id]
+    store.close(timeout=5)
@@ -0,0 +1,136 @@
+import json
+import threading
+
+import pytest
+
+from includes import memory, persist
+from includes.archive import HistoryArchive
+from includes.persist import FsyncPolicy, HistoryStore
+from includes.snapshot import StateSnapshotter
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory, "_archive", HistoryArchive(str(tmp_path / "archive")))
+    store = HistoryStore(str(tmp_path / "memories.json"), flush_interval=0.05, fsync=FsyncPolicy.NEVER)
+    yield store
+    store.close(timeout=5)
+
+
+def read(store):
+    with open(store.path, "r", encoding="utf-8") as doc:
+        return json.load(doc)
+
+
+def test_append_and_flush(store):
+    assert store.get("1") == [memory.PLACEHOLDER]
+    offsets = []
+    store.append("1", "a", on_offset=offsets.append)
+    store.append("1", "b", on_offset=offsets.append)
+    store.update("2", ["x"])
+    assert store.flush(timeout=5)
+    assert offsets == [1, 2]
+    assert read(store) == {"1": [memory.PLACEHOLDER, "a", "b"], "2": ["x"]}
+    assert store.get("1")[-1] == "b"
+    assert sorted(store.groups()) == ["1", "2"]
+
+
+def test_close_writes_pending(store):
+    store.append("1", "a")
+    assert store.close(timeout=5)
+    assert read(store) == {"1": [memory.PLACEHOLDER, "a"]}
+    assert store.close() is True  # 重复关闭
+
+
+def test_overflow_moves_to_archive(store, monkeypatch):
+    monkeypatch.setattr("includes.memory.MAX_LINES", 3)
+    for line in "abcde":
+        store.append("1", line)
+    assert store.flush(timeout=5)
+    assert read(store)["1"] == ["c", "d", "e"]
+    assert memory.get_archive().group("1").lines(0, 3) == [memory.PLACEHOLDER, "a", "b"]
+
+
+@pytest.mark.parametrize("error", [OSError("disk full"), TypeError("boom")])
+def test_write_failure_is_reported(store, error):
+    store.append("1", "a")
+
+    def fail():
+        raise error
+
+    store._write = fail
+    assert store.flush(timeout=5) is False
+    assert store._thread is not None and store._thread.is_alive()
+
+    del store._write
+    assert store.flush(timeout=5)
+    assert read(store)["1"][-1] == "a"
+
+    store.append("1", "b")
+    store._write = fail
+    assert store.close(timeout=5) is False
+
+
+def test_concurrent_appends(store):
+    def writer(gid):
+        for i in range(50):
+            store.append(gid, f"{gid}-{i}")
+
+    threads = [threading.Thread(target=writer, args=(str(g),)) for g in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store.flush(timeout=5)
+    data = read(store)
+    for g in range(4):
+        assert data[str(g)][1:] == [f"{g}-{i}" for i in range(50)]
+
+
+def test_restore_from_snapshot_skips_json(store, tmp_path, monkeypatch):
+    store.append("1", "a")
+    store.update("2", ["x", "y"])
+    snapshotter = StateSnapshotter(str(tmp_path / "state.bin"), interval=0)
+    snapshotter.register("history", store.dump, lambda view: None, split=True)
+    snapshotter.save()
+    store.close(timeout=5)
+
+    def no_json(doc):
+        raise AssertionError("不应解析历史文件")
+
+    monkeypatch.setattr(persist.json, "load", no_json)  # persist.json 就是 json 模块，读回结果前要恢复
+    restored = HistoryStore(store.path, flush_interval=0.05, fsync=FsyncPolicy.NEVER)
+    snapshotter = StateSnapshotter(str(tmp_path / "state.bin"), interval=0)
+    snapshotter.register("history", restored.dump, restored.restore, split=True)
+    assert snapshotter.restore() == ["history"]
+    assert restored.get("1") == [memory.PLACEHOLDER, "a"]
+    assert restored.get("2") == ["x", "y"]
+
+    restored.append("1", "b")  # 恢复后照常写入
+    assert restored.close(timeout=5)
+    monkeypatch.undo()
+    assert read(restored)["1"] == [memory.PLACEHOLDER, "a", "b"]
+
+
+def test_stale_snapshot_is_ignored(store):
+    store.append("1", "a")
+    state = store.dump(timeout=5)
+    store.append("1", "b")  # 快照之后文件又写入过
+    assert store.close(timeout=5)
+
+    restored = HistoryStore(store.path, flush_interval=0.05, fsync=FsyncPolicy.NEVER)
+    restored.restore(state)
+    assert restored.get("1") == [memory.PLACEHOLDER, "a", "b"]
+    restored.close(timeout=5)
+
+
+def test_message_time_reaches_archive(store, monkeypatch):
+    monkeypatch.setattr("includes.memory.MAX_LINES", 2)
+    store.append("1", "u : a : (MessageId)1", ts=1000.0)
+    store.append("1", "u : b : (MessageId)2", ts=2000.0)
+    store.append("1", "u : c : (MessageId)3", ts=3000.0)
+    assert store.flush(timeout=5)
+    archive = memory.get_archive().group("1")
+    assert archive.lines(0, 2) == [memory.PLACEHOLDER, "u : a : (MessageId)1"]
+    assert archive.range_by_time(1000.0, 1500.0) == (1, 2)  # 按消息时间而不是归档时刻
+    assert archive.find_message(1) == 1
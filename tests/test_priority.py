@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from includes.bot import Bot
+from includes.eventers import Condition, Execution, Priority, Receive, When
+from includes.models import MessageInfo
+
+
+@pytest.fixture
+def bot():
+    bot = Bot(ws_url="ws://127.0.0.1:1", self_id=42)
+    yield bot
+    bot._executor.shutdown()
+
+
+def group_event(raw: str, message_id: int = 1) -> dict:
+    return {"post_type": "message", "message_type": "group", "group_id": 100, "user_id": 7,
+            "message_id": message_id, "message": raw, "raw_message": raw, "time": 0}
+
+
+def info(raw: str) -> MessageInfo:
+    return MessageInfo.from_event(group_event(raw), 42)
+
+
+def test_message_priority(bot):
+    assert bot._message_priority(info("随便聊聊")) == Priority.NORMAL
+    assert bot._message_priority(info("[CQ:at,qq=42] 在吗")) == Priority.HIGH
+    assert bot._message_priority(info("[CQ:at,qq=43] 在吗")) == Priority.NORMAL
+    assert bot._message_priority(info("[CQ:reply,id=9]好的")) == Priority.NORMAL
+    bot._remember_sent(9)
+    assert bot._message_priority(info("[CQ:reply,id=9]好的")) == Priority.HIGH
+
+
+def test_handler_priority(bot):
+    command = Receive.Message(When=(When.Received, When.GotCommand(name="help")), Conditions=(Condition.AllMessage,))
+    plain = Receive.Message(When=(When.Received,), Conditions=(Condition.AllMessage,))
+    pinned = Receive.Message(When=(When.Received,), Conditions=(Condition.AllMessage,), Priority=Priority.LOW)
+    assert bot._handler_priority(command, Priority.NORMAL) == Priority.COMMAND
+    assert bot._handler_priority(plain, Priority.HIGH) == Priority.HIGH
+    assert bot._handler_priority(pinned, Priority.HIGH) == Priority.LOW
+    bot.register_message_handler(plain, priority=Priority.COMMAND)
+    assert plain.priority == Priority.COMMAND
+
+
+def test_matching_handlers_run_highest_priority_first(bot):
+    order = []
+
+    def handler(name, priority=None):
+        h = Receive.Message(When=(When.Received,), Conditions=(Condition.AllMessage,),
+                            Execution=Execution.INLINE, Priority=priority)
+        h(lambda bot_instance, message: order.append(name))
+        bot.register_message_handler(h)
+
+    handler("low", Priority.LOW)
+    handler("normal", Priority.NORMAL)
+    handler("derived")  # @机器人，推断为 HIGH，排在先注册的 NORMAL 之前
+    handler("command", Priority.COMMAND)
+    asyncio.run(bot._handle_message(group_event("[CQ:at,qq=42] 在吗")))
+    assert order == ["command", "derived", "normal", "low"]
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+import main
+from includes.dedupe import ReplyDeduper, TriggerCache
+from includes.llmcache import LLMResponseCache
+from includes.models import MessageInfo
+
+
+class FakeHistory:
+    def __init__(self):
+        self.lines = []
+
+    def get(self, gid):
+        return ["1000000: 早 : (MessageId)1"] + self.lines
+
+    def append(self, gid, line, on_offset=None):
+        self.lines.append(line)
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """替换 LLM、发送和历史，只保留回复管线本身"""
+    completions = []
+    sent = []
+    monkeypatch.setattr(main, "load_configuration", lambda: {
+        "model": "m", "EnableGroupQuery": 0, "EnableR18": 0, "EnableWorld": 0, "models": [], "api_providers": []})
+    monkeypatch.setattr(main, "build_routes", lambda configuration, names: [])
+    monkeypatch.setattr(main, "request_completion", lambda routes, messages, tier: (completions.pop(0), 10))
+    monkeypatch.setattr(main, "history_store", FakeHistory())
+    monkeypatch.setattr(main, "deduper", ReplyDeduper(window=600))
+    monkeypatch.setattr(main, "trigger_cache", TriggerCache(window=30))
+    monkeypatch.setattr(main, "llm_cache", LLMResponseCache(size=0))
+    monkeypatch.setattr(main.forwarder, "send_group", lambda bot, gid, chunks, reply_to=None: sent.append(chunks))
+    return completions, sent
+
+
+def message(text, message_id=2):
+    return MessageInfo(time=int(time.time()), message_type="group", message_id=message_id, user_id=1000000,
+                       message=text, raw_message=text, group_id=100000)
+
+
+def test_identical_trigger_reuses_sent_reply(pipeline):
+    completions, sent = pipeline
+    completions.append("是，但是关你屁事？")
+    main.reply_to_batch(main.bot, [message("bot?")])
+    main.reply_to_batch(main.bot, [message("BOT？", message_id=3)])  # 复用不经过去重，也不再调用 LLM
+    assert sent == [["是，但是关你屁事？"], ["是，但是关你屁事？"]]
+    assert completions == []
+
+
+def test_trigger_cache_stores_regenerated_reply(pipeline):
+    completions, sent = pipeline
+    main.deduper.remember(100000, "管他呢，反正我又不搞 AI")
+    completions.extend(["管他呢，反正我又不搞 AI", "😡"])
+    main.reply_to_batch(main.bot, [message("5090 谁买得起")])
+    assert sent == [["😡"]]
+    assert main.trigger_cache.get(100000, "5090 谁买得起") == "😡"  # 缓存的是实际发出的那条
+
+
+def test_duplicate_is_dropped_and_not_cached(pipeline, monkeypatch):
+    completions, sent = pipeline
+    monkeypatch.setattr(main.deduper, "regenerate", False)
+    main.deduper.remember(100000, "管他呢，反正我又不搞 AI")
+    completions.append("管他呢，反正我又不搞 AI")
+    main.reply_to_batch(main.bot, [message("5090 谁买得起")])
+    assert sent == []
+    assert main.trigger_cache.get(100000, "5090 谁买得起") is None
@@ -0,0 +1,60 @@
+import pytest
+
+from includes.snapshot import SnapshotReader, StateSnapshotter, write_snapshot
+
+
+def test_write_and_read(tmp_path):
+    path = str(tmp_path / "state.bin")
+    write_snapshot(path, {"a": [1, 2], "b": {"x": "中文"}})
+    reader = SnapshotReader(path)
+    try:
+        assert "a" in reader and "c" not in reader
+        assert reader.get("a") == [1, 2]
+        assert reader.get("b") == {"x": "中文"}
+        assert reader.get("c", 0) == 0
+    finally:
+        reader.close()
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / "state.bin"
+    path.write_bytes(b"not a snapshot at all")
+    with pytest.raises(ValueError):
+        SnapshotReader(str(path))
+    assert StateSnapshotter(str(path)).restore() == []
+    assert StateSnapshotter(str(tmp_path / "missing.bin")).restore() == []
+
+
+def test_save_after_restore(tmp_path):
+    path = str(tmp_path / "state.bin")
+    state = {"plain": [1], "pending": {"100": [{"id": 1}], "200": [{"id": 2}]}}
+    restored = {}
+
+    snapshotter = StateSnapshotter(path, interval=0)
+    snapshotter.register("plain", lambda: state["plain"], lambda value: restored.update(plain=value))
+    snapshotter.register("pending", lambda: state["pending"], lambda view: restored.update(pending=view), split=True)
+    snapshotter.save()
+
+    assert snapshotter.restore() == ["plain", "pending"]
+    # 恢复后读取器已关闭：立即覆盖快照不受影响，拆分的段仍可访问
+    state["plain"] = [2]
+    snapshotter.save()
+    assert restored["plain"] == [1]
+    assert sorted(restored["pending"]) == ["100", "200"]
+    assert restored["pending"]["200"] == [{"id": 2}]
+
+    assert snapshotter.restore() == ["plain", "pending"]
+    assert restored["plain"] == [2]
+
+
+def test_failed_provider_is_skipped(tmp_path):
+    path = str(tmp_path / "state.bin")
+    snapshotter = StateSnapshotter(path, interval=0)
+
+    def broken():
+        raise RuntimeError("boom")
+
+    snapshotter.register("broken", broken, lambda value: None)
+    snapshotter.register("ok", lambda: 1, lambda value: None)
+    snapshotter.save()
+    assert snapshotter.restore() == ["ok"]
@@ -0,0 +1,46 @@
+import math
+
+import pytest
+
+from includes.speak import SpeakDecisionEngine, SpeakWeights
+
+MESSAGES = ["bot 在吗", "今天天气不错", "Python 和 GPT 哪个离谱？", "@全体 开会", "", "笑死 bot bot"]
+
+
+def fixed_engine() -> SpeakDecisionEngine:
+    return SpeakDecisionEngine(SpeakWeights(jitter=(1.0, 1.0)), seed=1)
+
+
+def test_score_components():
+    engine = fixed_engine()
+    score = engine.score("bot?", last_bot_time=100.0, now=110.0, recent_msg_count=3)
+    assert score.keyword_bonus == pytest.approx(0.7)
+    assert score.delta == 10.0
+    assert score.rate == pytest.approx((0.03 + 0.7) * 0.1)  # 30 秒内冷却，活跃度居中不调整
+    assert score.activity_change == 0.0
+    assert engine.score("随便", recent_msg_count=10).rate == pytest.approx(0.03 * 0.3)
+    assert engine.score("at", recent_msg_count=0).rate == 0.95  # 上限
+
+
+@pytest.mark.parametrize("last, counts", [(None, 0), (95.0, 3), (0.0, 8)])
+def test_batch_matches_scalar(last, counts):
+    engine = fixed_engine()
+    batch = engine.score_batch(MESSAGES, last_bot_time=last, now=100.0, recent_msg_counts=counts)
+    for i, msg in enumerate(MESSAGES):
+        score = engine.score(msg, last_bot_time=last, now=100.0, recent_msg_count=counts)
+        assert batch["keyword_bonus"][i] == pytest.approx(score.keyword_bonus)
+        assert batch["rate"][i] == pytest.approx(score.rate)
+
+
+def test_batch_per_message_arrays_and_nan():
+    engine = fixed_engine()
+    batch = engine.score_batch(["a", "a"], last_bot_time=[math.nan, 90.0], now=100.0, recent_msg_counts=[3, 3])
+    assert batch["rate"].tolist() == pytest.approx([0.03, 0.003])
+    assert engine.score_batch([])["speak"].tolist() == []
+
+
+def test_seed_reproducible():
+    a = SpeakDecisionEngine(seed=7)
+    b = SpeakDecisionEngine(seed=7)
+    assert [a.should_speak(m) for m in MESSAGES] == [b.should_speak(m) for m in MESSAGES]
+    assert a.should_speak_batch(MESSAGES * 10) == b.should_speak_batch(MESSAGES * 10)
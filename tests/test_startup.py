@@ -0,0 +1,29 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, logging, sys, threading
+import config
+config.METRICS_SNAPSHOT = sys.argv[1]  # 打开指标快照：import 时不应启动写入线程
+import main
+print(json.dumps({
+    "modules": sorted(m for m in ("openai", "toml", "websockets", "http.server", "multiprocessing") if m in sys.modules),
+    "handlers": len(logging.getLogger("tloh").handlers),
+    "threads": sorted(t.name for t in threading.enumerate() if t.name.startswith("metrics")),
+}))
+"""
+
+
+def test_import_main_is_lazy_and_side_effect_free(tmp_path):
+    result = subprocess.run([sys.executable, "-c", PROBE, str(tmp_path / "metrics.json")], cwd=ROOT, capture_output=True, text=True, check=True)
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert probe == {"modules": [], "handlers": 0, "threads": []}
+
+
+def test_includes_attributes_load_on_demand():
+    code = "import sys, includes; assert 'includes.bot' not in sys.modules; includes.bot.Bot; assert 'includes.bot' in sys.modules"
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
@@ -0,0 +1,44 @@
+import pytest
+
+from includes.speak import DEFAULT_KEYWORDS
+from includes.tiering import TIER_COST, TIER_REQUESTS, Tier, TierPolicy
+
+CONFIGURATION = {"tiering": {
+    "length_scale": 20,
+    "tiers": [
+        {"name": "full", "min_score": 0.5},
+        {"name": "fast", "models": ["small-chat"], "max_history": 200, "price_per_1k": 0.002},
+    ],
+}}
+
+
+def test_from_config_defaults_and_order():
+    policy = TierPolicy.from_config(CONFIGURATION, DEFAULT_KEYWORDS)
+    assert [t.name for t in policy.tiers] == ["fast", "full"]
+    fast = policy.tiers[0]
+    assert (fast.models, fast.max_history, fast.min_score) == (["small-chat"], 200, 0.0)
+    assert policy.length_scale == 20 and policy.question_weight == 0.4
+    assert [t.name for t in TierPolicy.from_config({}).tiers] == ["full"]
+
+
+def test_complexity_ignores_mentions_and_cq_codes():
+    policy = TierPolicy([Tier("full")], DEFAULT_KEYWORDS, length_scale=20)
+    assert "bot" not in policy.keywords and "at" not in policy.keywords
+    assert policy.complexity("[CQ:at,qq=42] bot") == pytest.approx(0.4 * 3 / 20)
+    assert policy.complexity("bot 你个废物") == pytest.approx(0.4 * 7 / 20)
+    assert policy.complexity("python 的 gil 为什么这么慢") == pytest.approx(0.4 * 16 / 20 + 0.4 + 0.15)  # 长度 + 提问 + python
+
+
+def test_select():
+    policy = TierPolicy.from_config(CONFIGURATION, DEFAULT_KEYWORDS)
+    assert policy.select("bot 你个废物").name == "fast"
+    assert policy.select("python 的 GIL 为什么这么慢？").name == "full"
+    assert policy.select("").name == "fast"
+
+
+def test_record_costs():
+    tier = Tier("fast", price_per_1k=0.002)
+    requests, cost = TIER_REQUESTS.total(tier="fast"), TIER_COST.total(tier="fast")
+    TierPolicy.record(tier, 0.5, 1500)
+    assert TIER_REQUESTS.total(tier="fast") == requests + 1
+    assert TIER_COST.total(tier="fast") == pytest.approx(cost + 0.003)
@@ -0,0 +1,66 @@
+"""
+模拟 LLM 服务 - 启动本地 OpenAI 兼容服务，用于离线压测回复路径
+
+用法：
+    python -m tools.mock_llm --port 8765 --ttft 0.4 --tps 30 --rate-limit 0.05
+
+然后在 configuration.toml 中加入（参见 configuration_template.toml）：
+    [[api_providers]]
+    name = "mock"
+    base_url = "http://127.0.0.1:8765/v1"
+    api_key = "mock"
+
+    [[models]]
+    name = "mock-chat"
+    api_provider = "mock"
+    model_identifier = "mock-chat"
+
+并把 model 设为 "mock-chat"。
+"""
+
+import argparse
+import json
+import sys
+from typing import List
+
+from includes.mockllm import MockLLMConfig, MockLLMServer
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="本地 OpenAI 兼容的模拟 LLM 服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--ttft", type=float, default=0.3, help="首 token 延迟（秒）")
+    parser.add_argument("--tps", type=float, default=40.0, help="每秒生成 token 数")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="随机返回 429 的比例")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="并发上限，超出返回 429（0 为不限）")
+    parser.add_argument("--responses", help="固定回复文件：JSON 字符串数组，或以两个空行分隔的纯文本")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args(argv)
+
+    config = MockLLMConfig(
+        ttft=args.ttft,
+        tokens_per_second=args.tps,
+        rate_limit=args.rate_limit,
+        max_concurrency=args.max_concurrency,
+        seed=args.seed,
+    )
+    if args.responses:
+        with open(args.responses, "r", encoding="utf-8") as doc:
+            content = doc.read()
+        try:
+            config.responses = [str(r) for r in json.loads(content)]
+        except json.JSONDecodeError:
+            config.responses = [r.strip() for r in content.split("\n\n\n") if r.strip()]
+
+    server = MockLLMServer(config, args.host, args.port)
+    print(f"模拟 LLM 服务已启动: {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+OneBot 压测 - 用本地模拟器驱动 Bot，报告吞吐量、处理器延迟和失败的 API 调用
+
+用法：
+    python -m tools.onebot_loadtest --groups 50 --rate 200 --duration 30 --latency 0.05
+    python -m tools.onebot_loadtest --history ./allpre.deepseek.preData --handler echo --work-ms 2
+    python -m tools.onebot_loadtest --handler main   # 使用 main.py 的真实处理器（需配合 mock LLM）
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+from includes.bot import API_CALLS, HANDLER_DURATION, HANDLER_QUEUE_WAIT, PENDING_ECHO, Bot
+from includes.executor import HANDLER_SHED
+from includes.eventers import Receive
+from includes.models import MessageInfo
+from includes.simulator import OneBotSimulator, SimulatorConfig
+
+
+SHED_REASONS = ("rejected", "drop_oldest", "shed_low")
+
+
+def make_handler(kind: str, work_ms: float):
+    """构造压测用的消息处理器"""
+    if kind == "main":
+        import main
+        return main.all_message
+
+    handler = Receive.Message()
+
+    @handler
+    def loadtest_handler(bot_instance: Bot, info: MessageInfo):
+        deadline = time.perf_counter() + work_ms / 1000
+        while time.perf_counter() < deadline:
+            pass
+        if kind == "echo":
+            bot_instance.send_group_msg(info.group_id, f"ack {info.message_id}")
+
+    return handler
+
+
+def run_loadtest(cfg: SimulatorConfig, handler_kind: str = "echo", work_ms: float = 0.0,
+                 drain: float | None = None, workers: int = 16, queue: int = 256) -> Dict[str, Any]:
+    """
+    执行一次压测
+
+    Args:
+        cfg: 模拟器配置（duration 必须大于 0）
+        handler_kind: echo（每条消息回复一次）/ noop（只消耗 CPU）/ main（main.py 的处理器）
+        work_ms: 每条消息模拟的 CPU 工作量（毫秒）
+        drain: 推送结束后等待处理器收尾、在途 API 调用响应或超时的最长时间（秒），
+            默认且至少为 Bot 的 API 超时加 1 秒，否则丢弃的调用来不及超时
+        workers: Bot 的处理器线程数
+        queue: Bot 的处理器排队上限
+
+    Returns:
+        Dict: 模拟器与 Bot 两侧的统计
+    """
+    sim = OneBotSimulator(cfg).start_in_thread()
+    bot = Bot(ws_url=sim.url, self_id=cfg.self_id, handler_workers=workers, handler_queue=queue)
+    handler = make_handler(handler_kind, work_ms)
+    bot.register_message_handler(handler)
+
+    done_before = HANDLER_DURATION.count(kind="message", handler=handler.name)
+    timeouts_before = API_CALLS.total(status="timeout")
+    shed_before = sum(HANDLER_SHED.value(kind="message", reason=r) for r in SHED_REASONS)
+
+    runner = threading.Thread(target=bot.run, name="loadtest-bot", daemon=True)
+    runner.start()
+    sim.wait_connected()
+    time.sleep(cfg.duration)
+
+    deadline = time.perf_counter() + max(drain or 0.0, bot.api_timeout + 1)
+    while time.perf_counter() < deadline:
+        handled = HANDLER_DURATION.count(kind="message", handler=handler.name) - done_before
+        shed = sum(HANDLER_SHED.value(kind="message", reason=r) for r in SHED_REASONS) - shed_before
+        if handled + shed >= sim.events_sent and not PENDING_ECHO.value():
+            break
+        time.sleep(0.05)
+
+    bot.stop()
+    runner.join(timeout=5)
+    sim.stop_thread()
+
+    handled = HANDLER_DURATION.count(kind="message", handler=handler.name) - done_before
+    report = sim.report()
+    elapsed = report["elapsed"] or cfg.duration
+    report.update({
+        "handled": handled,
+        "handled_per_second": handled / elapsed,
+        "handler_p50": HANDLER_DURATION.quantile(0.5, kind="message", handler=handler.name),
+        "handler_p99": HANDLER_DURATION.quantile(0.99, kind="message", handler=handler.name),
+        "queue_wait_p50": HANDLER_QUEUE_WAIT.quantile(0.5, kind="message"),
+        "queue_wait_p99": HANDLER_QUEUE_WAIT.quantile(0.99, kind="message"),
+        "api_timeouts": API_CALLS.total(status="timeout") - timeouts_before,
+        "shed": sum(HANDLER_SHED.value(kind="message", reason=r) for r in SHED_REASONS) - shed_before,
+    })
+    return report
+
+
+def load_messages(path: str) -> List[str]:
+    """从历史文件读取回放消息"""
+    from tools.speak_replay import load_history, split_lines
+    texts: List[str] = []
+    for lines in load_history(path).values():
+        texts.extend(split_lines(lines)[0])
+    return texts
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="用本地 OneBot 模拟器压测 Bot")
+    parser.add_argument("--groups", type=int, default=10, help="群数量")
+    parser.add_argument("--rate", type=float, default=50.0, help="每秒推送的消息数")
+    parser.add_argument("--duration", type=float, default=10.0, help="推送时长（秒）")
+    parser.add_argument("--latency", type=float, default=0.02, help="API 回应延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="API 随机附加延迟上限（秒）")
+    parser.add_argument("--drop", type=float, default=0.0, help="不回应的 API 调用比例")
+    parser.add_argument("--history", help="回放消息来源（历史文件）")
+    parser.add_argument("--handler", choices=("echo", "noop", "main"), default="echo", help="处理器")
+    parser.add_argument("--work-ms", type=float, default=0.0, help="每条消息的模拟 CPU 工作量（毫秒）")
+    parser.add_argument("--workers", type=int, default=16, help="处理器线程数")
+    parser.add_argument("--queue", type=int, default=256, help="处理器排队上限")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    args = parser.parse_args(argv)
+
+    cfg = SimulatorConfig(
+        groups=args.groups,
+        rate=args.rate,
+        duration=args.duration,
+        api_latency=args.latency,
+        api_jitter=args.jitter,
+        drop_rate=args.drop,
+        seed=args.seed,
+    )
+    if args.history:
+        cfg.messages = load_messages(args.history) or cfg.messages
+
+    report = run_loadtest(cfg, args.handler, args.work_ms, workers=args.workers, queue=args.queue)
+
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print(f"推送事件:     {report['events_sent']} ({report['events_per_second']:.1f}/s)")
+    print(f"处理完成:     {report['handled']} ({report['handled_per_second']:.1f}/s)")
+    print(f"处理器延迟:   p50={report['handler_p50'] * 1000:.1f}ms  p99={report['handler_p99'] * 1000:.1f}ms")
+    print(f"排队等待:     p50={report['queue_wait_p50'] * 1000:.1f}ms  p99={report['queue_wait_p99'] * 1000:.1f}ms")
+    print(f"API 调用:     {report['api_calls']}")
+    print(f"API 丢弃:     {report['api_dropped']}  超时: {report['api_timeouts']:g}")
+    print(f"过载丢弃:     {report['shed']:g}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
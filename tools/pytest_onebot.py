@@ -0,0 +1,43 @@
+"""
+pytest 插件 - 提供 OneBot 模拟器与已连接 Bot 的 fixture
+
+用法：
+    pytest -p tools.pytest_onebot
+    或在 conftest.py 中写 pytest_plugins = ["tools.pytest_onebot"]
+
+    def test_echo(onebot_bot, onebot_simulator):
+        onebot_bot.register_message_handler(...)
+        onebot_simulator.push_group_message(100000, 1000000, "/echo hi")
+"""
+
+import threading
+import time
+
+import pytest
+
+from includes.bot import Bot
+from includes.simulator import OneBotSimulator, SimulatorConfig
+
+
+@pytest.fixture
+def onebot_simulator():
+    """后台线程中运行的模拟器，不自动推送消息"""
+    sim = OneBotSimulator(SimulatorConfig(rate=0, heartbeat_interval=0, api_latency=0.0, seed=0))
+    sim.start_in_thread()
+    yield sim
+    sim.stop_thread()
+
+
+@pytest.fixture
+def onebot_bot(onebot_simulator):
+    """已连接到模拟器的 Bot（处理器可在测试中继续注册）"""
+    bot = Bot(ws_url=onebot_simulator.url, self_id=onebot_simulator.config.self_id)
+    runner = threading.Thread(target=bot.run, name="pytest-bot", daemon=True)
+    runner.start()
+    assert onebot_simulator.wait_connected(), "Bot 未能连接到模拟器"
+    deadline = time.monotonic() + 5
+    while not bot.connected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield bot
+    bot.stop()
+    runner.join(timeout=5)
@@ -0,0 +1,133 @@
+"""
+发言率回放 - 用历史文件估计各群的 bot 发言率
+
+用法：
+    python -m tools.speak_replay ./data/botmemories.ign --interval 4 --seed 1
+    python -m tools.speak_replay ./allpre.deepseek.preData
+
+历史文件可以是 botmemories.ign（{群号: [历史行]} 的 JSON），
+也可以是每行一条消息的纯文本（视为同一个群）。
+历史行不带时间戳，这里按 --interval 为平均间隔生成指数分布的到达时间；
+以 "你：" 开头的行视为 bot 当时的发言，用于计算冷却。
+"""
+
+import argparse
+import json
+import re
+import sys
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from includes.speak import SpeakDecisionEngine, SpeakWeights
+
+LINE_PATTERN = re.compile(r"^(\d+): (.*?)(?: : \(MessageId\)-?\d+)?$", re.S)
+BOT_PREFIX = "你："
+
+
+def load_history(path: str) -> Dict[str, List[str]]:
+    """读取历史文件，返回 {群号: [历史行]}"""
+    with open(path, "r", encoding="utf-8") as doc:
+        content = doc.read()
+    try:
+        data = json.loads(content)
+        if isinstance(data, dict):
+            return {str(k): list(v) for k, v in data.items()}
+    except json.JSONDecodeError:
+        pass
+
+    lines = []
+    for line in content.splitlines():
+        line = line.strip().rstrip(",")
+        if len(line) >= 2 and line[0] == line[-1] == '"':
+            line = line[1:-1]
+        if line:
+            lines.append(line)
+    return {"default": lines}
+
+
+def split_lines(lines: List[str]) -> Tuple[List[str], List[bool]]:
+    """拆出消息文本，并标记哪些行是 bot 自己的发言"""
+    texts, is_bot = [], []
+    for line in lines:
+        if line.startswith(BOT_PREFIX):
+            texts.append(line[len(BOT_PREFIX):])
+            is_bot.append(True)
+            continue
+        match = LINE_PATTERN.match(line)
+        texts.append(match.group(2) if match else line)
+        is_bot.append(False)
+    return texts, is_bot
+
+
+def replay_group(engine: SpeakDecisionEngine, lines: List[str], interval: float,
+                 window: float) -> Dict[str, float]:
+    """回放单个群，返回统计"""
+    texts, is_bot = split_lines(lines)
+    bot_mask = np.asarray(is_bot, dtype=bool)
+    users = [t for t, b in zip(texts, is_bot) if not b]
+    if not users:
+        return {"messages": 0, "expected": 0.0, "sampled": 0, "rate": 0.0}
+
+    # 到达时间：指数分布间隔
+    times = np.cumsum(engine.np_rng.exponential(interval, size=len(texts)))
+
+    # 每条消息之前 bot 最后一次发言的时间（无记录为 NaN）
+    bot_times = np.where(bot_mask, times, np.nan)
+    idx = np.where(bot_mask, np.arange(len(texts)), -1)
+    last_idx = np.maximum.accumulate(idx)
+    last_bot = np.where(last_idx >= 0, bot_times[np.maximum(last_idx, 0)], np.nan)
+
+    # 最近 window 秒内的消息数
+    recent = np.arange(len(texts)) - np.searchsorted(times, times - window)
+
+    user_mask = ~bot_mask
+    result = engine.score_batch(
+        users,
+        last_bot_time=last_bot[user_mask],
+        now=times[user_mask],
+        recent_msg_counts=recent[user_mask],
+    )
+    sampled = int(result["speak"].sum())
+    return {
+        "messages": len(users),
+        "expected": float(result["rate"].mean()),
+        "sampled": sampled,
+        "rate": sampled / len(users),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="用历史文件估计各群的 bot 发言率")
+    parser.add_argument("history", help="历史文件路径")
+    parser.add_argument("--interval", type=float, default=5.0, help="平均消息间隔（秒）")
+    parser.add_argument("--window", type=float, default=10.0, help="活跃度统计窗口（秒）")
+    parser.add_argument("--base-rate", type=float, default=SpeakWeights.base_rate, help="基础触发率")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    parser.add_argument("--group", action="append", help="只回放指定群（可多次指定）")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    args = parser.parse_args(argv)
+
+    engine = SpeakDecisionEngine(SpeakWeights(base_rate=args.base_rate), seed=args.seed)
+    history = load_history(args.history)
+
+    report = {}
+    for gid, lines in history.items():
+        if args.group and gid not in args.group:
+            continue
+        report[gid] = replay_group(engine, lines, args.interval, args.window)
+
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print(f"{'群号':<14}{'消息数':>8}{'期望发言率':>12}{'采样发言':>10}{'采样发言率':>12}")
+    for gid, stat in report.items():
+        print(f"{gid:<14}{stat['messages']:>8}{stat['expected']:>12.4f}"
+              f"{stat['sampled']:>10}{stat['rate']:>12.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())